@@ -9,6 +9,7 @@ RestrictedBattleQueue has been provided. You must implement
 RestrictedBattleQueue and document it accordingly.
 """
 from typing import Union
+from collections import deque
 
 
 class BattleQueue:
@@ -24,7 +25,7 @@ class BattleQueue:
         >>> bq.is_empty()
         True
         """
-        self._content = []
+        self._content = deque()
         self._p1 = None
         self._p2 = None
 
@@ -45,8 +46,8 @@ class BattleQueue:
         >>> bq.is_empty()
         False
         """
-        while self._content and self._content[0].get_available_actions() == []:
-            self._content.pop(0)
+        while self._content and not self._content[0].get_available_actions():
+            self._content.popleft()
 
     def add(self, character: 'Character') -> None:
         """
@@ -88,7 +89,7 @@ class BattleQueue:
         """
         self._clean_queue()
 
-        return self._content.pop(0)
+        return self._content.popleft()
 
     def is_empty(self) -> bool:
         """
@@ -101,7 +102,7 @@ class BattleQueue:
         """
         self._clean_queue()
 
-        return self._content == []
+        return not self._content
 
     def peek(self) -> 'Character':
         """
@@ -230,6 +231,38 @@ class BattleQueue:
 
         return new_battle_queue
 
+    def get_signature(self) -> tuple:
+        """
+        Return a hashable signature of the game state held by this
+        BattleQueue: each player's type, HP, SP and decision tree (if any),
+        followed by the queue contents, where 0 stands for the first player
+        and 1 for the second.
+
+        Two BattleQueues with equal signatures have the same future, so the
+        signature can be used to cache scores of positions.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> bq.add(r)
+        >>> bq.get_signature()
+        ('Rogue', 100, 100, None, 'Mage', 100, 100, None, (0, 1, 0))
+        """
+        players = []
+        for player in [self._p1, self._p2]:
+            players.extend([type(player).__name__, player.get_hp(),
+                            player.get_sp(),
+                            getattr(player, 'skill_decision_tree', None)])
+        order = tuple(0 if character is self._p1 else 1
+                      for character in self._content)
+        return tuple(players) + (order,)
+
     def __repr__(self) -> str:
         """
         Return a representation of this BattleQueue.
@@ -287,9 +320,10 @@ class RestrictedBattleQueue(BattleQueue):
 
     def __init__(self) -> None:
         super().__init__()
-        self.able_content = []
+        self.able_content = deque()
         self.count_able_p1 = 0
         self.count_able_p2 = 0
+        self._queued = {}
 
     def add(self, character: 'Character') -> None:
         """
@@ -306,30 +340,31 @@ class RestrictedBattleQueue(BattleQueue):
         >>> rbq.is_empty()
         False
         >>> rbq.able_content
-        ['Y']
+        deque(['Y'])
         >>> rbq.add(c2)
         >>> rbq.able_content
-        ['Y', 'Y']
+        deque(['Y', 'Y'])
         >>> rbq.add(c2)
         >>> rbq.able_content
-        ['Y', 'Y', 'N']
+        deque(['Y', 'Y', 'N'])
         >>> rbq.remove()
         Sophia (Rogue): 100/100
         >>> rbq.remove()
         Sophia (Rogue): 100/100
         >>> rbq.add(c)
         >>> rbq.able_content
-        ['N']
+        deque(['N'])
         >>> rbq.add(c2)
         >>> rbq.able_content
-        ['N']
+        deque(['N'])
         """
-        if self.able_content != [] and self.able_content[0] == 'N':
+        if self.able_content and self.able_content[0] == 'N':
             return
         first_time = False
-        if character not in self._content:
+        if not self._queued.get(character):
             first_time = True
         self._content.append(character)
+        self._queued[character] = self._queued.get(character, 0) + 1
         if not self._p1:
             self._p1 = character
             self.able_content.append('Y')
@@ -378,9 +413,10 @@ class RestrictedBattleQueue(BattleQueue):
         >>> rbq.is_empty()
         False
         """
-        while self._content and self._content[0].get_available_actions() == []:
-            r1 = self._content.pop(0)
-            r2 = self.able_content.pop(0)
+        while self._content and not self._content[0].get_available_actions():
+            r1 = self._content.popleft()
+            r2 = self.able_content.popleft()
+            self._queued[r1] -= 1
             if r1 == self._p1 and r2 == 'Y':
                 if self.count_able_p1 > 0:
                     self.count_able_p1 -= 1
@@ -402,17 +438,18 @@ class RestrictedBattleQueue(BattleQueue):
         >>> c2.enemy = c
         >>> rbq.add(c)
         >>> rbq.able_content
-        ['Y']
+        deque(['Y'])
         >>> rbq.remove()
         Sophia (Rogue): 100/100
         >>> rbq.is_empty()
         True
         >>> rbq.able_content
-        []
+        deque([])
         """
         self._clean_queue()
-        r = self.able_content.pop(0)
-        character_remove = self._content.pop(0)
+        r = self.able_content.popleft()
+        character_remove = self._content.popleft()
+        self._queued[character_remove] -= 1
         if character_remove == self._p1 and r == 'Y':
             if self.count_able_p1 > 0:
                 self.count_able_p1 -= 1
@@ -443,9 +480,9 @@ class RestrictedBattleQueue(BattleQueue):
         >>> rbq
         r (Rogue): 100/100 -> r2 (Rogue): 100/100
         >>> new_rbq.able_content
-        ['Y', 'Y', 'Y']
+        deque(['Y', 'Y', 'Y'])
         >>> rbq.able_content
-        ['Y', 'Y']
+        deque(['Y', 'Y'])
         """
         new_battle_queue = RestrictedBattleQueue()
 
@@ -466,6 +503,27 @@ class RestrictedBattleQueue(BattleQueue):
 
         return new_battle_queue
 
+    def get_signature(self) -> tuple:
+        """
+        Return a hashable signature of the game state held by this
+        RestrictedBattleQueue. This is the BattleQueue signature followed by
+        the able to add flags of the queue contents.
+
+        >>> rbq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", rbq, ManualPlaystyle(rbq))
+        >>> c2 = Rogue("r2", rbq, ManualPlaystyle(rbq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> rbq.add(c)
+        >>> rbq.add(c2)
+        >>> rbq.add(c2)
+        >>> rbq.get_signature()[-2:]
+        ((0, 1, 1), ('Y', 'Y', 'N'))
+        """
+        return super().get_signature() + (tuple(self.able_content),)
+
 
 if __name__ == '__main__':
     import python_ta
@@ -0,0 +1,345 @@
+"""
+A benchmark suite for the hot paths of the A2 engine.
+
+Times BattleQueue.copy, RestrictedBattleQueue.add and remove,
+Character.get_available_actions, SkillDecisionTree.pick_skill,
+get_state_score and the select_attack of RecursiveMinimax and IterativeMinimax,
+in the Rogue v Mage positions the unittests set up and in matchups starting at
+full HP and SP. Each case is timed over several repeats, and the fastest time
+per call is the one compared, since it is the least disturbed by whatever else
+the machine is doing.
+
+The results are written as JSON, and compared against a baseline written by an
+earlier run with --save-baseline. The run fails if any case is more than the
+threshold slower than its baseline, or if there is no baseline to compare
+against. Timings depend on the machine, so no baseline is committed: save one
+on the machine the comparisons will run on first.
+
+Run this file to benchmark, e.g.
+    python a2_benchmark.py --save-baseline
+    python a2_benchmark.py --threshold 0.2 -k minimax
+"""
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from a2_game import Match
+from a2_playstyle import get_state_score, RecursiveMinimax, IterativeMinimax
+from a2_skill_decision_tree import create_default_tree, get_compiled
+
+# The positions the unittests set up for a Rogue (P1) against a Mage (P2), as
+# (P1 HP, P1 SP, P2 HP, P2 SP), by name.
+UNITTEST_POSITIONS = {'rogue_mage_40_10_100_30': (40, 10, 100, 30),
+                      'rogue_mage_40_6_14_35': (40, 6, 14, 35),
+                      'rogue_mage_30_100_5_30': (30, 100, 5, 30),
+                      'rogue_mage_60_100_60_100': (60, 100, 60, 100)}
+
+# The matchups started at full HP and SP, as the a2_game.CHARACTER_CLASSES
+# keys of P1 and P2, by name.
+FULL_MATCHUPS = {'rogue_mage_full': ('r', 'm'),
+                 'vampire_sorcerer_full': ('v', 's'),
+                 'mage_vampire_full': ('m', 'v')}
+
+# The files the results of the latest run and the baseline are written to,
+# next to this file.
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'a2_benchmark_results.json')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'a2_benchmark_baseline.json')
+
+# How much slower than its baseline a case may be before the run fails, as a
+# fraction of the baseline.
+DEFAULT_THRESHOLD = 0.25
+
+
+class BenchmarkCase:
+    """
+    One thing to time.
+
+    name - the name of this case in the results.
+    make - a function that sets this case up and returns the function to
+           time.
+    """
+    name: str
+    make: Callable[[], Callable[[], Any]]
+
+    def __init__(self, name: str,
+                 make: Callable[[], Callable[[], Any]]) -> None:
+        """
+        Initialize this BenchmarkCase called name, set up by make.
+        """
+        self.name = name
+        self.make = make
+
+
+def set_up_queue(queue_type: str, p1_type: str, p2_type: str,
+                 position: Tuple[int, int, int, int] = None) -> 'BattleQueue':
+    """
+    Return the BattleQueue of a new Match between characters of the types
+    p1_type and p2_type with manual playstyles, with their HP and SP set to
+    position if it is given.
+
+    >>> set_up_queue('n', 'r', 'm', (40, 10, 100, 30))
+    P1 (Rogue): 40/10 -> P2 (Mage): 100/30
+    """
+    match = Match()
+    match.set_up(queue_type, p1_type, 'P1', 'm', p2_type, 'P2', 'm')
+    if position is not None:
+        match.p1.set_hp(position[0])
+        match.p1.set_sp(position[1])
+        match.p2.set_hp(position[2])
+        match.p2.set_sp(position[3])
+    return match.battle_queue
+
+
+def _scenarios() -> List[Tuple[str, str, str, Tuple[int, int, int, int]]]:
+    """
+    Return the name, P1 type, P2 type and position of every scenario the
+    searches are timed in.
+    """
+    scenarios = [(name, 'r', 'm', position)
+                 for name, position in UNITTEST_POSITIONS.items()]
+    scenarios.extend((name, p1_type, p2_type, None)
+                     for name, (p1_type, p2_type) in FULL_MATCHUPS.items())
+    return scenarios
+
+
+def _copy_case(queue_type: str, p1_type: str, p2_type: str) \
+        -> Callable[[], Any]:
+    """
+    Return a function copying the BattleQueue of a new Match.
+    """
+    return set_up_queue(queue_type, p1_type, p2_type).copy
+
+
+def _add_remove_case(p1_type: str, p2_type: str) -> Callable[[], Any]:
+    """
+    Return a function that has the next character in a RestrictedBattleQueue
+    add themselves, then removes them, which leaves the queue as it was.
+    """
+    battle_queue = set_up_queue('r', p1_type, p2_type)
+
+    def add_remove() -> None:
+        battle_queue.add(battle_queue.peek())
+        battle_queue.remove()
+    return add_remove
+
+
+def _actions_case(character_type: str) -> Callable[[], Any]:
+    """
+    Return a function finding the available actions of a new character of
+    character_type. Its SP is set first, so they are worked out every call
+    rather than remembered.
+    """
+    character = set_up_queue('n', character_type, 'm').peek()
+
+    def get_actions() -> List[str]:
+        character.set_sp(character.get_sp())
+        return character.get_available_actions()
+    return get_actions
+
+
+def _pick_skill_case(compiled: bool) -> Callable[[], Any]:
+    """
+    Return a function picking the default SkillDecisionTree's skill for a
+    Sorcerer against a Rogue at each of the unittest positions, with the
+    tree itself or its CompiledSkillDecisionTree if compiled is True.
+    """
+    tree = create_default_tree()
+    pick = get_compiled(tree).pick_skill if compiled else tree.pick_skill
+    pairs = []
+    for position in UNITTEST_POSITIONS.values():
+        battle_queue = set_up_queue('n', 's', 'r', position)
+        caster = battle_queue.peek()
+        pairs.append((caster, caster.enemy))
+
+    def pick_skills() -> None:
+        for caster, target in pairs:
+            pick(caster, target)
+    return pick_skills
+
+
+def _search_cases(name: str, p1_type: str, p2_type: str,
+                  position: Tuple[int, int, int, int]) -> List[BenchmarkCase]:
+    """
+    Return the cases timing get_state_score and the select_attack of each
+    minimax playstyle in the scenario name.
+
+    Each RecursiveMinimax is new, with a new TranspositionTable, so every call
+    searches from scratch instead of finding the last call's scores.
+    """
+    def state_score() -> Callable[[], Any]:
+        battle_queue = set_up_queue('n', p1_type, p2_type, position)
+        return lambda: get_state_score(battle_queue)
+
+    def recursive() -> Callable[[], Any]:
+        battle_queue = set_up_queue('n', p1_type, p2_type, position)
+        return lambda: RecursiveMinimax(battle_queue).select_attack()
+
+    def iterative() -> Callable[[], Any]:
+        battle_queue = set_up_queue('n', p1_type, p2_type, position)
+        return IterativeMinimax(battle_queue).select_attack
+
+    return [BenchmarkCase('get_state_score/' + name, state_score),
+            BenchmarkCase('recursive_minimax.select_attack/' + name,
+                          recursive),
+            BenchmarkCase('iterative_minimax.select_attack/' + name,
+                          iterative)]
+
+
+def create_cases() -> List[BenchmarkCase]:
+    """
+    Return every case in the benchmark suite.
+
+    >>> names = [case.name for case in create_cases()]
+    >>> 'get_state_score/rogue_mage_40_6_14_35' in names
+    True
+    >>> len(names) == len(set(names))
+    True
+    """
+    cases = []
+    for queue_type, queue_name in [('n', 'battle_queue'),
+                                   ('r', 'restricted_battle_queue')]:
+        for name, (p1_type, p2_type) in FULL_MATCHUPS.items():
+            cases.append(BenchmarkCase(
+                '{}.copy/{}'.format(queue_name, name),
+                lambda q=queue_type, p1=p1_type, p2=p2_type:
+                _copy_case(q, p1, p2)))
+    for name, (p1_type, p2_type) in FULL_MATCHUPS.items():
+        cases.append(BenchmarkCase(
+            'restricted_battle_queue.add_remove/' + name,
+            lambda p1=p1_type, p2=p2_type: _add_remove_case(p1, p2)))
+    for character_type, name in [('m', 'mage'), ('r', 'rogue'),
+                                 ('v', 'vampire'), ('s', 'sorcerer')]:
+        cases.append(BenchmarkCase(
+            'get_available_actions/' + name,
+            lambda c=character_type: _actions_case(c)))
+    cases.append(BenchmarkCase('skill_decision_tree.pick_skill/default',
+                               lambda: _pick_skill_case(False)))
+    cases.append(BenchmarkCase('compiled_skill_decision_tree.pick_skill/'
+                               'default', lambda: _pick_skill_case(True)))
+    for scenario in _scenarios():
+        cases.extend(_search_cases(*scenario))
+    return cases
+
+
+def time_case(case: BenchmarkCase, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time case repeat times, each time calling it enough times to take at
+    least 0.2 seconds, and return the fastest and median seconds per call and
+    how many calls each repeat made.
+    """
+    timer = timeit.Timer(case.make())
+    number, _ = timer.autorange()
+    per_call = [total / number for total in timer.repeat(repeat, number)]
+    return {'best': min(per_call),
+            'median': statistics.median(per_call),
+            'number': number,
+            'repeat': repeat}
+
+
+def run(cases: List[BenchmarkCase], repeat: int = 5,
+        verbose: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Time every case in cases, and return their timings by name. If verbose
+    is True, each timing is printed as it is made.
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = time_case(case, repeat)
+        if verbose:
+            print('{:<60} {:>12.3f} us'.format(
+                case.name, results[case.name]['best'] * 1e6), flush=True)
+    return results
+
+
+def save(results: Dict[str, Dict[str, float]], path: str) -> None:
+    """
+    Write results to the JSON file path, with the Python and machine they
+    were measured on.
+    """
+    with open(path, 'w') as file:
+        json.dump({'python': platform.python_version(),
+                   'machine': platform.machine(),
+                   'results': results}, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def load(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Return the results saved to the JSON file path.
+    """
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Return a description of every case in results that is more than
+    threshold slower than in baseline. Cases missing from either are
+    skipped.
+
+    >>> baseline = {'a': {'best': 1e-6}, 'b': {'best': 2e-6}}
+    >>> compare({'a': {'best': 1.2e-6}, 'b': {'best': 3e-6},
+    ...          'c': {'best': 9e-6}}, baseline)
+    ['b: 3.000 us per call, 50% slower than 2.000 us']
+    >>> compare({'a': {'best': 1.2e-6}}, baseline, 0.1)
+    ['a: 1.200 us per call, 20% slower than 1.000 us']
+    """
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        best = results[name]['best']
+        expected = baseline[name]['best']
+        if best > expected * (1 + threshold):
+            regressions.append(
+                '{}: {:.3f} us per call, {:.0%} slower than {:.3f} us'.format(
+                    name, best * 1e6, best / expected - 1, expected * 1e6))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Time the hot paths of the A2 engine and compare them "
+                    "against a baseline.")
+    parser.add_argument('-k', '--filter', default='',
+                        help="only run the cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="the number of times each case is timed")
+    parser.add_argument('--output', default=DEFAULT_RESULTS,
+                        help="the JSON file the results are written to")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="the JSON file of the baseline results")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="how much slower than the baseline a case may "
+                             "be, as a fraction (default: 0.25)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="write the results to the baseline as well")
+    arguments = parser.parse_args()
+    selected = [case for case in create_cases()
+                if arguments.filter in case.name]
+    benchmark_results = run(selected, arguments.repeat, verbose=True)
+    save(benchmark_results, arguments.output)
+    if arguments.save_baseline:
+        save(benchmark_results, arguments.baseline)
+        print("Saved the baseline to {}".format(arguments.baseline))
+    elif not os.path.exists(arguments.baseline):
+        print("There is no baseline at {} to compare against; run with "
+              "--save-baseline to write one.".format(arguments.baseline))
+        sys.exit(1)
+    else:
+        slower = compare(benchmark_results, load(arguments.baseline),
+                         arguments.threshold)
+        for line in slower:
+            print("SLOWER: " + line)
+        if slower:
+            sys.exit(1)
+        print("No case is more than {:.0%} slower than the baseline.".format(
+            arguments.threshold))
@@ -0,0 +1,84 @@
+"""
+Unittests for the benchmark suite of A2.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from a2_benchmark import create_cases, time_case, run, save, load, compare
+
+
+class BenchmarkUnitTests(unittest.TestCase):
+    def test_every_case_runs(self):
+        """
+        Test to make sure every case can be set up and called, and that the
+        search cases pick an attack.
+        """
+        for case in create_cases():
+            result = case.make()()
+            if 'select_attack' in case.name:
+                self.assertIn(result, ['A', 'S'], case.name)
+
+    def test_results_compared_with_baseline(self):
+        """
+        Test to make sure results saved as a baseline can be loaded again,
+        and that only cases slower than the threshold are reported.
+        """
+        cases = [case for case in create_cases()
+                 if case.name.startswith('get_available_actions/')]
+        results = run(cases, repeat=1)
+        self.assertEqual(4, len(results))
+        timing = results['get_available_actions/mage']
+        self.assertEqual(1, timing['repeat'])
+        self.assertLessEqual(timing['best'], timing['median'])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            save(results, path)
+            baseline = load(path)
+        self.assertEqual(results, baseline)
+        self.assertEqual([], compare(results, baseline))
+
+        slower = dict(results)
+        slower['get_available_actions/rogue'] = \
+            {'best': baseline['get_available_actions/rogue']['best'] * 2}
+        regressions = compare(slower, baseline, 0.5)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith(
+            'get_available_actions/rogue: '))
+        self.assertEqual([], compare(slower, baseline, 1.5))
+
+    def test_time_case(self):
+        """
+        Test to make sure time_case calls a case enough times to time it.
+        """
+        case = create_cases()[0]
+        timing = time_case(case, repeat=2)
+        self.assertGreaterEqual(timing['number'] * timing['best'] * 2, 0.1)
+        self.assertEqual(2, timing['repeat'])
+
+    def test_missing_baseline_fails(self):
+        """
+        Test to make sure a run fails when there is no baseline to compare
+        against, unless it is saving one.
+        """
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'a2_benchmark.py')
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            command = [sys.executable, script,
+                       '-k', 'get_available_actions/rogue', '--repeat', '1',
+                       '--output', os.path.join(directory, 'results.json'),
+                       '--baseline', baseline]
+            missing = subprocess.run(command, stdout=subprocess.PIPE)
+            self.assertEqual(1, missing.returncode,
+                             "A run without a baseline should fail.")
+            saved = subprocess.run(command + ['--save-baseline'],
+                                   stdout=subprocess.PIPE)
+            self.assertEqual(0, saved.returncode)
+            self.assertTrue(os.path.exists(baseline))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -12,8 +12,16 @@ Sorcerers must have a method called set_skill_decision_tree which takes in
 a SkillDecisionTree to be used whenever the Sorcerer attacks.
 """
 from typing import List
-from a2_skills import MageAttack, MageSpecial, RogueAttack, RogueSpecial, \
-    VampireAttack, VampireSpecial, SorcererAttack, SorcererSpecial
+from a2_skills import MAGE_ATTACK, MAGE_SPECIAL, ROGUE_ATTACK, \
+    ROGUE_SPECIAL, VAMPIRE_ATTACK, VAMPIRE_SPECIAL, SORCERER_ATTACK, \
+    SORCERER_SPECIAL
+
+# The skills of each type of Character, shared by every Character of that
+# type.
+_MAGE_SKILLS = {'A': MAGE_ATTACK, 'S': MAGE_SPECIAL}
+_ROGUE_SKILLS = {'A': ROGUE_ATTACK, 'S': ROGUE_SPECIAL}
+_VAMPIRE_SKILLS = {'A': VAMPIRE_ATTACK, 'S': VAMPIRE_SPECIAL}
+_SORCERER_SKILLS = {'A': SORCERER_ATTACK, 'S': SORCERER_SPECIAL}
 
 
 class Character:
@@ -27,6 +35,11 @@ class Character:
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
 
+    __slots__ = ('_name', 'battle_queue', '_playstyle', '_playstyle_source',
+                 '_hp', '_sp', '_defense', 'enemy', '_character_type',
+                 '_current_state', '_current_frame', '_skills',
+                 '_available_actions')
+
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
         Initialize this Character with the name name, battle_queue bq, and
@@ -47,6 +60,29 @@ class Character:
         self._skills = {'A': None,
                         'S': None
                        }
+        # The actions available at the current SP, or None if SP has changed
+        # since they were last found.
+        self._available_actions = None
+
+    @property
+    def playstyle(self) -> 'Playstyle':
+        """
+        Return the Playstyle of this Character. A copied Character only
+        copies the Playstyle of the Character it was copied from the first
+        time it is needed.
+        """
+        if self._playstyle is None:
+            self._playstyle = self._playstyle_source.copy(self.battle_queue)
+            self._playstyle_source = None
+        return self._playstyle
+
+    @playstyle.setter
+    def playstyle(self, ps: 'Playstyle') -> None:
+        """
+        Set the Playstyle of this Character to ps.
+        """
+        self._playstyle = ps
+        self._playstyle_source = None
 
     def get_name(self) -> str:
         """
@@ -88,13 +124,11 @@ class Character:
         'A' means that the character can attack().
         'S' means that the character can special_attack().
         """
-        available = []
+        if self._available_actions is None:
+            self._available_actions = tuple(
+                skill for skill in self._skills if self.is_valid_action(skill))
 
-        for skill in self._skills:
-            if self.is_valid_action(skill):
-                available.append(skill)
-
-        return available
+        return list(self._available_actions)
 
     def is_valid_action(self, action: str) -> bool:
         """
@@ -129,6 +163,7 @@ class Character:
         Reduce this Character's SP by cost.
         """
         self._sp -= cost
+        self._available_actions = None
 
     def apply_damage(self, damage: int) -> None:
         """
@@ -144,6 +179,7 @@ class Character:
         Sets this Character's SP to new_sp.
         """
         self._sp = new_sp
+        self._available_actions = None
 
     def set_hp(self, new_hp: int) -> None:
         """
@@ -167,12 +203,28 @@ class Character:
         """
         raise NotImplementedError
 
-    def _set_copy_attributes(self, other: 'Character') -> None:
-        """
-        Set other's attributes to match this Character's.
-        """
-        other.set_hp(self._hp)
-        other.set_sp(self._sp)
+    def _copy_base(self, new_battle_queue: 'BattleQueue') -> 'Character':
+        """
+        Return a copy of this Character whose BattleQueue is new_battle_queue,
+        without calling __init__. The copy shares this Character's name and
+        skills, and only copies its Playstyle when the copy's is first used.
+        """
+        copy = object.__new__(type(self))
+        copy._name = self._name
+        copy.battle_queue = new_battle_queue
+        copy._playstyle = None
+        copy._playstyle_source = self._playstyle if self._playstyle \
+            is not None else self._playstyle_source
+        copy._hp = self._hp
+        copy._sp = self._sp
+        copy._defense = self._defense
+        copy.enemy = None
+        copy._character_type = self._character_type
+        copy._current_state = 'idle'
+        copy._current_frame = 0
+        copy._skills = self._skills
+        copy._available_actions = self._available_actions
+        return copy
 
 
 class Mage(Character):
@@ -186,6 +238,8 @@ class Mage(Character):
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
 
+    __slots__ = ()
+
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
         Initialize this Mage with the name name, battle_queue bq, and
@@ -203,8 +257,7 @@ class Mage(Character):
         """
         super().__init__(name, bq, ps)
         self._character_type = 'mage'
-        self._skills['A'] = MageAttack()
-        self._skills['S'] = MageSpecial()
+        self._skills = _MAGE_SKILLS
         self._defense = 8
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Mage':
@@ -235,10 +288,7 @@ class Mage(Character):
         >>> c2_copy
         m2 (Mage): 88/100
         """
-        copy = Mage(self._name, new_battle_queue,
-                    self.playstyle.copy(new_battle_queue))
-        self._set_copy_attributes(copy)
-        return copy
+        return self._copy_base(new_battle_queue)
 
 class Rogue(Character):
     """
@@ -251,6 +301,8 @@ class Rogue(Character):
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
 
+    __slots__ = ()
+
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
         Initialize this Rogue with the name name, battle_queue bq, and
@@ -268,8 +320,7 @@ class Rogue(Character):
         """
         super().__init__(name, bq, ps)
         self._character_type = 'rogue'
-        self._skills['A'] = RogueAttack()
-        self._skills['S'] = RogueSpecial()
+        self._skills = _ROGUE_SKILLS
         self._defense = 10
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Rogue':
@@ -300,10 +351,7 @@ class Rogue(Character):
         >>> c2_copy
         r2 (Rogue): 95/100
         """
-        copy = Rogue(self._name, new_battle_queue,
-                     self.playstyle.copy(new_battle_queue))
-        self._set_copy_attributes(copy)
-        return copy
+        return self._copy_base(new_battle_queue)
 
 
 class Vampire(Character):
@@ -317,6 +365,8 @@ class Vampire(Character):
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
 
+    __slots__ = ()
+
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
         Initialize this Vampire with the name name, battle_queue bq, and
@@ -334,8 +384,7 @@ class Vampire(Character):
         """
         super().__init__(name, bq, ps)
         self._character_type = 'vampire'
-        self._skills['A'] = VampireAttack()
-        self._skills['S'] = VampireSpecial()
+        self._skills = _VAMPIRE_SKILLS
         self._defense = 3
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Vampire':
@@ -366,10 +415,7 @@ class Vampire(Character):
         >>> c2_copy
         v2 (Vampire): 83/100
         """
-        copy = Vampire(self._name, new_battle_queue,
-                       self.playstyle.copy(new_battle_queue))
-        self._set_copy_attributes(copy)
-        return copy
+        return self._copy_base(new_battle_queue)
 
     def restore_hp(self, value: int) -> None:
         """
@@ -385,9 +431,13 @@ class Sorcerer(Character):
     battle_queue - the BattleQueue that this Sorcerer will add to.
     playstyle - the Playstyle that this Sorcerer uses to pick actions.
     enemy - the Sorcerer that this Sorcerer attacks.
+    skill_decision_tree - the SkillDecisionTree this Sorcerer attacks with.
     """
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
+    skill_decision_tree: 'SkillDecisionTree'
+
+    __slots__ = ('skill_decision_tree',)
 
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
@@ -406,8 +456,7 @@ class Sorcerer(Character):
         """
         super().__init__(name, bq, ps)
         self._character_type = 'sorcerer'
-        self._skills['A'] = SorcererAttack()
-        self._skills['S'] = SorcererSpecial()
+        self._skills = _SORCERER_SKILLS
         self._defense = 10
         self.skill_decision_tree = None
 
@@ -445,10 +494,8 @@ class Sorcerer(Character):
         >>> c2_copy
         s2 (Sorcerer): 85/100
         """
-        copy = Sorcerer(self._name, new_battle_queue,
-                        self.playstyle.copy(new_battle_queue))
-        copy.set_skill_decision_tree(self.skill_decision_tree)
-        self._set_copy_attributes(copy)
+        copy = self._copy_base(new_battle_queue)
+        copy.skill_decision_tree = self.skill_decision_tree
         return copy
 
 
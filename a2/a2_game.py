@@ -11,9 +11,13 @@ We will not grade the documentation of this file.
 # Import classes as needed
 from a2_battle_queue import BattleQueue, RestrictedBattleQueue
 from a2_playstyle import ManualPlaystyle, RandomPlaystyle, \
-    RecursiveMinimax, IterativeMinimax
+    RecursiveMinimax, IterativeMinimax, AlphaBetaRecursiveMinimax, \
+    AlphaBetaIterativeMinimax, IterativeDeepeningMinimax, ParallelMinimax, \
+    MemoryBoundedIterativeMinimax, ExpectimaxPlaystyle
 from a2_characters import Mage, Rogue, Vampire, Sorcerer
 from a2_skill_decision_tree import create_default_tree
+from a2_tablebase import TablebasePlaystyle
+from a2_mcts import MCTSPlaystyle
 
 # Replace None with the name of your Character classes
 # v should map to your class for your Vampire
@@ -30,77 +34,224 @@ CHARACTER_CLASSES = {'m': Mage,
 PLAYSTYLE_CLASSES = {'m': ManualPlaystyle,
                      'r': RandomPlaystyle,
                      'mr': RecursiveMinimax,
-                     'mi': IterativeMinimax
+                     'mi': IterativeMinimax,
+                     'mra': AlphaBetaRecursiveMinimax,
+                     'mia': AlphaBetaIterativeMinimax,
+                     'mid': IterativeDeepeningMinimax,
+                     'mim': MemoryBoundedIterativeMinimax,
+                     'mrp': ParallelMinimax,
+                     'ex': ExpectimaxPlaystyle,
+                     'tb': TablebasePlaystyle,
+                     'mc': MCTSPlaystyle
                     }
 
 BATTLE_QUEUE_CLASSES = {'n': BattleQueue,
                         'r': RestrictedBattleQueue
                         }
 
-# Do not change any of the code below
-# You may NOT use or modify any of the variables defined below within your code
-# they're only to be used by a1_game.py and a1_ui.py.
-# (i.e. don't reference BATTLE_QUEUE, LAST_KEY_PRESSED, P1, P2, GAME_IS_OVER,
-#  or GAME_WINNER anywhere in your code.)
-BATTLE_QUEUE = None
-LAST_KEY_PRESSED = None
-P1 = None
-P2 = None
-GAME_IS_OVER = False
-GAME_WINNER = None
 
-def perform_attack():
+class Match:
     """
-    Uses the next character's playstyle to decide on and perform an attack.
+    One game between two characters: its battle queue, its characters and
+    whether it is over. Many Matches can be played at once in one process.
+
+    battle_queue - the BattleQueue holding this Match's characters.
+    p1 - the first character.
+    p2 - the second character.
+    game_is_over - whether this Match is over.
+    game_winner - the character that won this Match, or None.
+    last_key_pressed - the last key pressed, for manual playstyles.
     """
-    global BATTLE_QUEUE, GAME_IS_OVER, GAME_WINNER, LAST_KEY_PRESSED
-
-    # Get the next character in the battle queue, but don't remove them.
-    next_character = BATTLE_QUEUE.peek()
-    playstyle = next_character.playstyle
-
-    # Uses the next character's playstyle to select an attack
-    if playstyle.is_manual:
-        move_to_make = playstyle.select_attack(LAST_KEY_PRESSED)
-    else:
-        move_to_make = playstyle.select_attack()
-
-    # Check if the next_character can make that action ('A' represents
-    # a normal attack, 'S' represents a special attack.)
-    # If a move that is not 'A' or 'S' is passed in, this should return False.
-    if next_character.is_valid_action(move_to_make):
-        if move_to_make == 'A':
-            next_character.attack()
+    battle_queue: 'BattleQueue'
+    p1: 'Character'
+    p2: 'Character'
+    game_is_over: bool
+    game_winner: 'Character'
+    last_key_pressed: str
+
+    def __init__(self) -> None:
+        """
+        Initialize this Match before its game is set up.
+        """
+        self.battle_queue = None
+        self.p1 = None
+        self.p2 = None
+        self.game_is_over = False
+        self.game_winner = None
+        self.last_key_pressed = None
+
+    def set_up(self, queue_type: str, player_1: str, player_1_name: str,
+               player_1_playstyle: str, player_2: str, player_2_name: str,
+               player_2_playstyle: str) -> None:
+        """
+        Set up the battle queue and characters for this Match. Each type is a
+        key of BATTLE_QUEUE_CLASSES, CHARACTER_CLASSES or PLAYSTYLE_CLASSES.
+
+        >>> match = Match()
+        >>> match.set_up('n', 'r', 'R', 'mr', 'm', 'M', 'r')
+        >>> match.battle_queue
+        R (Rogue): 100/100 -> M (Mage): 100/100
+        """
+        self.battle_queue = BATTLE_QUEUE_CLASSES[queue_type]()
+        self.game_is_over = False
+        self.game_winner = None
+
+        # Store the classes in other variable names for convenience
+        P1_Character = CHARACTER_CLASSES[player_1]
+        P2_Character = CHARACTER_CLASSES[player_2]
+        p1_playstyle = PLAYSTYLE_CLASSES[player_1_playstyle](self.battle_queue)
+        p2_playstyle = PLAYSTYLE_CLASSES[player_2_playstyle](self.battle_queue)
+
+        # Call the corresponding __init__ for each player's character class
+        # The parameters passed in are: their name, the battle queue and an
+        # instance of their playstyle
+        self.p1 = P1_Character(player_1_name, self.battle_queue, p1_playstyle)
+        self.p2 = P2_Character(player_2_name, self.battle_queue, p2_playstyle)
+
+        if player_1 == 's':
+            default_tree = create_default_tree()
+            self.p1.set_skill_decision_tree(default_tree)
+
+        if player_2 == 's':
+            default_tree = create_default_tree()
+            self.p2.set_skill_decision_tree(default_tree)
+
+        # Set the enemy attribute of the characters
+        # You can assume this will be called before any attacks are performed
+        self.p1.enemy = self.p2
+        self.p2.enemy = self.p1
+
+        # Add the characters to the Battle Queue
+        self.battle_queue.add(self.p1)
+        self.battle_queue.add(self.p2)
+
+    def select_attack(self) -> str:
+        """
+        Return the attack the next character's playstyle decides on.
+        """
+        playstyle = self.battle_queue.peek().playstyle
+
+        if playstyle.is_manual:
+            return playstyle.select_attack(self.last_key_pressed)
+        return playstyle.select_attack()
+
+    def apply_move(self, move_to_make: str) -> bool:
+        """
+        Have the next character perform move_to_make, and return whether it
+        was a valid action. Invalid moves leave the game unchanged.
+
+        >>> match = Match()
+        >>> match.set_up('n', 'r', 'R', 'm', 'm', 'M', 'm')
+        >>> match.apply_move('S')
+        True
+        >>> match.apply_move('X')
+        False
+        >>> match.battle_queue
+        M (Mage): 88/100 -> R (Rogue): 100/90 -> R (Rogue): 100/90
+        """
+        # Get the next character in the battle queue, but don't remove them.
+        next_character = self.battle_queue.peek()
+
+        # Check if the next_character can make that action ('A' represents
+        # a normal attack, 'S' represents a special attack.)
+        # If a move that is not 'A' or 'S' is passed in, this should return
+        # False.
+        is_valid = next_character.is_valid_action(move_to_make)
+        if is_valid:
+            if move_to_make == 'A':
+                next_character.attack()
+            else:
+                next_character.special_attack()
+
+            # Call remove() to remove the next_character from the
+            # battle_queue (if they still have SP; otherwise the next call
+            # to remove() should skip them)
+            if next_character.get_available_actions() != []:
+                self.battle_queue.remove()
+
+        # Check if the game is over.
+        self.game_is_over = self.battle_queue.is_over()
+
+        # Get the winner of the game. If the game is not over yet,
+        # get_winner() should return None. Otherwise, it should return the
+        # character that won.
+        self.game_winner = self.battle_queue.get_winner()
+        return is_valid
+
+    def perform_attack(self) -> None:
+        """
+        Uses the next character's playstyle to decide on and perform an
+        attack.
+        """
+        self.apply_move(self.select_attack())
+
+    def close(self) -> None:
+        """
+        Close the playstyles of this Match's characters, shutting down any
+        worker processes they started. Call this once the Match is done with.
+        """
+        for character in [self.p1, self.p2]:
+            if character is not None:
+                character.playstyle.close()
+
+    def update_ui(self) -> dict:
+        """
+        Return the parameters to update the UI for this Match.
+        """
+        # Get the names
+        p1_name = self.p1.get_name()
+        p2_name = self.p2.get_name()
+
+        # Get the sprite to draw
+        p1_current_sprite = self.p1.get_next_sprite()
+        p2_current_sprite = self.p2.get_next_sprite()
+
+        # Get the character HPs
+        p1_current_hp = self.p1.get_hp()
+        p2_current_hp = self.p2.get_hp()
+
+        # Get the character SPs
+        p1_current_sp = self.p1.get_sp()
+        p2_current_sp = self.p2.get_sp()
+
+        if not self.battle_queue.is_over():
+            # Get the actions that the current player can make (this should
+            # be a list containing 'A' and/or 'S', or be empty if there are no
+            # actions.)
+            current_available_actions = \
+                self.battle_queue.peek().get_available_actions()
+
+            # Get the current player's name
+            current_player = self.battle_queue.peek().get_name()
         else:
-            next_character.special_attack()
+            current_available_actions = []
+            current_player = None
 
-        # Call remove() to remove the next_character from the battle_queue
-        # (if they still have SP; otherwise the next call to remove()
-        # should skip them)
-        if next_character.get_available_actions() != []:
-            BATTLE_QUEUE.remove()
+        ui_to_draw = {'p1_sprite': p1_current_sprite,
+                      'p2_sprite': p2_current_sprite,
+                      'p1_hp': p1_current_hp,
+                      'p2_hp': p2_current_hp,
+                      'p1_sp': p1_current_sp,
+                      'p2_sp': p2_current_sp,
+                      'p1_name': p1_name,
+                      'p2_name': p2_name,
+                      'actions': current_available_actions,
+                      'current_player': current_player}
 
-    # Check if the game is over.
-    GAME_IS_OVER = BATTLE_QUEUE.is_over()
+        return ui_to_draw
 
-    # Get the winner of the game. If the game is not over yet, get_winner()
-    # should return None. Otherwise, it should return the character that won.
-    GAME_WINNER = BATTLE_QUEUE.get_winner()
 
-def set_up_game():
+def prompt_for_match() -> Match:
     """
-    Sets up the battle queue and characters for the game.
+    Return a new Match set up from the battle queue, characters and
+    playstyles chosen at the input() prompts.
     """
-    global P1, P2, BATTLE_QUEUE
-
     # Create a new battle queue
     bq = ''
     while bq not in list(BATTLE_QUEUE_CLASSES.keys()):
         bq = input("Select a Battle Queue type (n for a Normal Battle Queue, " +
                    "r for a Restricted Battle Queue): ").strip()
 
-    BATTLE_QUEUE = BATTLE_QUEUE_CLASSES[bq]()
-
     # Get the parameters for the first character
     player_1 = ''
     player_1_playstyle = ''
@@ -116,7 +267,14 @@ def set_up_game():
         player_1_playstyle = input("Select a playstyle for the first " +
                                    "character (m for Manual, r for Random, " +
                                    "mr for Minimax (Recursive), " +
-                                   "mi for Minimax (Iterative)): ")
+                                   "mi for Minimax (Iterative), " +
+                                   "mra/mia for Minimax with alpha-beta " +
+                                   "pruning, mid for time-limited " +
+                                   "Minimax, mim for memory-bounded " +
+                                   "Minimax, mrp for parallel Minimax, " +
+                                   "ex for Expectimax, " +
+                                   "tb for Tablebase, mc for Monte Carlo " +
+                                   "Tree Search): ")
         player_1_playstyle = player_1_playstyle.strip()
 
     # Get the parameters for the second character
@@ -134,37 +292,80 @@ def set_up_game():
         player_2_playstyle = input("Select a playstyle for the second " +
                                    "character (m for Manual, r for Random, " +
                                    "mr for Minimax (Recursive), " +
-                                   "mi for Minimax (Iterative)): ")
+                                   "mi for Minimax (Iterative), " +
+                                   "mra/mia for Minimax with alpha-beta " +
+                                   "pruning, mid for time-limited " +
+                                   "Minimax, mim for memory-bounded " +
+                                   "Minimax, mrp for parallel Minimax, " +
+                                   "ex for Expectimax, " +
+                                   "tb for Tablebase, mc for Monte Carlo " +
+                                   "Tree Search): ")
         player_2_playstyle = player_2_playstyle.strip()
 
-    # Store the classes in other variable names for convenience
-    P1_Character = CHARACTER_CLASSES[player_1]
-    P2_Character = CHARACTER_CLASSES[player_2]
-    p1_playstyle = PLAYSTYLE_CLASSES[player_1_playstyle](BATTLE_QUEUE)
-    p2_playstyle = PLAYSTYLE_CLASSES[player_2_playstyle](BATTLE_QUEUE)
+    match = Match()
+    match.set_up(bq, player_1, player_1_name, player_1_playstyle,
+                 player_2, player_2_name, player_2_playstyle)
+    return match
 
-    # Call the corresponding __init__ for each player's character class
-    # The parameters passed in are: their name, the battle queue and an
-    # instance of their playstyle
-    P1 = P1_Character(player_1_name, BATTLE_QUEUE, p1_playstyle)
-    P2 = P2_Character(player_2_name, BATTLE_QUEUE, p2_playstyle)
 
-    if player_1 == 's':
-        default_tree = create_default_tree()
-        P1.set_skill_decision_tree(default_tree)
+# The module functions below play the Match in DEFAULT_MATCH, and copy its
+# state into these variables for a2_ui.py and a2_ui_nonpygame.py.
+# You may NOT use or modify any of the variables defined below within your code
+# they're only to be used by a2_game.py and the UIs.
+# (i.e. don't reference BATTLE_QUEUE, LAST_KEY_PRESSED, P1, P2, GAME_IS_OVER,
+#  or GAME_WINNER anywhere in your code.)
+DEFAULT_MATCH = Match()
+BATTLE_QUEUE = None
+LAST_KEY_PRESSED = None
+P1 = None
+P2 = None
+GAME_IS_OVER = False
+GAME_WINNER = None
+
+def _sync_globals():
+    """
+    Copy the state of DEFAULT_MATCH into the module variables.
+    """
+    global BATTLE_QUEUE, P1, P2, GAME_IS_OVER, GAME_WINNER
+
+    BATTLE_QUEUE = DEFAULT_MATCH.battle_queue
+    P1 = DEFAULT_MATCH.p1
+    P2 = DEFAULT_MATCH.p2
+    GAME_IS_OVER = DEFAULT_MATCH.game_is_over
+    GAME_WINNER = DEFAULT_MATCH.game_winner
+
+def set_default_match(match):
+    """
+    Make match the Match the module functions play, and copy its state into
+    the module variables.
+    """
+    global DEFAULT_MATCH
 
-    if player_2 == 's':
-        default_tree = create_default_tree()
-        P2.set_skill_decision_tree(default_tree)
+    DEFAULT_MATCH = match
+    _sync_globals()
 
-    # Set the enemy attribute of the characters
-    # You can assume this will be called before any attacks are performed
-    P1.enemy = P2
-    P2.enemy = P1
+def perform_attack():
+    """
+    Uses the next character's playstyle to decide on and perform an attack.
+    """
+    DEFAULT_MATCH.last_key_pressed = LAST_KEY_PRESSED
+    DEFAULT_MATCH.perform_attack()
+    _sync_globals()
 
-    # Add the characters to the Battle Queue
-    BATTLE_QUEUE.add(P1)
-    BATTLE_QUEUE.add(P2)
+def apply_move(move_to_make):
+    """
+    Have the next character perform move_to_make, which their playstyle
+    decided on, and return whether it was a valid action.
+    """
+    is_valid = DEFAULT_MATCH.apply_move(move_to_make)
+    _sync_globals()
+    return is_valid
+
+def set_up_game():
+    """
+    Sets up the battle queue and characters for the game.
+    """
+    set_default_match(prompt_for_match())
 
 def update_ui():
     """
@@ -174,44 +375,4 @@ def update_ui():
     pygame methods here, or having you read through a1_ui.py to find client
     code. Silly is the better option, in this case. :)
     """
-    global P1, P2, BATTLE_QUEUE
-
-    # Get the names
-    p1_name = P1.get_name()
-    p2_name = P2.get_name()
-
-    # Get the sprite to draw
-    p1_current_sprite = P1.get_next_sprite()
-    p2_current_sprite = P2.get_next_sprite()
-
-    # Get the character HPs
-    p1_current_hp = P1.get_hp()
-    p2_current_hp = P2.get_hp()
-
-    # Get the character SPs
-    p1_current_sp = P1.get_sp()
-    p2_current_sp = P2.get_sp()
-
-    if not BATTLE_QUEUE.is_over():
-        # Get the actions that the current player can make (this should be a
-        # list containing 'A' and/or 'S', or be empty if there are no actions.)
-        current_available_actions = BATTLE_QUEUE.peek().get_available_actions()
-
-        # Get the current player's name
-        current_player = BATTLE_QUEUE.peek().get_name()
-    else:
-        current_available_actions = []
-        current_player = None
-
-    ui_to_draw = {'p1_sprite': p1_current_sprite,
-                  'p2_sprite': p2_current_sprite,
-                  'p1_hp': p1_current_hp,
-                  'p2_hp': p2_current_hp,
-                  'p1_sp': p1_current_sp,
-                  'p2_sp': p2_current_sp,
-                  'p1_name': p1_name,
-                  'p2_name': p2_name,
-                  'actions': current_available_actions,
-                  'current_player': current_player}
-
-    return ui_to_draw
+    return DEFAULT_MATCH.update_ui()
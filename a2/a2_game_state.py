@@ -0,0 +1,448 @@
+"""
+The GameState class for A2.
+
+A GameState is an immutable, hashable snapshot of everything that decides how
+a game carries on: both players' types, HP, SP and skill decision trees, and
+the order of the BattleQueue. Searching over GameStates is much cheaper than
+copying BattleQueues, since a move creates one new GameState instead of a new
+BattleQueue, two Characters, their Skills and their Playstyles.
+
+Players are numbered 0 (the first character added to the BattleQueue) and 1.
+"""
+from typing import Any, List, NamedTuple, Tuple, Union
+from a2_skill_decision_tree import get_shared, get_tabulated
+from a2_skills import MageAttack, MageSpecial, RogueAttack, RogueSpecial, \
+    VampireAttack, VampireSpecial, SorcererAttack, SorcererSpecial
+
+# The target of an add to the queue: the caster or the target of a skill.
+CASTER = 0
+TARGET = 1
+
+# For each skill: the damage it deals, whether the caster restores the HP the
+# target lost, and who it adds to the queue, in order.
+SKILL_EFFECTS = {MageAttack: (20, False, (CASTER,)),
+                 MageSpecial: (40, False, (TARGET, CASTER)),
+                 RogueAttack: (15, False, (CASTER,)),
+                 RogueSpecial: (20, False, (CASTER, CASTER)),
+                 VampireAttack: (20, True, (CASTER,)),
+                 VampireSpecial: (30, True, (CASTER, CASTER, TARGET)),
+                 SorcererSpecial: (25, False, (CASTER, TARGET, CASTER))}
+
+# For each type of character: its defense and its 'A' and 'S' skills.
+CHARACTER_KINDS = {'Mage': (8, MageAttack, MageSpecial),
+                   'Rogue': (10, RogueAttack, RogueSpecial),
+                   'Vampire': (3, VampireAttack, VampireSpecial),
+                   'Sorcerer': (10, SorcererAttack, SorcererSpecial)}
+
+# The SP cost of each skill.
+SKILL_COSTS = {skill: skill().get_sp_cost()
+               for skill in list(SKILL_EFFECTS) + [SorcererAttack]}
+
+# For each type of character: the SP costs of its 'A' and 'S' skills.
+ACTION_COSTS = {kind: (SKILL_COSTS[attack], SKILL_COSTS[special])
+                for kind, (_, attack, special) in CHARACTER_KINDS.items()}
+
+
+def pick_sorcerer_skill(tree: 'SkillDecisionTree', caster_hp: int,
+                        caster_sp: int, target_hp: int,
+                        target_sp: int) -> 'Skill':
+    """
+    Return the skill tree picks for a caster and target with the given HP and
+    SP, using the tree's SkillLookupTable.
+
+    >>> from a2_skill_decision_tree import create_default_tree
+    >>> type(pick_sorcerer_skill(create_default_tree(), 100, 100, 100, 100))
+    <class 'a2_skills.RogueSpecial'>
+    """
+    return get_tabulated(tree).pick_by_stats(caster_hp, caster_sp, target_hp,
+                                             target_sp)
+
+
+class _Battle:
+    """
+    A mutable scratch copy of a GameState that mirrors how a BattleQueue and
+    its Characters change while a move is performed.
+    """
+
+    __slots__ = ('kinds', 'trees', 'hp', 'sp', 'queue', 'able', 'counts')
+
+    def __init__(self, state: 'GameState') -> None:
+        """
+        Initialize this _Battle from state.
+        """
+        self.kinds = state.kinds
+        self.trees = state.trees
+        self.hp = [state.hp1, state.hp2]
+        self.sp = [state.sp1, state.sp2]
+        self.queue = list(state.queue)
+        self.able = None
+        self.counts = [0, 0]
+        if state.able is not None:
+            self.able = list(state.able)
+            for player, able in zip(state.queue, state.able):
+                if able:
+                    self.counts[player] += 1
+
+    def has_actions(self, player: int) -> bool:
+        """
+        Return whether player has enough SP to use a skill.
+        """
+        return min(ACTION_COSTS[self.kinds[player]]) <= self.sp[player]
+
+    def clean(self) -> None:
+        """
+        Remove the players at the front of the queue that have no actions.
+        """
+        while self.queue and not self.has_actions(self.queue[0]):
+            self._pop()
+
+    def _pop(self) -> int:
+        """
+        Remove and return the player at the front of the queue.
+        """
+        player = self.queue.pop(0)
+        if self.able is not None and self.able.pop(0) and \
+                self.counts[player] > 0:
+            self.counts[player] -= 1
+        return player
+
+    def peek(self) -> int:
+        """
+        Return the player at the front of the queue, or the first player if
+        the queue is empty.
+        """
+        self.clean()
+        return self.queue[0] if self.queue else 0
+
+    def remove(self) -> int:
+        """
+        Remove and return the player at the front of the queue.
+        """
+        self.clean()
+        return self._pop()
+
+    def add(self, player: int) -> None:
+        """
+        Add player to the queue, following the RestrictedBattleQueue rules if
+        this _Battle has able to add flags.
+        """
+        if self.able is None:
+            self.queue.append(player)
+            return
+        if self.able and not self.able[0]:
+            return
+        first_time = player not in self.queue
+        self.queue.append(player)
+        if first_time:
+            self.able.append(True)
+            self.counts[player] += 1
+        elif self.queue[0] != player or self.counts[player] >= 2:
+            self.able.append(False)
+        else:
+            self.able.append(True)
+            self.counts[player] += 1
+
+    def damage(self, target: int, damage: int) -> None:
+        """
+        Deal damage to target, reduced by target's defense.
+        """
+        defense = CHARACTER_KINDS[self.kinds[target]][0]
+        self.hp[target] = max(self.hp[target] - (damage - defense), 0)
+
+    def use(self, caster: int, action: str) -> None:
+        """
+        Make caster use the skill for action on the other player.
+        """
+        target = 1 - caster
+        _, attack, special = CHARACTER_KINDS[self.kinds[caster]]
+        skill = attack if action == 'A' else special
+        if skill is SorcererAttack:
+            picked = type(pick_sorcerer_skill(
+                self.trees[caster], self.hp[caster], self.sp[caster],
+                self.hp[target], self.sp[target]))
+            self.sp[caster] -= SKILL_COSTS[skill]
+            if picked not in (MageAttack, RogueAttack, MageSpecial,
+                              RogueSpecial):
+                return
+            skill = picked
+        else:
+            self.sp[caster] -= SKILL_COSTS[skill]
+        damage, lifesteal, adds = SKILL_EFFECTS[skill]
+        hp_original = self.hp[target]
+        self.damage(target, damage)
+        if lifesteal:
+            self.hp[caster] += hp_original - self.hp[target]
+        if skill is SorcererSpecial:
+            self.clean()
+            while self.queue:
+                self.remove()
+                self.clean()
+        for who in adds:
+            self.add(caster if who == CASTER else target)
+
+    def freeze(self) -> 'GameState':
+        """
+        Return the GameState this _Battle is in.
+        """
+        able = None
+        if self.able is not None:
+            able = normalize_able(self.queue)
+        return GameState(self.kinds, self.trees, self.hp[0], self.sp[0],
+                         self.hp[1], self.sp[1], tuple(self.queue), able)
+
+
+def normalize_able(queue: Union[List[int], Tuple[int, ...]]) \
+        -> Tuple[bool, ...]:
+    """
+    Return the able to add flags a RestrictedBattleQueue has after copying a
+    RestrictedBattleQueue in the order queue.
+
+    >>> normalize_able((0, 1, 1, 0, 0))
+    (True, True, False, True, False)
+    >>> normalize_able((0, 0, 0, 1))
+    (True, True, False, True)
+    """
+    # Adding only looks at the queue, so the players' stats do not matter.
+    battle = _Battle(GameState(('', ''), (None, None), 0, 0, 0, 0, (), ()))
+    for player in queue:
+        battle.add(player)
+    return tuple(battle.able)
+
+
+class GameState(NamedTuple):
+    """
+    An immutable snapshot of a game.
+
+    kinds - the types of the two players, e.g. ('Rogue', 'Mage').
+    trees - the SkillDecisionTrees of the two players (None for players that
+            are not Sorcerers). GameStates made by from_battle_queue hold the
+            trees' shared copies (see get_shared).
+    hp1, sp1 - the HP and SP of the first player.
+    hp2, sp2 - the HP and SP of the second player.
+    queue - the order of the BattleQueue, as player numbers.
+    able - the able to add flags of a RestrictedBattleQueue, or None for a
+           plain BattleQueue.
+    """
+    kinds: Tuple[str, str]
+    trees: Tuple[Any, Any]
+    hp1: int
+    sp1: int
+    hp2: int
+    sp2: int
+    queue: Tuple[int, ...]
+    able: Union[Tuple[bool, ...], None]
+
+    @classmethod
+    def from_battle_queue(cls, battle_queue: 'BattleQueue') -> 'GameState':
+        """
+        Return the GameState of the game being carried out in battle_queue.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> state = GameState.from_battle_queue(bq)
+        >>> state.kinds, state.queue, state.able
+        (('Rogue', 'Mage'), (0, 1), None)
+        """
+        from a2_battle_queue import RestrictedBattleQueue
+        signature = battle_queue.get_signature()
+        queue = signature[8]
+        able = None
+        if isinstance(battle_queue, RestrictedBattleQueue):
+            able = normalize_able(queue)
+        trees = tuple(None if tree is None else get_shared(tree)
+                      for tree in (signature[3], signature[7]))
+        return cls((signature[0], signature[4]), trees, signature[1],
+                   signature[2], signature[5], signature[6], queue, able)
+
+    def get_hp(self, player: int) -> int:
+        """
+        Return the HP of player.
+        """
+        return self.hp2 if player else self.hp1
+
+    def get_sp(self, player: int) -> int:
+        """
+        Return the SP of player.
+        """
+        return self.sp2 if player else self.sp1
+
+    def get_available_actions(self, player: int) -> List[str]:
+        """
+        Return a list of all actions that player can perform.
+
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 5, 100, 5,
+        ...                   (0, 1), None)
+        >>> state.get_available_actions(0)
+        ['A']
+        >>> state.get_available_actions(1)
+        ['A']
+        """
+        sp = self.get_sp(player)
+        attack_cost, special_cost = ACTION_COSTS[self.kinds[player]]
+        return [action for action, cost in [('A', attack_cost),
+                                            ('S', special_cost)]
+                if cost <= sp]
+
+    def _can_act(self, player: int) -> bool:
+        """
+        Return whether player has any actions available.
+        """
+        return min(ACTION_COSTS[self.kinds[player]]) <= self.get_sp(player)
+
+    def is_empty(self) -> bool:
+        """
+        Return whether no player in the queue can perform any actions.
+        """
+        for player in self.queue:
+            if self._can_act(player):
+                return False
+        return True
+
+    def peek(self) -> int:
+        """
+        Return the player who acts next, or the first player if the queue is
+        empty.
+
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 0, 100, 5,
+        ...                   (0, 1), None)
+        >>> state.peek()
+        1
+        """
+        for player in self.queue:
+            if self._can_act(player):
+                return player
+        return 0
+
+    def is_over(self) -> bool:
+        """
+        Return whether the game in this GameState is over.
+        """
+        return self.hp1 == 0 or self.hp2 == 0 or self.is_empty()
+
+    def get_winner(self) -> Union[int, None]:
+        """
+        Return the player who won the game in this GameState, or None if the
+        game is not over or ended in a tie.
+        """
+        if not self.is_over():
+            return None
+        if self.hp1 == 0:
+            return 1
+        if self.hp2 == 0:
+            return 0
+        return None
+
+    def get_score(self) -> int:
+        """
+        Return the score of this finished game for the player who would act
+        next: the winner's HP if they won, minus the winner's HP if they lost,
+        and 0 for a tie.
+
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 90, 0, 70,
+        ...                   (1, 0), None)
+        >>> state.get_score()
+        -40
+        """
+        winner = self.get_winner()
+        if winner is None and self.is_empty():
+            return 0
+        current_player = self.peek()
+        if winner == current_player:
+            return self.get_hp(current_player)
+        return -1 * self.get_hp(1 - current_player)
+
+    def mirror(self) -> 'GameState':
+        """
+        Return this GameState with the two players swapped.
+
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 90, 88,
+        ...                   100, (1, 0, 0), None)
+        >>> state.mirror()
+        GameState(kinds=('Mage', 'Rogue'), trees=(None, None), hp1=88, \
+sp1=100, hp2=100, sp2=90, queue=(0, 1, 1), able=None)
+        """
+        return GameState((self.kinds[1], self.kinds[0]),
+                         (self.trees[1], self.trees[0]), self.hp2, self.sp2,
+                         self.hp1, self.sp1,
+                         tuple(1 - player for player in self.queue),
+                         self.able)
+
+    def apply(self, action: str) -> 'GameState':
+        """
+        Return the GameState after the next player performs action, which
+        must be one of their available actions.
+
+        This is the same move the minimax searches make on a copy of a
+        BattleQueue: the next player uses the skill, and then the player at
+        the front of the queue is removed if they can still act.
+
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+        ...                   100, (0, 1), None)
+        >>> state.apply('S')
+        GameState(kinds=('Rogue', 'Mage'), trees=(None, None), hp1=100, \
+sp1=90, hp2=88, sp2=100, queue=(1, 0, 0), able=None)
+        >>> state.apply('A').apply('S')
+        GameState(kinds=('Rogue', 'Mage'), trees=(None, None), hp1=70, \
+sp1=97, hp2=93, sp2=70, queue=(0, 0, 1), able=None)
+        """
+        battle = _Battle(self)
+        battle.use(battle.peek(), action)
+        if battle.has_actions(battle.peek()):
+            battle.remove()
+        battle.clean()
+        return battle.freeze()
+
+
+def canonicalize(state: 'GameState') -> Tuple['GameState', int]:
+    """
+    Return the one GameState that state and its mirror image both map to,
+    and the sign to multiply its score by to get the score of state.
+
+    Swapping the players changes nothing about how a game carries on, and
+    every score is from the point of view of the player who acts next, so a
+    position and its mirror have the same score. The only exception is a
+    finished game where nobody can act: peek() falls back to the first
+    player, so the score of a win or a loss is negated by the swap.
+
+    >>> state = GameState(('Rogue', 'Rogue'), (None, None), 40, 90, 60, 80,
+    ...                   (1, 0), None)
+    >>> canonicalize(state) == (state, 1)
+    True
+    >>> canonicalize(state.mirror()) == (state, 1)
+    True
+    >>> over = GameState(('Rogue', 'Mage'), (None, None), 30, 0, 0, 0, (1,),
+    ...                  None)
+    >>> over.get_score(), canonicalize(over)[0].get_score()
+    (30, -30)
+    >>> canonicalize(over)[1]
+    -1
+    """
+    if state.kinds[0] != state.kinds[1]:
+        mirrored = state.kinds[0] > state.kinds[1]
+    else:
+        flipped = tuple(1 - player for player in state.queue)
+        own = (state.hp1, state.sp1, state.hp2, state.sp2, state.queue)
+        other = (state.hp2, state.sp2, state.hp1, state.sp1, flipped)
+        if own == other:
+            mirrored = id(state.trees[0]) > id(state.trees[1])
+        else:
+            mirrored = other < own
+    if not mirrored:
+        return state, 1
+    mirror = state.mirror()
+    if state.is_empty() and state.get_winner() is not None:
+        return mirror, -1
+    return mirror, 1
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,139 @@
+"""
+Unittests for the GameState used by the minimax searches in A2.
+
+These tests play out many random games with real BattleQueues and Characters,
+and check that GameState.apply makes exactly the same moves.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES, BATTLE_QUEUE_CLASSES
+from a2_playstyle import ManualPlaystyle, get_game_state_score
+from a2_game_state import GameState, canonicalize
+from a2_skill_decision_tree import create_default_tree
+
+
+def make_battle_queue(p1_type, p2_type, queue_type):
+    """
+    Return a BattleQueue of type queue_type holding a new character of
+    p1_type and a new character of p2_type.
+    """
+    battle_queue = BATTLE_QUEUE_CLASSES[queue_type]()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_type]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_type]("P2", battle_queue, playstyle)
+    p1.enemy = p2
+    p2.enemy = p1
+    for character, kind in [(p1, p1_type), (p2, p2_type)]:
+        if kind == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+def search_move(battle_queue, action):
+    """
+    Return a copy of battle_queue after the next character performs action,
+    the same way the minimax searches make moves.
+    """
+    new_battle_queue = battle_queue.copy()
+    if action == 'A':
+        new_battle_queue.peek().attack()
+    else:
+        new_battle_queue.peek().special_attack()
+    if new_battle_queue.peek().get_available_actions() != []:
+        new_battle_queue.remove()
+    new_battle_queue.peek()
+    return new_battle_queue
+
+
+class GameStateUnitTests(unittest.TestCase):
+    def check_random_games(self, queue_type):
+        """
+        Play random games for every matchup with a queue_type BattleQueue and
+        compare every move against GameState.apply.
+        """
+        rng = random.Random(148)
+        for p1_type in CHARACTER_CLASSES:
+            for p2_type in CHARACTER_CLASSES:
+                for _ in range(15):
+                    battle_queue = make_battle_queue(p1_type, p2_type,
+                                                     queue_type)
+                    battle_queue.peek().set_hp(rng.randint(1, 100))
+                    battle_queue.peek().enemy.set_sp(rng.randint(0, 100))
+                    state = GameState.from_battle_queue(battle_queue)
+                    while not battle_queue.copy().is_over():
+                        self.assertFalse(state.is_over())
+                        self.assertEqual(
+                            battle_queue.copy().peek().get_available_actions(),
+                            state.get_available_actions(state.peek()))
+                        action = rng.choice(
+                            state.get_available_actions(state.peek()))
+                        battle_queue = search_move(battle_queue, action)
+                        state = state.apply(action)
+                        self.assertEqual(
+                            GameState.from_battle_queue(battle_queue), state,
+                            ("After {} in {} v {}, the GameState does not " +
+                             "match the BattleQueue:\n{}").format(
+                                 action, p1_type, p2_type, battle_queue))
+                    self.assertTrue(state.is_over())
+
+    def test_apply_matches_battle_queue(self):
+        """
+        Test to make sure GameState.apply matches the moves made on a
+        BattleQueue.
+        """
+        self.check_random_games('n')
+
+    def test_apply_matches_restricted_battle_queue(self):
+        """
+        Test to make sure GameState.apply matches the moves made on a
+        RestrictedBattleQueue.
+        """
+        self.check_random_games('r')
+
+    def test_hashable(self):
+        """
+        Test to make sure equal GameStates hash the same.
+        """
+        first = GameState.from_battle_queue(make_battle_queue('r', 'm', 'n'))
+        second = GameState.from_battle_queue(make_battle_queue('r', 'm', 'n'))
+        self.assertEqual(first, second)
+        self.assertEqual(1, len({first, second}))
+        self.assertNotEqual(first, first.apply('A'))
+
+    def test_canonicalize_mirror_scores(self):
+        """
+        Test to make sure a position and its mirror share a canonical
+        GameState, and that its score with the sign gives the position's
+        score, for positions up to and including the end of random games.
+        """
+        rng = random.Random(148)
+        for p1_type in CHARACTER_CLASSES:
+            for p2_type in CHARACTER_CLASSES:
+                for queue_type in BATTLE_QUEUE_CLASSES:
+                    battle_queue = make_battle_queue(p1_type, p2_type,
+                                                     queue_type)
+                    battle_queue.peek().set_hp(rng.randint(20, 40))
+                    battle_queue.peek().enemy.set_hp(rng.randint(20, 40))
+                    state = GameState.from_battle_queue(battle_queue)
+                    while True:
+                        canonical, _ = canonicalize(state)
+                        self.assertIn(canonical, [state, state.mirror()])
+                        for position in [state, state.mirror()]:
+                            key, sign = canonicalize(position)
+                            self.assertEqual(canonical, key)
+                            self.assertEqual(
+                                get_game_state_score(position),
+                                sign * get_game_state_score(canonical),
+                                ("Canonicalizing {} gave the wrong " +
+                                 "sign.").format(position))
+                        if state.is_over():
+                            break
+                        state = state.apply(rng.choice(
+                            state.get_available_actions(state.peek())))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,88 @@
+"""
+Unittests for the Match class of A2.
+"""
+import unittest
+
+import a2_game
+from a2_game import Match
+
+# The module variables of a2_game that its module functions change.
+GAME_GLOBALS = ['DEFAULT_MATCH', 'BATTLE_QUEUE', 'LAST_KEY_PRESSED', 'P1',
+                'P2', 'GAME_IS_OVER', 'GAME_WINNER']
+
+
+class MatchUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Saves the module variables of a2_game, which some tests change.
+        """
+        self.saved_globals = {name: getattr(a2_game, name)
+                              for name in GAME_GLOBALS}
+
+    def tearDown(self):
+        """
+        Puts back the module variables of a2_game saved in setUp.
+        """
+        for name, value in self.saved_globals.items():
+            setattr(a2_game, name, value)
+
+    def test_matches_are_independent(self):
+        """
+        Test to make sure moves in one Match do not change another Match.
+        """
+        first = Match()
+        first.set_up('n', 'r', 'R', 'm', 'm', 'M', 'm')
+        second = Match()
+        second.set_up('n', 'r', 'R', 'm', 'm', 'M', 'm')
+        self.assertTrue(first.apply_move('A'))
+        self.assertEqual(100, second.p2.get_hp())
+        self.assertEqual(93, first.p2.get_hp())
+        self.assertEqual('R', second.update_ui()['current_player'])
+        self.assertEqual('M', first.update_ui()['current_player'])
+
+    def test_invalid_move(self):
+        """
+        Test to make sure an invalid move leaves the Match unchanged.
+        """
+        match = Match()
+        match.set_up('r', 'v', 'V', 'm', 's', 'S', 'm')
+        before = repr(match.battle_queue)
+        self.assertFalse(match.apply_move('X'))
+        self.assertEqual(before, repr(match.battle_queue))
+        self.assertFalse(match.game_is_over)
+
+    def test_perform_attack_until_over(self):
+        """
+        Test to make sure perform_attack plays a Match until it has a winner.
+        """
+        match = Match()
+        match.set_up('n', 'r', 'R', 'mr', 'm', 'M', 'r')
+        while not match.game_is_over:
+            match.perform_attack()
+        self.assertIs(match.game_winner, match.battle_queue.get_winner())
+        self.assertIsNotNone(match.game_winner)
+
+    def test_module_functions_sync_globals(self):
+        """
+        Test to make sure the module functions play the default Match and
+        keep the module variables up to date.
+        """
+        match = Match()
+        match.set_up('n', 'r', 'R', 'm', 'm', 'M', 'm')
+        a2_game.set_default_match(match)
+        self.assertIs(match, a2_game.DEFAULT_MATCH)
+        self.assertIs(match.p2, a2_game.P2)
+        self.assertEqual(100, a2_game.P1.get_sp())
+        a2_game.LAST_KEY_PRESSED = 'S'
+        a2_game.perform_attack()
+        self.assertIs(match.battle_queue, a2_game.BATTLE_QUEUE)
+        self.assertIs(match.p1, a2_game.P1)
+        self.assertEqual(90, a2_game.P1.get_sp())
+        self.assertFalse(a2_game.GAME_IS_OVER)
+        ui = a2_game.update_ui()
+        self.assertEqual((90, 'M', ['A', 'S']),
+                         (ui['p1_sp'], ui['current_player'], ui['actions']))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
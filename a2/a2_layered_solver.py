@@ -0,0 +1,184 @@
+"""
+A layered, breadth-first solver for A2.
+
+get_state_score solves a game depth first, one position at a time. This
+solver instead expands every position reachable from the starting positions
+a layer at a time, using the NumPy kernel in a2_numpy_kernel to make the moves
+of a whole layer at once.
+
+Every move costs SP, so the total SP of both players goes down with every
+move. A layer is every reachable position with the same total SP: each move
+leads to a later layer, so the layers can be expanded in order of decreasing
+total SP and then scored in order of increasing total SP, when every child of
+a layer is already scored. Each layer is deduplicated by sorting before it is
+expanded, so a position reached by many orders of moves is only expanded and
+scored once.
+
+Scores are backed up with the same rule as get_state_score and
+IterativeMinimax.children_list_state: a child's score counts as it is if the
+same player moves next in it, and is negated otherwise.
+
+Solved layers can be spilled to .npy files in a directory, which are then
+memory-mapped instead of held in memory.
+
+This module needs NumPy, which the rest of A2 does not.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+import os
+import numpy as np
+import a2_numpy_kernel as kernel
+
+# The dtype of a position's raw bytes, which positions are sorted and
+# searched by.
+_KEY_DTYPE = np.dtype((np.void, kernel.STATE_DTYPE.itemsize))
+
+
+def _keys(batch: np.ndarray) -> np.ndarray:
+    """
+    Return the raw bytes of each position in batch.
+    """
+    return np.ascontiguousarray(batch).view(_KEY_DTYPE)
+
+
+def _total_sp(batch: np.ndarray) -> np.ndarray:
+    """
+    Return the total SP of both players in each position of batch.
+    """
+    return batch['sp'].astype(np.int64).sum(axis=1)
+
+
+class LayeredSolver:
+    """
+    A solver that scores every position reachable from some starting
+    positions, a layer of equal total SP at a time.
+
+    trees - the SkillDecisionTrees of the two players.
+    directory - the directory solved layers are spilled to, or None to keep
+                them in memory.
+    layers - the sorted, deduplicated positions of each layer, by total SP.
+    scores - the score of each position in layers, by total SP.
+    """
+    trees: Tuple[Any, Any]
+    directory: str
+    layers: Dict[int, np.ndarray]
+    scores: Dict[int, np.ndarray]
+
+    def __init__(self, trees: Tuple[Any, Any] = (None, None),
+                 directory: str = None) -> None:
+        """
+        Initialize this LayeredSolver for players using the
+        SkillDecisionTrees trees, spilling its layers to directory if it is
+        not None.
+        """
+        self.trees = trees
+        self.directory = directory
+        self.layers = {}
+        self.scores = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _spill(self, name: str, array: np.ndarray) -> np.ndarray:
+        """
+        Return array, written to the file name in this solver's directory
+        and memory-mapped if it has one.
+        """
+        if self.directory is None:
+            return array
+        path = os.path.join(self.directory, name + '.npy')
+        np.save(path, array)
+        return np.load(path, mmap_mode='r')
+
+    def _children(self, layer: np.ndarray, action: int) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the indices of the positions in layer that can use action,
+        and the positions after they do.
+        """
+        available = kernel.get_available_actions(layer)[:, action] & \
+            ~kernel.is_over(layer)
+        rows = np.flatnonzero(available)
+        children = kernel.apply(layer[rows], np.full(len(rows), action),
+                                self.trees)
+        return rows, children
+
+    def expand(self, starts: np.ndarray) -> None:
+        """
+        Find every position reachable from the positions starts, one layer
+        at a time, and keep the deduplicated layers in layers.
+        """
+        pending = {}
+        for total in np.unique(_total_sp(starts)):
+            pending[int(total)] = [starts[_total_sp(starts) == total]]
+        while pending:
+            total = max(pending)
+            batch = np.concatenate(pending.pop(total))
+            layer = np.unique(_keys(batch)).view(kernel.STATE_DTYPE)
+            self.layers[total] = self._spill('layer_{}'.format(total),
+                                             layer)
+            for action in [0, 1]:
+                _, children = self._children(self.layers[total], action)
+                child_totals = _total_sp(children)
+                for child_total in np.unique(child_totals):
+                    child_total = int(child_total)
+                    pending.setdefault(child_total, []).append(
+                        children[child_totals == child_total])
+
+    def lookup(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Return the score of each position in batch, which must already be
+        solved.
+        """
+        scores = np.empty(len(batch), dtype=np.int64)
+        totals = _total_sp(batch)
+        keys = _keys(batch)
+        for total in np.unique(totals):
+            rows = totals == total
+            layer_keys = _keys(self.layers[int(total)])
+            found = np.searchsorted(layer_keys, keys[rows])
+            scores[rows] = self.scores[int(total)][found]
+        return scores
+
+    def back_up(self) -> None:
+        """
+        Score every position in layers, from the lowest total SP up.
+        """
+        for total in sorted(self.layers):
+            layer = self.layers[total]
+            over = kernel.is_over(layer)
+            best = np.where(over, kernel.get_score(layer),
+                            np.iinfo(np.int64).min)
+            player = kernel.peek(layer)
+            for action in [0, 1]:
+                rows, children = self._children(layer, action)
+                score = self.lookup(children)
+                same = kernel.peek(children) == player[rows]
+                best[rows] = np.maximum(best[rows],
+                                        np.where(same, score, -1 * score))
+            self.scores[total] = self._spill('scores_{}'.format(total),
+                                             best.astype(np.int16))
+
+    def solve(self, starts: Sequence['GameState']) -> List[int]:
+        """
+        Score every position reachable from the GameStates starts, and
+        return the score of each start.
+
+        >>> from a2_tablebase import start_state
+        >>> state = start_state('Rogue', 'Mage', False, 40, 3)
+        >>> LayeredSolver().solve([state])
+        [40]
+        """
+        batch = kernel.encode(starts)
+        self.expand(batch)
+        self.back_up()
+        return self.lookup(batch).tolist()
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions in the layers of this LayeredSolver.
+        """
+        return sum(len(layer) for layer in self.layers.values())
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,72 @@
+"""
+Unittests for the layered solver of A2.
+"""
+import os
+import tempfile
+import unittest
+
+from a2_tablebase import solve_matchup, start_state
+try:
+    import numpy
+    import a2_numpy_kernel
+    from a2_layered_solver import LayeredSolver
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class LayeredSolverUnitTests(unittest.TestCase):
+    def check_matchup(self, p1_kind, p2_kind, restricted, directory=None):
+        """
+        Test to make sure the LayeredSolver gives every position reachable
+        in a matchup the score solve_matchup gives it.
+        """
+        start = start_state(p1_kind, p2_kind, restricted)
+        solved = solve_matchup([start])
+        solver = LayeredSolver(start.trees, directory)
+        self.assertEqual([solved[start][0]], solver.solve([start]))
+        states = list(solved)
+        expected = [solved[state][0] for state in states]
+        actual = solver.lookup(a2_numpy_kernel.encode(states)).tolist()
+        self.assertEqual(expected, actual,
+                         "{} v {}".format(p1_kind, p2_kind))
+        unfinished = sum(int((~a2_numpy_kernel.is_over(layer)).sum())
+                         for layer in solver.layers.values())
+        self.assertEqual(len(solved), unfinished)
+        return solver
+
+    def test_matches_solve_matchup(self):
+        """
+        Test to make sure the LayeredSolver matches solve_matchup for
+        matchups with and without lifesteal and Sorcerers.
+        """
+        for p1_kind, p2_kind in [('Rogue', 'Mage'), ('Vampire', 'Rogue'),
+                                 ('Sorcerer', 'Vampire')]:
+            for restricted in [False, True]:
+                self.check_matchup(p1_kind, p2_kind, restricted)
+
+    def test_layers_deduplicated(self):
+        """
+        Test to make sure no position appears in a layer twice.
+        """
+        solver = self.check_matchup('Mage', 'Rogue', False)
+        for layer in solver.layers.values():
+            records = {record.tobytes() for record in layer}
+            self.assertEqual(len(layer), len(records))
+
+    def test_spill_to_disk(self):
+        """
+        Test to make sure layers spilled to disk are memory-mapped and give
+        the same scores.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            solver = self.check_matchup('Vampire', 'Mage', True, directory)
+            self.assertTrue(os.listdir(directory))
+            for total, layer in solver.layers.items():
+                self.assertIsInstance(layer, numpy.memmap)
+                self.assertIsInstance(solver.scores[total], numpy.memmap)
+            del solver
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,290 @@
+"""
+A Monte Carlo Tree Search playstyle for A2.
+
+Instead of solving the whole game like the minimax playstyles, MCTS grows a
+tree of positions one node at a time, choosing which branch to grow with UCT
+(the upper confidence bound applied to trees) and estimating new positions by
+playing them out with random attacks, like RandomPlaystyle. It is useful for
+matchups, like Vampires and Sorcerers, where exact minimax is too slow.
+
+Rollouts are run in batches: a batch of leaves is chosen first, with a virtual
+visit on each chosen path so the batch spreads over the tree, then all of the
+batch's rollouts are played, in worker processes if the playstyle has an
+executor, and only then are their results added to the tree.
+
+The tree is kept between turns. On each turn, the playstyle looks for the
+current position among the descendants of its old root and searches on from
+there, so the work spent on that part of the tree is not thrown away.
+"""
+from typing import Any, Dict, List, Tuple, Union
+import math
+import random
+import time
+from concurrent.futures import Executor
+from a2_game_state import GameState
+from a2_playstyle import Playstyle
+
+# How many plies below the old root to look for the current position.
+REROOT_DEPTH = 6
+
+
+def rollout(state: 'GameState', seed: int) -> Tuple[Union[int, None], int]:
+    """
+    Play out state with attacks chosen at random by a random.Random seeded
+    with seed, and return the winner (0 or 1, or None for a tie) and the HP
+    they finish with.
+
+    >>> from a2_tablebase import start_state
+    >>> winner, hp = rollout(start_state('Rogue', 'Mage', False), 148)
+    >>> winner in [0, 1, None]
+    True
+    """
+    rng = random.Random(seed)
+    while not state.is_over():
+        state = state.apply(rng.choice(
+            state.get_available_actions(state.peek())))
+    winner = state.get_winner()
+    if winner is None:
+        return None, 0
+    return winner, state.get_hp(winner)
+
+
+def rollout_reward(result: Tuple[Union[int, None], int], player: int) \
+        -> float:
+    """
+    Return the reward, between 0 and 1, of the rollout result for player.
+    Winning with more HP is better, and a tie is worth 0.5.
+
+    >>> rollout_reward((0, 100), 0)
+    1.0
+    >>> rollout_reward((0, 40), 1)
+    0.3
+    >>> rollout_reward((None, 0), 1)
+    0.5
+    """
+    winner, hp = result
+    if winner is None:
+        return 0.5
+    if winner == player:
+        return 0.5 + hp / 200
+    return 0.5 - hp / 200
+
+
+class MCTSNode:
+    """
+    A position in the search tree of an MCTSPlaystyle.
+
+    state - the GameState of this MCTSNode.
+    player - the player who moves from state.
+    parent_player - the player who moved to state, or None for the root.
+    children - the MCTSNode reached by each action tried so far.
+    untried - the actions from state that have no MCTSNode yet.
+    visits - the number of rollouts through this MCTSNode.
+    total - the sum of the rewards of those rollouts for parent_player.
+    """
+    state: 'GameState'
+    player: int
+    parent_player: Union[int, None]
+    children: Dict[str, 'MCTSNode']
+    untried: List[str]
+    visits: int
+    total: float
+
+    def __init__(self, state: 'GameState',
+                 parent_player: int = None) -> None:
+        """
+        Initialize this MCTSNode for state, with no rollouts.
+        """
+        self.state = state
+        self.player = state.peek()
+        self.parent_player = parent_player
+        self.children = {}
+        self.untried = [] if state.is_over() else \
+            state.get_available_actions(self.player)
+        self.visits = 0
+        self.total = 0.0
+
+    def uct_child(self, exploration: float) -> 'MCTSNode':
+        """
+        Return the child of this MCTSNode with the highest UCT value.
+        """
+        log_visits = math.log(self.visits)
+        best = None
+        best_value = -math.inf
+        for child in self.children.values():
+            value = child.total / child.visits + \
+                exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def expand(self, rng: random.Random) -> 'MCTSNode':
+        """
+        Add a child of this MCTSNode for one of its untried actions, chosen
+        with rng, and return it.
+        """
+        action = self.untried.pop(rng.randrange(len(self.untried)))
+        child = MCTSNode(self.state.apply(action), self.player)
+        self.children[action] = child
+        return child
+
+    def find(self, state: 'GameState', depth: int) -> Union['MCTSNode', None]:
+        """
+        Return the MCTSNode for state among this MCTSNode and its descendants
+        at most depth plies below it, or None if there is none.
+        """
+        level = [self]
+        for _ in range(depth + 1):
+            next_level = []
+            for node in level:
+                if node.state == state:
+                    return node
+                next_level.extend(node.children.values())
+            level = next_level
+        return None
+
+
+class MCTSPlaystyle(Playstyle):
+    """
+    A playstyle that chooses attacks with Monte Carlo Tree Search.
+    Inherits from Playstyle.
+
+    iterations - the number of rollouts to run for each attack, if there is
+                 no time_budget.
+    time_budget - the number of seconds to search for each attack, or None.
+    batch_size - the number of rollouts run together in each batch.
+    exploration - the UCT exploration constant.
+    executor - the executor running each batch's rollouts, or None to run
+               them in this process.
+    root - the MCTSNode of the latest position searched, or None.
+    """
+    iterations: int
+    time_budget: Union[float, None]
+    batch_size: int
+    exploration: float
+    executor: Union[Executor, None]
+    root: Union[MCTSNode, None]
+
+    def __init__(self, battle_queue: 'BattleQueue', iterations: int = 2000,
+                 time_budget: float = None, batch_size: int = 16,
+                 exploration: float = math.sqrt(2),
+                 executor: Executor = None,
+                 rng: random.Random = None) -> None:
+        """
+        Initialize this MCTSPlaystyle with BattleQueue as its battle queue.
+        Leaves and rollout seeds are chosen with rng, or with a new
+        random.Random if rng is None.
+        """
+        super().__init__(battle_queue)
+        self.is_manual = False
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.batch_size = batch_size
+        self.exploration = exploration
+        self.executor = executor
+        self.root = None
+        self._rng = rng if rng is not None else random.Random()
+
+    def _get_root(self, state: 'GameState') -> MCTSNode:
+        """
+        Return the MCTSNode for state, reusing the tree from earlier turns if
+        state is in it.
+        """
+        node = None
+        if self.root is not None:
+            node = self.root.find(state, REROOT_DEPTH)
+        if node is None:
+            node = MCTSNode(state)
+        node.parent_player = None
+        self.root = node
+        return node
+
+    def _select(self, root: MCTSNode) -> List[MCTSNode]:
+        """
+        Return the path from root to a new leaf chosen with UCT, adding a
+        virtual visit to every MCTSNode on it.
+        """
+        node = root
+        path = [node]
+        node.visits += 1
+        while not node.untried and node.children:
+            node = node.uct_child(self.exploration)
+            path.append(node)
+            node.visits += 1
+        if node.untried:
+            node = node.expand(self._rng)
+            path.append(node)
+            node.visits += 1
+        return path
+
+    def _run_batch(self, root: MCTSNode, size: int) -> None:
+        """
+        Choose size leaves below root, play out each of them, and add the
+        results to the tree.
+        """
+        paths = [self._select(root) for _ in range(size)]
+        states = [path[-1].state for path in paths]
+        seeds = [self._rng.getrandbits(32) for _ in paths]
+        if self.executor is not None:
+            chunk = max(1, size // 4)
+            results = list(self.executor.map(rollout, states, seeds,
+                                             chunksize=chunk))
+        else:
+            results = [rollout(s, seed) for s, seed in zip(states, seeds)]
+        for path, result in zip(paths, results):
+            for node in path[1:]:
+                node.total += rollout_reward(result, node.parent_player)
+
+    def search(self, state: 'GameState', time_budget: float = None) \
+            -> MCTSNode:
+        """
+        Grow the tree below state, for time_budget seconds if it is given and
+        for iterations rollouts otherwise, and return its root.
+        """
+        root = self._get_root(state)
+        if time_budget is not None:
+            deadline = time.perf_counter() + time_budget
+            while time.perf_counter() < deadline:
+                self._run_batch(root, self.batch_size)
+        else:
+            done = 0
+            while done < self.iterations:
+                size = min(self.batch_size, self.iterations - done)
+                self._run_batch(root, size)
+                done += size
+        return root
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform. If parameter is given, it is the number of
+        seconds to search for.
+
+        Return 'X' if a valid move cannot be found.
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        budget = parameter if parameter is not None else self.time_budget
+        root = self.search(GameState.from_battle_queue(self.battle_queue),
+                           budget)
+        return max(actions, key=lambda a: (root.children[a].visits
+                                           if a in root.children else -1,
+                                           a == 'A'))
+
+    def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
+        """
+        Return a copy of this MCTSPlaystyle which uses the BattleQueue
+        new_battle_queue. The copy starts with an empty tree, but shares this
+        playstyle's executor.
+        """
+        return MCTSPlaystyle(new_battle_queue, self.iterations,
+                             self.time_budget, self.batch_size,
+                             self.exploration, self.executor)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
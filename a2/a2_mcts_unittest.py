@@ -0,0 +1,103 @@
+"""
+Unittests for the Monte Carlo Tree Search playstyle of A2.
+"""
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES
+from a2_battle_queue import BattleQueue
+from a2_game_state import GameState
+from a2_playstyle import ManualPlaystyle
+MageConstructor = CHARACTER_CLASSES['m']
+RogueConstructor = CHARACTER_CLASSES['r']
+Minimax = PLAYSTYLE_CLASSES['mr']
+MCTS = PLAYSTYLE_CLASSES['mc']
+
+
+class MCTSUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Sets up a Battle Queue containing a Rogue and a Mage.
+        """
+        self.battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(self.battle_queue)
+        self.p1 = RogueConstructor("R", self.battle_queue, playstyle)
+        self.p2 = MageConstructor("M", self.battle_queue, playstyle)
+        self.p1.enemy = self.p2
+        self.p2.enemy = self.p1
+        self.battle_queue.add(self.p1)
+        self.battle_queue.add(self.p2)
+
+    def test_matches_minimax(self):
+        """
+        Test to make sure MCTS picks the same attacks as minimax in
+        positions where one attack is clearly better.
+        """
+        for p1_hp, p1_sp, p2_hp, p2_sp in [(40, 10, 100, 30), (30, 100, 5, 30),
+                                           (40, 6, 14, 35)]:
+            self.p1.set_hp(p1_hp)
+            self.p1.set_sp(p1_sp)
+            self.p2.set_hp(p2_hp)
+            self.p2.set_sp(p2_sp)
+            bq = repr(self.battle_queue)
+            playstyle = MCTS(self.battle_queue, iterations=1000,
+                             rng=random.Random(148))
+
+            expected = Minimax(self.battle_queue).select_attack()
+            actual = playstyle.select_attack()
+
+            self.assertEqual(expected, actual,
+                             ("Calling select_attack() on a BattleQueue " +
+                              "that looks like:\n{}\nShould return the " +
+                              "attack {} but got {} instead.").format(
+                                  bq, expected, actual))
+
+    def test_tree_reused(self):
+        """
+        Test to make sure the tree is re-rooted at the new position after
+        moves are made, keeping its earlier rollouts.
+        """
+        playstyle = MCTS(self.battle_queue, iterations=500,
+                         rng=random.Random(148))
+        playstyle.select_attack()
+        state = GameState.from_battle_queue(self.battle_queue)
+        for action in ['A', 'S']:
+            state = state.apply(action)
+            if action == 'A':
+                self.battle_queue.peek().attack()
+            else:
+                self.battle_queue.peek().special_attack()
+            if self.battle_queue.peek().get_available_actions():
+                self.battle_queue.remove()
+        self.assertEqual(state, GameState.from_battle_queue(self.battle_queue))
+        old_visits = playstyle.root.find(state, 2).visits
+        self.assertGreater(old_visits, 0)
+        playstyle.select_attack()
+        self.assertEqual(state, playstyle.root.state)
+        self.assertEqual(old_visits + 500, playstyle.root.visits)
+
+    def test_rollouts_in_processes(self):
+        """
+        Test to make sure rollouts can run in worker processes.
+        """
+        with ProcessPoolExecutor(2) as executor:
+            playstyle = MCTS(self.battle_queue, iterations=200,
+                             executor=executor)
+            self.assertIn(playstyle.select_attack(), ['A', 'S'])
+            self.assertEqual(200, playstyle.root.visits)
+            self.assertIs(executor,
+                          playstyle.copy(self.battle_queue.copy()).executor)
+
+    def test_time_budget(self):
+        """
+        Test to make sure select_attack searches for the number of seconds
+        it is given.
+        """
+        playstyle = MCTS(self.battle_queue, iterations=1)
+        self.assertIn(playstyle.select_attack(0.05), ['A', 'S'])
+        self.assertGreater(playstyle.root.visits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -11,15 +11,20 @@ errors.
 Try playing your game through multiple times and trying various combinations of
 actions.
 """
+import time
 import unittest
 
 # Import the student solution
 from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES
-from a2_playstyle import get_state_score, ManualPlaystyle
+from a2_playstyle import get_state_score, ManualPlaystyle, \
+    RecursiveMinimax, TranspositionTable
 from a2_battle_queue import BattleQueue
 MageConstructor = CHARACTER_CLASSES['m']
 RogueConstructor = CHARACTER_CLASSES['r']
 Minimax = PLAYSTYLE_CLASSES['mi']
+AlphaBetaMinimax = PLAYSTYLE_CLASSES['mia']
+DeepeningMinimax = PLAYSTYLE_CLASSES['mid']
+BoundedMinimax = PLAYSTYLE_CLASSES['mim']
 
 class IterativeMinimaxUnitTests(unittest.TestCase):
     def setUp(self):
@@ -198,8 +203,124 @@ class IterativeMinimaxUnitTests(unittest.TestCase):
                           "looks like:\n{}\nShould return the attack {} " +
                           "but got {} instead.").format(bq,
                                                         expected,
-                                                        actual)) 
-    
-        
+                                                        actual))
+
+    def test_alpha_beta_matches_minimax(self):
+        """
+        Test to make sure the alpha-beta variant picks the same attacks as
+        the minimax playstyle.
+        """
+        alpha_beta_playstyle = AlphaBetaMinimax(self.battle_queue)
+        for p1_hp, p1_sp, p2_hp, p2_sp in [(40, 10, 100, 30), (40, 6, 14, 35),
+                                           (30, 100, 5, 30), (20, 100, 27, 100),
+                                           (100, 100, 100, 100)]:
+            self.p1.set_hp(p1_hp)
+            self.p1.set_sp(p1_sp)
+            self.p2.set_hp(p2_hp)
+            self.p2.set_sp(p2_sp)
+            bq = repr(self.battle_queue)
+
+            expected = self.minimax_playstyle.select_attack()
+            actual = alpha_beta_playstyle.select_attack()
+
+            self.assertEqual(expected, actual,
+                             ("Calling select_attack() on a BattleQueue " +
+                              "that looks like:\n{}\nShould return the " +
+                              "attack {} but got {} instead.").format(
+                                  bq, expected, actual))
+
+    def test_iterative_deepening_matches_minimax(self):
+        """
+        Test to make sure the time-limited playstyle picks the same attacks as
+        the minimax playstyle when it has time to search the whole game.
+        """
+        deepening_playstyle = DeepeningMinimax(self.battle_queue)
+        for p1_hp, p1_sp, p2_hp, p2_sp in [(40, 6, 14, 35), (30, 100, 5, 30),
+                                           (20, 100, 27, 100)]:
+            self.p1.set_hp(p1_hp)
+            self.p1.set_sp(p1_sp)
+            self.p2.set_hp(p2_hp)
+            self.p2.set_sp(p2_sp)
+            bq = repr(self.battle_queue)
+
+            expected = self.minimax_playstyle.select_attack()
+            actual = deepening_playstyle.select_attack(5)
+
+            self.assertEqual(expected, actual,
+                             ("Calling select_attack(5) on a BattleQueue " +
+                              "that looks like:\n{}\nShould return the " +
+                              "attack {} but got {} instead.").format(
+                                  bq, expected, actual))
+
+    def test_iterative_deepening_time_budget(self):
+        """
+        Test to make sure the time-limited playstyle returns an attack within
+        its time budget on a full-HP game.
+        """
+        deepening_playstyle = DeepeningMinimax(self.battle_queue)
+        start = time.monotonic()
+        actual = deepening_playstyle.select_attack(0.05)
+
+        self.assertIn(actual, ['A', 'S'])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertGreaterEqual(deepening_playstyle.last_depth, 1)
+
+    def test_memory_bounded_matches_minimax(self):
+        """
+        Test to make sure the memory-bounded playstyle gives the same scores
+        as the minimax playstyle while holding fewer BattleTrees at once.
+        """
+        bounded_playstyle = BoundedMinimax(self.battle_queue)
+        full_playstyle = BoundedMinimax(self.battle_queue, release=False)
+        positions = [(40, 10, 100, 30), (40, 6, 14, 35), (30, 100, 5, 30),
+                     (60, 100, 60, 100)]
+        for p1_hp, p1_sp, p2_hp, p2_sp in positions:
+            self.p1.set_hp(p1_hp)
+            self.p1.set_sp(p1_sp)
+            self.p2.set_hp(p2_hp)
+            self.p2.set_sp(p2_sp)
+            bq = repr(self.battle_queue)
+
+            expected = self.minimax_playstyle.get_state_score_iterative(
+                self.battle_queue)
+            actual = bounded_playstyle.get_state_score_iterative(
+                self.battle_queue)
+            full_playstyle.get_state_score_iterative(self.battle_queue)
+
+            self.assertEqual(expected, actual,
+                             ("Calling get_state_score_iterative on a " +
+                              "BattleQueue that looks like:\n{}\nShould " +
+                              "return {} but got {} instead.").format(
+                                  bq, expected, actual))
+            self.assertLessEqual(bounded_playstyle.peak_live_nodes,
+                                 full_playstyle.peak_live_nodes)
+            self.assertLessEqual(bounded_playstyle.peak_bytes,
+                                 full_playstyle.peak_bytes)
+        self.assertLess(bounded_playstyle.peak_live_nodes * 10,
+                        full_playstyle.peak_live_nodes)
+        self.assertEqual(0, bounded_playstyle.live_nodes)
+
+    def test_search_stats_match_recursive(self):
+        """
+        Test to make sure the iterative playstyles count the same search as
+        the recursive playstyle without a TranspositionTable.
+        """
+        self.p1.set_hp(40)
+        self.p2.set_hp(30)
+        recursive = RecursiveMinimax(self.battle_queue, TranspositionTable(0))
+        recursive.collect_stats = True
+        recursive.select_attack()
+        expected = recursive.last_search_stats.as_dict()
+        del expected['wall_time']
+        for playstyle in [self.minimax_playstyle,
+                          BoundedMinimax(self.battle_queue)]:
+            playstyle.select_attack()
+            self.assertIsNone(playstyle.last_search_stats)
+            playstyle.collect_stats = True
+            playstyle.select_attack()
+            actual = playstyle.last_search_stats.as_dict()
+            del actual['wall_time']
+            self.assertEqual(expected, actual)
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
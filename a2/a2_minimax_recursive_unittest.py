@@ -15,11 +15,25 @@ import unittest
 
 # Import the student solution
 from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES
-from a2_playstyle import get_state_score, ManualPlaystyle
+from a2_playstyle import get_state_score, ManualPlaystyle, \
+    TranspositionTable, SymmetricTranspositionTable, expectimax_score, \
+    get_game_state_score, SearchStats
 from a2_battle_queue import BattleQueue
+from a2_game_state import GameState
+from a2_skill_decision_tree import create_default_tree
+import random
+import gc
+import threading
+import time
+from collections import OrderedDict
+import weakref
 MageConstructor = CHARACTER_CLASSES['m']
 RogueConstructor = CHARACTER_CLASSES['r']
+SorcererConstructor = CHARACTER_CLASSES['s']
 Minimax = PLAYSTYLE_CLASSES['mr']
+AlphaBetaMinimax = PLAYSTYLE_CLASSES['mra']
+ParallelMinimax = PLAYSTYLE_CLASSES['mrp']
+Expectimax = PLAYSTYLE_CLASSES['ex']
 
 class RecursiveMinimaxUnitTests(unittest.TestCase):
     def setUp(self):
@@ -256,6 +270,284 @@ class RecursiveMinimaxUnitTests(unittest.TestCase):
                                                         expected,
                                                         actual)) 
     
-        
+
+    def test_get_state_score_with_table(self):
+        """
+        Test to make sure get_state_score gives the same score with a
+        TranspositionTable, and that the table is reused on a second search.
+        """
+        self.p1.set_hp(40)
+        self.p2.set_hp(30)
+        table = TranspositionTable()
+
+        expected = get_state_score(self.battle_queue)
+        actual = get_state_score(self.battle_queue, table)
+        self.assertEqual(expected, actual,
+                         ("get_state_score with a TranspositionTable " +
+                          "should return {} but got {} instead.").format(
+                              expected, actual))
+
+        stored = len(table)
+        hits = table.hits
+        self.assertEqual(expected, get_state_score(self.battle_queue, table))
+        self.assertEqual(stored, len(table))
+        self.assertEqual(hits + 1, table.hits)
+
+    def test_table_bounded(self):
+        """
+        Test to make sure a small TranspositionTable never grows past its
+        maximum size.
+        """
+        self.p1.set_hp(40)
+        self.p2.set_hp(30)
+        table = TranspositionTable(16)
+        expected = get_state_score(self.battle_queue)
+        actual = get_state_score(self.battle_queue, table)
+
+        self.assertEqual(expected, actual)
+        self.assertEqual(16, len(table))
+
+    def test_table_shared_between_threads(self):
+        """
+        Test to make sure a TranspositionTable shared by several threads
+        stays consistent while they look up and store positions at once.
+        """
+        class SlowScores(OrderedDict):
+            # Gives the other threads a turn between reading a score and
+            # marking it as recently used
+            def get(self, key, default=None):
+                score = super().get(key, default)
+                time.sleep(0)
+                return score
+
+        table = SymmetricTranspositionTable(8)
+        table._scores = SlowScores()
+        errors = []
+
+        def use_table():
+            try:
+                for i in range(2000):
+                    table.store(i % 12, i)
+                    table.lookup((i + 5) % 12)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=use_table) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors,
+                         "Threads sharing a TranspositionTable should not "
+                         + "raise errors but raised {}.".format(errors[:1]))
+        self.assertEqual(8, len(table))
+        self.assertEqual(4 * 2000, table.hits + table.misses)
+
+    def test_symmetric_table(self):
+        """
+        Test to make sure a SymmetricTranspositionTable gives the same scores
+        and attacks as a TranspositionTable while storing fewer positions in
+        a mirror matchup.
+        """
+        battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(battle_queue)
+        r1 = RogueConstructor("R1", battle_queue, playstyle)
+        r2 = RogueConstructor("R2", battle_queue, playstyle)
+        r1.enemy = r2
+        r2.enemy = r1
+        battle_queue.add(r1)
+        battle_queue.add(r2)
+        r1.set_hp(50)
+        r2.set_hp(50)
+        table = TranspositionTable()
+        symmetric = SymmetricTranspositionTable()
+        expected = get_state_score(battle_queue, table)
+        actual = get_state_score(battle_queue, symmetric)
+        self.assertEqual(expected, actual,
+                         ("get_state_score with a SymmetricTranspositionTable"
+                          + " should return {} but got {} instead.").format(
+                              expected, actual))
+        self.assertLess(len(symmetric), 0.75 * len(table))
+        for queue in [battle_queue, self.battle_queue]:
+            expected = AlphaBetaMinimax(queue, TranspositionTable())
+            actual = AlphaBetaMinimax(queue, SymmetricTranspositionTable())
+            self.assertEqual(expected.select_attack(), actual.select_attack())
+
+    def test_search_stats(self):
+        """
+        Test to make sure select_attack only records SearchStats when asked
+        to, and that they count the same search get_game_state_score does.
+        """
+        self.p1.set_hp(40)
+        self.p2.set_hp(30)
+        playstyle = Minimax(self.battle_queue, TranspositionTable(0))
+        playstyle.select_attack()
+        self.assertIsNone(playstyle.last_search_stats)
+
+        seen = []
+        playstyle.on_search = seen.append
+        playstyle.select_attack()
+        stats = playstyle.last_search_stats
+        self.assertEqual([stats], seen)
+        expected = SearchStats()
+        state = GameState.from_battle_queue(self.battle_queue)
+        get_game_state_score(state, stats=expected)
+        for name in ['nodes', 'children', 'terminals', 'max_depth']:
+            self.assertEqual(getattr(expected, name), getattr(stats, name),
+                             name)
+        self.assertEqual(stats.nodes + stats.terminals, stats.children + 1)
+        self.assertEqual(0, stats.cache_hits)
+        self.assertGreater(stats.wall_time, 0)
+
+        playstyle = Minimax(self.battle_queue)
+        playstyle.collect_stats = True
+        playstyle.select_attack()
+        first = playstyle.last_search_stats
+        playstyle.select_attack()
+        second = playstyle.last_search_stats
+        self.assertIsNot(first, second)
+        self.assertGreater(first.nodes, second.nodes)
+        self.assertEqual(1, second.nodes)
+        self.assertEqual(2, second.cache_hits)
+
+    def test_alpha_beta_matches_minimax(self):
+        """
+        Test to make sure the alpha-beta variant picks the same attacks as
+        the minimax playstyle.
+        """
+        alpha_beta_playstyle = AlphaBetaMinimax(self.battle_queue)
+        for p1_hp, p1_sp, p2_hp, p2_sp in [(40, 10, 100, 30), (40, 6, 14, 35),
+                                           (30, 100, 5, 30), (20, 100, 27, 100),
+                                           (100, 100, 100, 100)]:
+            self.p1.set_hp(p1_hp)
+            self.p1.set_sp(p1_sp)
+            self.p2.set_hp(p2_hp)
+            self.p2.set_sp(p2_sp)
+            bq = repr(self.battle_queue)
+
+            expected = self.minimax_playstyle.select_attack()
+            actual = alpha_beta_playstyle.select_attack()
+
+            self.assertEqual(expected, actual,
+                             ("Calling select_attack() on a BattleQueue " +
+                              "that looks like:\n{}\nShould return the " +
+                              "attack {} but got {} instead.").format(
+                                  bq, expected, actual))
+
+    def test_parallel_matches_minimax(self):
+        """
+        Test to make sure the parallel minimax playstyle picks the same
+        attacks as the minimax playstyle, splitting at either depth.
+        """
+        parallel_playstyle = ParallelMinimax(self.battle_queue, max_workers=2)
+        for split_depth in [1, 2]:
+            parallel_playstyle.split_depth = split_depth
+            for p1_hp, p1_sp, p2_hp, p2_sp in [(40, 10, 100, 30),
+                                               (40, 6, 14, 35),
+                                               (30, 100, 5, 30),
+                                               (20, 100, 27, 100)]:
+                self.p1.set_hp(p1_hp)
+                self.p1.set_sp(p1_sp)
+                self.p2.set_hp(p2_hp)
+                self.p2.set_sp(p2_sp)
+                bq = repr(self.battle_queue)
+
+                expected = self.minimax_playstyle.select_attack()
+                actual = parallel_playstyle.select_attack()
+
+                self.assertEqual(expected, actual,
+                                 ("Calling select_attack() on a BattleQueue " +
+                                  "that looks like:\n{}\nShould return the " +
+                                  "attack {} but got {} instead.").format(
+                                      bq, expected, actual))
+        parallel_playstyle.close()
+
+    def test_expectimax_score_against_random(self):
+        """
+        Test to make sure expectimax_score is the mean score of games where
+        the expectimax playstyle plays a random opponent.
+        """
+        self.p1.set_hp(40)
+        self.p2.set_hp(30)
+        start = GameState.from_battle_queue(self.battle_queue)
+        table = TranspositionTable()
+        expected = expectimax_score(start, 0, table)
+        rng = random.Random(148)
+        total = 0
+        games = 4000
+        for _ in range(games):
+            state = start
+            while not state.is_over():
+                player = state.peek()
+                actions = state.get_available_actions(player)
+                if player == 0:
+                    action = max(actions, key=lambda a: expectimax_score(
+                        state.apply(a), 0, table))
+                else:
+                    action = rng.choice(actions)
+                state = state.apply(action)
+            score = state.get_score()
+            total += score if state.peek() == 0 else -1 * score
+        self.assertAlmostEqual(expected, total / games, delta=1.5)
+
+    def test_expectimax_table_shared(self):
+        """
+        Test to make sure expectimax playstyles share their table, so
+        positions searched in one game are not searched again.
+        """
+        table = TranspositionTable()
+        first = Expectimax(self.battle_queue, table)
+        self.assertIn(first.select_attack(), ['A', 'S'])
+        stored = len(table)
+        self.assertGreater(stored, 0)
+        second = first.copy(self.battle_queue.copy())
+        self.assertIs(table, second.table)
+        misses = table.misses
+        second.select_attack()
+        self.assertEqual(misses, table.misses)
+        self.assertEqual(stored, len(table))
+
+    def make_sorcerer_game(self, hp):
+        """
+        Return a Battle Queue with a new Sorcerer and Rogue, each with hp HP,
+        where the Sorcerer has a new default SkillDecisionTree.
+        """
+        battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(battle_queue)
+        sorcerer = SorcererConstructor("S", battle_queue, playstyle)
+        rogue = RogueConstructor("R", battle_queue, playstyle)
+        sorcerer.enemy = rogue
+        rogue.enemy = sorcerer
+        sorcerer.set_skill_decision_tree(create_default_tree())
+        sorcerer.set_hp(hp)
+        rogue.set_hp(hp)
+        battle_queue.add(sorcerer)
+        battle_queue.add(rogue)
+        return battle_queue
+
+    def test_expectimax_table_shared_between_sorcerer_games(self):
+        """
+        Test to make sure positions of a Sorcerer searched in one game are
+        found in the next game, whose Sorcerer has a new but equal tree, and
+        that the table does not keep the first game's tree alive.
+        """
+        table = TranspositionTable()
+        battle_queue = self.make_sorcerer_game(40)
+        tree = weakref.ref(battle_queue.peek().skill_decision_tree)
+        self.assertIn(Expectimax(battle_queue, table).select_attack(),
+                      ['A', 'S'])
+        stored = len(table)
+        self.assertGreater(stored, 0)
+        del battle_queue
+        gc.collect()
+        self.assertIsNone(tree(), "The table should not keep trees alive.")
+        misses = table.misses
+        Expectimax(self.make_sorcerer_game(40), table).select_attack()
+        self.assertEqual(misses, table.misses,
+                         "A new game with an equal tree should only find " +
+                         "positions already in the table.")
+        self.assertEqual(stored, len(table))
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
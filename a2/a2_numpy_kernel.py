@@ -0,0 +1,463 @@
+"""
+A vectorized NumPy kernel for making moves in many GameStates at once.
+
+A batch of positions is a NumPy structured array with one record per
+GameState, holding both players' types (as ids in KIND_NAMES), HP and SP, the
+order of the BattleQueue as player numbers, its length, its able to add flags
+and whether it is a RestrictedBattleQueue. apply() makes one move in every
+position of a batch with array operations, following the same rules as
+GameState.apply: the skills of a2_skills, the defense subtraction and HP clamp
+of Character.apply_damage, the lifesteal of the Vampire skills and the
+BattleQueue and RestrictedBattleQueue rules for adding and removing.
+
+Sorcerers pick their attacks with a SkillDecisionTree, which is a Python
+object, so every Sorcerer in a batch must use the same tree for each player.
+The picks are made for the whole batch at once with
+CompiledSkillDecisionTree.pick_skills.
+
+This module needs NumPy, which the rest of A2 does not.
+"""
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+from a2_game_state import GameState, CHARACTER_KINDS, SKILL_COSTS, \
+    SKILL_EFFECTS, CASTER
+from a2_skill_decision_tree import get_compiled
+from a2_skills import MageAttack, MageSpecial, RogueAttack, RogueSpecial, \
+    VampireAttack, VampireSpecial, SorcererAttack, SorcererSpecial
+
+# The longest BattleQueue a batch can hold. No game that starts with 100 HP
+# and 100 SP reaches a queue longer than 19.
+QUEUE_CAPACITY = 24
+
+# The record of one position in a batch.
+STATE_DTYPE = np.dtype([('kind', np.uint8, (2,)),
+                        ('hp', np.int16, (2,)),
+                        ('sp', np.int16, (2,)),
+                        ('queue', np.uint8, (QUEUE_CAPACITY,)),
+                        ('length', np.uint8),
+                        ('able', np.bool_, (QUEUE_CAPACITY,)),
+                        ('restricted', np.bool_)])
+
+# The types of character, in the order of their ids.
+KIND_NAMES = list(CHARACTER_KINDS)
+KIND_IDS = {name: i for i, name in enumerate(KIND_NAMES)}
+
+# The skills, in the order of their ids, followed by the id of a
+# SorcererAttack that picked a skill it cannot cast.
+SKILLS = [MageAttack, MageSpecial, RogueAttack, RogueSpecial, VampireAttack,
+          VampireSpecial, SorcererAttack, SorcererSpecial]
+SKILL_IDS = {skill: i for i, skill in enumerate(SKILLS)}
+NO_EFFECT = len(SKILLS)
+
+# The skills a SorcererAttack can cast.
+_SORCERER_CASTS = (MageAttack, RogueAttack, MageSpecial, RogueSpecial)
+
+# Lookup tables by kind id: defense, the skill id of 'A' and 'S', and the
+# cheapest action.
+_DEFENSE = np.array([CHARACTER_KINDS[k][0] for k in KIND_NAMES],
+                    dtype=np.int32)
+_ACTION_SKILL = np.array([[SKILL_IDS[CHARACTER_KINDS[k][1]],
+                           SKILL_IDS[CHARACTER_KINDS[k][2]]]
+                          for k in KIND_NAMES], dtype=np.int64)
+_MIN_COST = np.array([min(SKILL_COSTS[CHARACTER_KINDS[k][1]],
+                          SKILL_COSTS[CHARACTER_KINDS[k][2]])
+                      for k in KIND_NAMES], dtype=np.int32)
+_ACTION_COST = np.array([[SKILL_COSTS[CHARACTER_KINDS[k][1]],
+                          SKILL_COSTS[CHARACTER_KINDS[k][2]]]
+                         for k in KIND_NAMES], dtype=np.int32)
+
+# Lookup tables by skill id: SP cost, damage, lifesteal, and who each of up
+# to three adds to the queue is for (-1 for none).
+_COST = np.array([SKILL_COSTS[s] for s in SKILLS] + [0], dtype=np.int32)
+_DAMAGE = np.zeros(NO_EFFECT + 1, dtype=np.int32)
+_LIFESTEAL = np.zeros(NO_EFFECT + 1, dtype=np.bool_)
+_ADDS = np.full((NO_EFFECT + 1, 3), -1, dtype=np.int64)
+for _skill, (_damage, _lifesteal, _adds) in SKILL_EFFECTS.items():
+    _DAMAGE[SKILL_IDS[_skill]] = _damage
+    _LIFESTEAL[SKILL_IDS[_skill]] = _lifesteal
+    _ADDS[SKILL_IDS[_skill], :len(_adds)] = _adds
+
+# Room for the adds of one move past QUEUE_CAPACITY.
+_WIDTH = QUEUE_CAPACITY + 3
+
+
+def encode(states: Sequence['GameState']) -> np.ndarray:
+    """
+    Return the batch of the GameStates states.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+    ...                   100, (0, 1), None)
+    >>> batch = encode([state])
+    >>> batch['hp'][0].tolist(), int(batch['length'][0])
+    ([100, 100], 2)
+    """
+    batch = np.zeros(len(states), dtype=STATE_DTYPE)
+    for i, state in enumerate(states):
+        if len(state.queue) > QUEUE_CAPACITY:
+            raise ValueError("The queue of {} is longer than {}.".format(
+                state, QUEUE_CAPACITY))
+        record = batch[i]
+        record['kind'] = (KIND_IDS[state.kinds[0]], KIND_IDS[state.kinds[1]])
+        record['hp'] = (state.hp1, state.hp2)
+        record['sp'] = (state.sp1, state.sp2)
+        record['queue'][:len(state.queue)] = state.queue
+        record['length'] = len(state.queue)
+        record['restricted'] = state.able is not None
+        if state.able is not None:
+            record['able'][:len(state.able)] = state.able
+    return batch
+
+
+def decode(batch: np.ndarray, trees: Tuple[Any, Any] = (None, None)) \
+        -> List['GameState']:
+    """
+    Return the GameStates of batch, whose players use the SkillDecisionTrees
+    trees.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+    ...                   100, (0, 1), None)
+    >>> decode(encode([state])) == [state]
+    True
+    """
+    states = []
+    for record in batch:
+        length = int(record['length'])
+        queue = tuple(int(p) for p in record['queue'][:length])
+        able = None
+        if record['restricted']:
+            able = tuple(bool(a) for a in record['able'][:length])
+        hp = record['hp'].tolist()
+        sp = record['sp'].tolist()
+        states.append(GameState((KIND_NAMES[record['kind'][0]],
+                                 KIND_NAMES[record['kind'][1]]),
+                                trees, hp[0], sp[0], hp[1], sp[1], queue,
+                                able))
+    return states
+
+
+def _acting(batch: np.ndarray) -> np.ndarray:
+    """
+    Return whether each place in the queue of each position in batch holds
+    a player that can act.
+    """
+    rows = np.arange(len(batch))[:, None]
+    can_act = batch['sp'] >= _MIN_COST[batch['kind']]
+    in_queue = np.arange(QUEUE_CAPACITY) < batch['length'][:, None]
+    return in_queue & can_act[rows, batch['queue']]
+
+
+def peek(batch: np.ndarray) -> np.ndarray:
+    """
+    Return the player who acts next in each position of batch, or 0 if no
+    one can act, like GameState.peek.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 0, 100, 5,
+    ...                   (0, 1), None)
+    >>> peek(encode([state])).tolist()
+    [1]
+    """
+    acting = _acting(batch)
+    first = acting.argmax(axis=1)
+    players = batch['queue'][np.arange(len(batch)), first].astype(np.int64)
+    return np.where(acting.any(axis=1), players, 0)
+
+
+def get_available_actions(batch: np.ndarray) -> np.ndarray:
+    """
+    Return whether the next player in each position of batch can use 'A'
+    and 'S', as an array with a row of two bools for each position.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 5, 100, 5,
+    ...                   (0, 1), None)
+    >>> get_available_actions(encode([state])).tolist()
+    [[True, False]]
+    """
+    rows = np.arange(len(batch))
+    player = peek(batch)
+    costs = _ACTION_COST[batch['kind'][rows, player]]
+    return batch['sp'][rows, player][:, None] >= costs
+
+
+def is_over(batch: np.ndarray) -> np.ndarray:
+    """
+    Return whether the game in each position of batch is over.
+    """
+    return (batch['hp'] == 0).any(axis=1) | ~_acting(batch).any(axis=1)
+
+
+def get_winner(batch: np.ndarray) -> np.ndarray:
+    """
+    Return the player who won each position of batch, or -1 if the game is
+    not over or ended in a tie, like GameState.get_winner.
+    """
+    hp = batch['hp']
+    winner = np.where(hp[:, 0] == 0, 1, np.where(hp[:, 1] == 0, 0, -1))
+    return np.where(is_over(batch), winner, -1)
+
+
+def get_score(batch: np.ndarray) -> np.ndarray:
+    """
+    Return the score of each finished game in batch for the player who
+    would act next, like GameState.get_score.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 90, 0, 70,
+    ...                   (1, 0), None)
+    >>> get_score(encode([state])).tolist()
+    [-40]
+    """
+    rows = np.arange(len(batch))
+    winner = get_winner(batch)
+    current = peek(batch)
+    hp = batch['hp'].astype(np.int64)
+    score = np.where(winner == current, hp[rows, current],
+                     -1 * hp[rows, 1 - current])
+    tie = (winner == -1) & ~_acting(batch).any(axis=1)
+    return np.where(tie, 0, score)
+
+
+def pick_sorcerer_skills(trees: Tuple[Any, Any], caster: np.ndarray,
+                         caster_hp: np.ndarray, caster_sp: np.ndarray,
+                         target_hp: np.ndarray,
+                         target_sp: np.ndarray) -> np.ndarray:
+    """
+    Return the id of the skill that the SkillDecisionTree in trees of each
+    caster picks, or NO_EFFECT if it is not one a SorcererAttack can cast.
+
+    >>> from a2_skill_decision_tree import create_default_tree
+    >>> tree = create_default_tree()
+    >>> picks = pick_sorcerer_skills((tree, None), np.array([0, 0]),
+    ...                              np.array([100, 40]), np.array([100, 10]),
+    ...                              np.array([100, 20]), np.array([100, 10]))
+    >>> [SKILLS[pick].__name__ for pick in picks]
+    ['RogueSpecial', 'MageAttack']
+    """
+    picks = np.empty(len(caster), dtype=np.int64)
+    for player in [0, 1]:
+        rows = caster == player
+        if not rows.any():
+            continue
+        compiled = get_compiled(trees[player])
+        ids = np.array([SKILL_IDS[type(value)]
+                        if type(value) in _SORCERER_CASTS else NO_EFFECT
+                        for value in compiled.values], dtype=np.int64)
+        picks[rows] = ids[compiled.pick_skills(
+            caster_hp[rows], caster_sp[rows], target_hp[rows],
+            target_sp[rows])]
+    return picks
+
+
+class _BatchBattle:
+    """
+    A mutable scratch copy of a batch that mirrors _Battle for every
+    position at once. Each queue is the places from start up to end of a
+    wider buffer, so removing from the front only moves start.
+    """
+
+    def __init__(self, batch: np.ndarray, trees: Tuple[Any, Any]) -> None:
+        """
+        Initialize this _BatchBattle from batch.
+        """
+        size = len(batch)
+        self.trees = trees
+        self.rows = np.arange(size)
+        self.kind = batch['kind'].astype(np.int64)
+        self.hp = batch['hp'].astype(np.int32)
+        self.sp = batch['sp'].astype(np.int32)
+        self.restricted = batch['restricted'].copy()
+        self.queue = np.zeros((size, _WIDTH), dtype=np.int64)
+        self.queue[:, :QUEUE_CAPACITY] = batch['queue']
+        self.able = np.zeros((size, _WIDTH), dtype=np.bool_)
+        self.able[:, :QUEUE_CAPACITY] = batch['able']
+        self.start = np.zeros(size, dtype=np.int64)
+        self.end = batch['length'].astype(np.int64)
+        self.counts = np.stack(
+            [(self.able[:, :QUEUE_CAPACITY] &
+              (batch['queue'] == player)).sum(axis=1)
+             for player in [0, 1]], axis=1)
+
+    def _in_queue(self) -> np.ndarray:
+        """
+        Return which places of the buffer are in each queue.
+        """
+        places = np.arange(_WIDTH)
+        return (places >= self.start[:, None]) & (places < self.end[:, None])
+
+    def _front(self) -> np.ndarray:
+        """
+        Return the place of the front of each queue, clipped to the buffer.
+        """
+        return np.minimum(self.start, _WIDTH - 1)
+
+    def has_actions(self, player: np.ndarray) -> np.ndarray:
+        """
+        Return whether each player has enough SP to use a skill.
+        """
+        return self.sp[self.rows, player] >= \
+            _MIN_COST[self.kind[self.rows, player]]
+
+    def _drop(self, dropped: np.ndarray) -> None:
+        """
+        Remove the places dropped, which are at the front of each queue,
+        following the RestrictedBattleQueue rules for the able counts.
+        """
+        for player in [0, 1]:
+            able = (dropped & self.able & (self.queue == player)).sum(axis=1)
+            self.counts[:, player] = np.maximum(
+                self.counts[:, player] - able, 0)
+        self.start = self.start + dropped.sum(axis=1)
+
+    def clean(self) -> None:
+        """
+        Remove the players at the front of each queue that have no actions.
+        """
+        can_act = self.sp >= _MIN_COST[self.kind]
+        acting = self._in_queue() & can_act[self.rows[:, None], self.queue]
+        first = np.where(acting.any(axis=1), acting.argmax(axis=1), self.end)
+        places = np.arange(_WIDTH)
+        self._drop((places >= self.start[:, None]) & (places < first[:, None]))
+
+    def peek(self) -> np.ndarray:
+        """
+        Return the player at the front of each queue, or the first player if
+        the queue is empty.
+        """
+        self.clean()
+        return np.where(self.start < self.end,
+                        self.queue[self.rows, self._front()], 0)
+
+    def remove(self, mask: np.ndarray) -> None:
+        """
+        Remove the player at the front of each queue in mask.
+        """
+        self.clean()
+        mask = mask & (self.start < self.end)
+        self._drop((np.arange(_WIDTH) == self.start[:, None]) &
+                   mask[:, None])
+
+    def add(self, mask: np.ndarray, player: np.ndarray) -> None:
+        """
+        Add player to each queue in mask, following the RestrictedBattleQueue
+        rules for the restricted ones.
+        """
+        rows = self.rows
+        front = self._front()
+        nonempty = self.start < self.end
+        blocked = self.restricted & nonempty & ~self.able[rows, front]
+        mask = mask & ~blocked
+        first_time = ~(self._in_queue() &
+                       (self.queue == player[:, None])).any(axis=1)
+        able = first_time | ((self.queue[rows, front] == player) &
+                             (self.counts[rows, player] < 2))
+        able = able & self.restricted
+        added = rows[mask]
+        self.queue[added, self.end[mask]] = player[mask]
+        self.able[added, self.end[mask]] = able[mask]
+        counted = mask & able
+        self.counts[rows[counted], player[counted]] += 1
+        self.end = self.end + mask
+
+    def use(self, caster: np.ndarray, actions: np.ndarray) -> None:
+        """
+        Make each caster use the skill for their action (0 for 'A' and 1 for
+        'S') on the other player.
+        """
+        rows = self.rows
+        target = 1 - caster
+        skill = _ACTION_SKILL[self.kind[rows, caster], actions]
+        effect = skill.copy()
+        sorcerer = skill == SKILL_IDS[SorcererAttack]
+        if sorcerer.any():
+            effect[sorcerer] = pick_sorcerer_skills(
+                self.trees, caster[sorcerer], self.hp[rows, caster][sorcerer],
+                self.sp[rows, caster][sorcerer],
+                self.hp[rows, target][sorcerer],
+                self.sp[rows, target][sorcerer])
+        self.sp[rows, caster] -= _COST[skill]
+        live = effect != NO_EFFECT
+        hp_original = self.hp[rows, target]
+        damage = _DAMAGE[effect] - _DEFENSE[self.kind[rows, target]]
+        hp_new = np.where(live, np.maximum(hp_original - damage, 0),
+                          hp_original)
+        self.hp[rows, target] = hp_new
+        self.hp[rows, caster] += np.where(live & _LIFESTEAL[effect],
+                                          hp_original - hp_new, 0)
+        reset = live & (effect == SKILL_IDS[SorcererSpecial])
+        if reset.any():
+            self.clean()
+            self._drop(self._in_queue() & reset[:, None])
+        for k in range(3):
+            who = _ADDS[effect, k]
+            self.add(live & (who >= 0), np.where(who == CASTER, caster,
+                                                 target))
+
+    def freeze(self) -> np.ndarray:
+        """
+        Return the batch this _BatchBattle is in.
+        """
+        length = self.end - self.start
+        if (length > QUEUE_CAPACITY).any():
+            raise ValueError("A queue is longer than {}.".format(
+                QUEUE_CAPACITY))
+        places = np.arange(QUEUE_CAPACITY)
+        in_queue = places < length[:, None]
+        queue = self.queue[self.rows[:, None],
+                           np.minimum(self.start[:, None] + places,
+                                      _WIDTH - 1)]
+        queue = np.where(in_queue, queue, 0)
+        batch = np.zeros(len(self.rows), dtype=STATE_DTYPE)
+        batch['kind'] = self.kind
+        batch['hp'] = self.hp
+        batch['sp'] = self.sp
+        batch['queue'] = queue
+        batch['length'] = length
+        batch['restricted'] = self.restricted
+        batch['able'] = normalize_able(queue, length) & \
+            self.restricted[:, None]
+        return batch
+
+
+def normalize_able(queue: np.ndarray, length: np.ndarray) -> np.ndarray:
+    """
+    Return the able to add flags a RestrictedBattleQueue has after copying a
+    RestrictedBattleQueue in each order in queue, like
+    a2_game_state.normalize_able.
+
+    >>> normalize_able(np.array([[0, 1, 1, 0, 0]]), np.array([5])).tolist()
+    [[True, True, False, True, False]]
+    """
+    rows = np.arange(len(queue))
+    able = np.zeros(queue.shape, dtype=np.bool_)
+    counts = np.zeros((len(queue), 2), dtype=np.int64)
+    seen = np.zeros((len(queue), 2), dtype=np.bool_)
+    front = queue[:, 0]
+    for place in range(queue.shape[1]):
+        valid = place < length
+        player = queue[:, place]
+        flag = valid & (~seen[rows, player] |
+                        ((front == player) & (counts[rows, player] < 2)))
+        able[:, place] = flag
+        counts[rows, player] += flag
+        seen[rows, player] |= valid
+    return able
+
+
+def apply(batch: np.ndarray, actions: np.ndarray,
+          trees: Tuple[Any, Any] = (None, None)) -> np.ndarray:
+    """
+    Return the batch after the next player in each position of batch
+    performs their action in actions (0 for 'A' and 1 for 'S'), which must
+    be one of their available actions. Sorcerers pick their attacks with
+    the SkillDecisionTrees in trees.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+    ...                   100, (0, 1), None)
+    >>> after = decode(apply(encode([state, state]), np.array([1, 0])))
+    >>> after == [state.apply('S'), state.apply('A')]
+    True
+    """
+    battle = _BatchBattle(batch, trees)
+    battle.use(battle.peek(), np.asarray(actions, dtype=np.int64))
+    player = battle.peek()
+    battle.remove(battle.has_actions(player))
+    battle.clean()
+    return battle.freeze()
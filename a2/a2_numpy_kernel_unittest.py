@@ -0,0 +1,102 @@
+"""
+Unittests for the NumPy kernel of A2.
+
+These tests play random games with real BattleQueues and Characters, and
+check that the kernel makes exactly the same moves for a whole batch of them.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_game_state import GameState
+from a2_game_state_unittest import make_battle_queue, search_move
+from a2_skill_decision_tree import create_default_tree
+try:
+    import numpy
+    import a2_numpy_kernel
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class NumpyKernelUnitTests(unittest.TestCase):
+    def check_random_games(self, queue_type):
+        """
+        Play random games for every matchup with a queue_type BattleQueue,
+        moving every game of a matchup at once with the kernel, and compare
+        every move against the BattleQueue.
+        """
+        rng = random.Random(148)
+        tree = create_default_tree()
+        for p1_type in CHARACTER_CLASSES:
+            for p2_type in CHARACTER_CLASSES:
+                battle_queues = []
+                for _ in range(20):
+                    battle_queue = make_battle_queue(p1_type, p2_type,
+                                                     queue_type)
+                    # The kernel needs every Sorcerer to use the same tree.
+                    for character in [battle_queue.peek(),
+                                      battle_queue.peek().enemy]:
+                        if hasattr(character, 'skill_decision_tree'):
+                            character.set_skill_decision_tree(tree)
+                    battle_queue.peek().set_hp(rng.randint(1, 100))
+                    battle_queue.peek().enemy.set_sp(rng.randint(0, 100))
+                    battle_queues.append(battle_queue)
+                trees = GameState.from_battle_queue(battle_queues[0]).trees
+                while battle_queues:
+                    states = [GameState.from_battle_queue(battle_queue)
+                              for battle_queue in battle_queues]
+                    batch = a2_numpy_kernel.encode(states)
+                    self.assertEqual(states,
+                                     a2_numpy_kernel.decode(batch, trees))
+                    self.assertFalse(a2_numpy_kernel.is_over(batch).any())
+                    actions = [rng.choice(state.get_available_actions(
+                        state.peek())) for state in states]
+                    codes = numpy.array([0 if a == 'A' else 1
+                                         for a in actions])
+                    batch = a2_numpy_kernel.apply(batch, codes, trees)
+                    battle_queues = [search_move(battle_queue, action)
+                                     for battle_queue, action in
+                                     zip(battle_queues, actions)]
+                    expected = [GameState.from_battle_queue(battle_queue)
+                                for battle_queue in battle_queues]
+                    self.assertEqual(expected,
+                                     a2_numpy_kernel.decode(batch, trees),
+                                     "{} v {}".format(p1_type, p2_type))
+                    over = a2_numpy_kernel.is_over(batch)
+                    self.assertEqual(
+                        [battle_queue.copy().is_over()
+                         for battle_queue in battle_queues], over.tolist())
+                    self.assertEqual(
+                        [state.get_score() for state, done in
+                         zip(expected, over) if done],
+                        a2_numpy_kernel.get_score(batch[over]).tolist())
+                    battle_queues = [battle_queue for battle_queue, done in
+                                     zip(battle_queues, over) if not done]
+
+    def test_apply_matches_battle_queue(self):
+        """
+        Test to make sure the kernel matches the moves made on a
+        BattleQueue.
+        """
+        self.check_random_games('n')
+
+    def test_apply_matches_restricted_battle_queue(self):
+        """
+        Test to make sure the kernel matches the moves made on a
+        RestrictedBattleQueue.
+        """
+        self.check_random_games('r')
+
+    def test_queue_too_long(self):
+        """
+        Test to make sure a queue longer than the kernel can hold is
+        rejected.
+        """
+        state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+                          100, (0, 1) * a2_numpy_kernel.QUEUE_CAPACITY, None)
+        self.assertRaises(ValueError, a2_numpy_kernel.encode, [state])
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
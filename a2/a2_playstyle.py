@@ -5,8 +5,15 @@ Docstring examples are not required for Playstyles.
 You are responsible for implementing the get_state_score function, as well as
 creating classes for both Iterative Minimax and Recursive Minimax.
 """
-from typing import Any, List, Union
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
 import random
+import sys
+import threading
+import time
+from a2_game_state import GameState, canonicalize
 
 
 class Playstyle:
@@ -16,9 +23,17 @@ class Playstyle:
     is_manual - Whether the class is a manual Playstyle or not.
     battle_queue - The BattleQueue corresponding to the game this Playstyle is
                    being used in.
+    collect_stats - Whether searches record what they did in a SearchStats.
+    on_search - A function called with the SearchStats of each search, or
+                None. Searches record their SearchStats when it is set, even
+                if collect_stats is False.
+    last_search_stats - The SearchStats of the last search, or None.
     """
     is_manual: bool
     battle_queue: 'BattleQueue'
+    collect_stats: bool
+    on_search: Union[Callable[['SearchStats'], None], None]
+    last_search_stats: Union['SearchStats', None]
 
     def __init__(self, battle_queue: 'BattleQueue') -> None:
         """
@@ -26,6 +41,30 @@ class Playstyle:
         """
         self.battle_queue = battle_queue
         self.is_manual = True
+        self.collect_stats = False
+        self.on_search = None
+        self.last_search_stats = None
+
+    def _start_search(self) -> Union['SearchStats', None]:
+        """
+        Return a new SearchStats for a search to record what it does in, or
+        None if this Playstyle does not collect them.
+        """
+        if self.collect_stats or self.on_search is not None:
+            return SearchStats()
+        return None
+
+    def _finish_search(self, stats: Union['SearchStats', None]) -> None:
+        """
+        Record how long the search stats is for took, keep it as
+        last_search_stats and pass it to on_search.
+        """
+        if stats is None:
+            return
+        stats.wall_time = time.perf_counter() - stats.started
+        self.last_search_stats = stats
+        if self.on_search is not None:
+            self.on_search(stats)
 
     def select_attack(self, parameter: Any = None) -> str:
         """
@@ -43,6 +82,12 @@ class Playstyle:
         """
         raise NotImplementedError
 
+    def close(self) -> None:
+        """
+        Release anything this Playstyle holds on to between searches, such as
+        worker processes. Most Playstyles hold nothing.
+        """
+
 
 class ManualPlaystyle(Playstyle):
     """
@@ -74,13 +119,20 @@ class ManualPlaystyle(Playstyle):
 class RandomPlaystyle(Playstyle):
     """
     The Random playstyle. Inherits from Playstyle.
+
+    rng - the random number generator used to choose attacks.
     """
-    def __init__(self, battle_queue: 'BattleQueue') -> None:
+    rng: Any
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 rng: random.Random = None) -> None:
         """
         Initialize this RandomPlaystyle with BattleQueue as its battle queue.
+        Attacks are chosen with rng, or with the random module if rng is None.
         """
         super().__init__(battle_queue)
         self.is_manual = False
+        self.rng = rng if rng is not None else random
 
     def select_attack(self, parameter: Any = None) -> str:
         """
@@ -94,21 +146,261 @@ class RandomPlaystyle(Playstyle):
         if not actions:
             return 'X'
 
-        return random.choice(actions)
+        return self.rng.choice(actions)
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
         """
         Return a copy of this RandomPlaystyle which uses the
-        BattleQueue new_battle_queue.
+        BattleQueue new_battle_queue and the same random number generator.
+        """
+        return RandomPlaystyle(new_battle_queue, self.rng)
+
+
+class SearchStats:
+    """
+    What one select_attack search did.
+
+    The searches work on GameStates, making a child GameState for each move
+    where the game itself would copy the whole BattleQueue, so no BattleQueue
+    is copied during a search, and children counts the child GameStates made
+    instead.
+
+    nodes - the number of positions whose children were searched.
+    children - the number of child positions made.
+    terminals - the number of finished positions reached.
+    max_depth - the most moves below the searched position reached.
+    cache_hits - the number of positions found in a TranspositionTable.
+    wall_time - the number of seconds the search took.
+    started - the time.perf_counter() when the search started.
+    """
+    nodes: int
+    children: int
+    terminals: int
+    max_depth: int
+    cache_hits: int
+    wall_time: float
+    started: float
+
+    def __init__(self) -> None:
+        """
+        Initialize this SearchStats for a search starting now.
+        """
+        self.nodes = 0
+        self.children = 0
+        self.terminals = 0
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.wall_time = 0.0
+        self.started = time.perf_counter()
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        """
+        Return the counts and wall time of this SearchStats by name.
+
+        >>> stats = SearchStats()
+        >>> stats.nodes = 3
+        >>> stats.as_dict()['nodes']
+        3
+        >>> len(stats.as_dict())
+        6
+        """
+        return {'nodes': self.nodes,
+                'children': self.children,
+                'terminals': self.terminals,
+                'max_depth': self.max_depth,
+                'cache_hits': self.cache_hits,
+                'wall_time': self.wall_time}
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of this SearchStats.
+        """
+        return 'SearchStats({})'.format(', '.join(
+            '{}={}'.format(name, value)
+            for name, value in self.as_dict().items()))
+
+
+class TranspositionTable:
+    """
+    A cache of the scores of positions that have already been solved.
+
+    Different orders of moves often reach the same position, so a search that
+    shares a TranspositionTable only solves each distinct position once. Once
+    the table holds max_size positions, the least recently used one is evicted.
+    A TranspositionTable may be shared by searches on different threads, like
+    the server's AI turns, so each lookup and store holds a lock.
+
+    max_size - the most positions this TranspositionTable will hold.
+    hits - the number of lookups that found a stored score.
+    misses - the number of lookups that did not find a stored score.
+    """
+    max_size: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_size: int = 200000) -> None:
+        """
+        Initialize this TranspositionTable so it holds at most max_size
+        positions.
+
+        >>> table = TranspositionTable(10)
+        >>> len(table)
+        0
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> Union[int, None]:
+        """
+        Return the score stored for the position key, or None if there is
+        none.
+
+        >>> table = TranspositionTable(10)
+        >>> table.lookup('a') is None
+        True
+        >>> table.store('a', 5)
+        >>> table.lookup('a')
+        5
+        >>> (table.hits, table.misses)
+        (1, 1)
+        """
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._scores.move_to_end(key)
+        return score
+
+    def store(self, key: Hashable, score: int) -> None:
+        """
+        Store score as the score of the position key, evicting the least
+        recently used position if this TranspositionTable is full.
+
+        >>> table = TranspositionTable(2)
+        >>> table.store('a', 1)
+        >>> table.store('b', 2)
+        >>> table.lookup('a')
+        1
+        >>> table.store('c', 3)
+        >>> table.lookup('b') is None
+        True
+        >>> len(table)
+        2
+        """
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            if len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove every stored position and reset the hit and miss counters.
+
+        >>> table = TranspositionTable(2)
+        >>> table.store('a', 1)
+        >>> table.clear()
+        >>> len(table)
+        0
+        """
+        with self._lock:
+            self._scores.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions stored in this TranspositionTable.
+        """
+        return len(self._scores)
+
+
+class SymmetricTranspositionTable(TranspositionTable):
+    """
+    A TranspositionTable that stores a position and its mirror image, with
+    the players swapped, under one key (see canonicalize). Matchups of two
+    characters of the same type reach many mirrored positions, and each pair
+    is only solved and stored once.
+
+    Keys may be GameStates, whose scores are negated when canonicalize says
+    so, or (GameState, player) pairs, like those of expectimax_score, whose
+    scores are from player's point of view and are never negated. Scores are
+    numbers, or (score, bound) pairs from an alpha-beta search, whose bound
+    is swapped when the score is negated. Other keys are stored as they are.
+    """
+
+    def lookup(self, key: Hashable) -> Union[int, None]:
+        """
+        Return the score stored for the position key or its mirror, or None
+        if there is none.
+
+        >>> table = SymmetricTranspositionTable(10)
+        >>> state = GameState(('Rogue', 'Rogue'), (None, None), 40, 90, 60,
+        ...                   80, (1, 0), None)
+        >>> table.store(state.mirror(), 25)
+        >>> table.lookup(state)
+        25
+        >>> len(table)
+        1
+        """
+        key, sign = _canonical_key(key)
+        score = super().lookup(key)
+        if score is None or sign == 1:
+            return score
+        return _negate(score)
+
+    def store(self, key: Hashable, score: int) -> None:
+        """
+        Store score as the score of the position key, under the key it shares
+        with its mirror.
         """
-        return RandomPlaystyle(new_battle_queue)
+        key, sign = _canonical_key(key)
+        super().store(key, score if sign == 1 else _negate(score))
+
+
+def _canonical_key(key: Hashable) -> Tuple[Hashable, int]:
+    """
+    Return the key a SymmetricTranspositionTable stores key under, and the
+    sign to multiply the stored score by to get key's score.
+    """
+    if isinstance(key, GameState):
+        return canonicalize(key)
+    if isinstance(key, tuple) and len(key) == 2 and \
+            isinstance(key[0], GameState):
+        state, _ = canonicalize(key[0])
+        player = key[1] if state is key[0] else 1 - key[1]
+        return (state, player), 1
+    return key, 1
+
+
+def _negate(score: Any) -> Any:
+    """
+    Return score negated, swapping the bound of a (score, bound) pair.
+
+    >>> _negate((5, LOWER_BOUND)) == (-5, UPPER_BOUND)
+    True
+    """
+    if isinstance(score, tuple):
+        value, bound = score
+        return -1 * value, {LOWER_BOUND: UPPER_BOUND,
+                            UPPER_BOUND: LOWER_BOUND}.get(bound, bound)
+    return -1 * score
 
 
-def get_state_score(battle_queue: 'BattleQueue') -> int:
+def get_state_score(battle_queue: 'BattleQueue',
+                    table: TranspositionTable = None) -> int:
     """
     Return an int corresponding to the highest score that the next player in
     battle_queue can guarantee.
 
+    If table is given, it is used to look up and store the scores of the
+    positions that are searched.
+
     For a state that's over, the score is the HP of the character who still has
     HP if the next player who was supposed to act is the winner. If the next
     player who was supposed to act is the loser, then the score is -1 * the
@@ -135,58 +427,89 @@ def get_state_score(battle_queue: 'BattleQueue') -> int:
     >>> bq.add(r)
     >>> get_state_score(bq)
     -10
+    >>> table = TranspositionTable()
+    >>> get_state_score(bq, table)
+    -10
+    >>> get_state_score(bq, table)
+    -10
+    >>> table.hits > 0
+    True
+    """
+    return get_game_state_score(GameState.from_battle_queue(battle_queue),
+                                table)
+
+
+def get_game_state_score(state: 'GameState',
+                         table: TranspositionTable = None,
+                         stats: SearchStats = None, depth: int = 0) -> int:
     """
-    cbq = battle_queue.copy()
-    if cbq.is_over() is True:
-        if cbq.is_empty() is True:
-            if cbq.get_winner() is None:
-                return 0
-            current_player = cbq.peek()
-            if cbq.get_winner() == current_player:
-                return current_player.get_hp()
-            return -1 * current_player.enemy.get_hp()
-        current_player = cbq.peek()
-        if cbq.get_winner() == current_player:
-            return current_player.get_hp()
-        return -1 * current_player.enemy.get_hp()
-    action = cbq.peek().get_available_actions()
+    Return an int corresponding to the highest score that the next player in
+    the GameState state can guarantee, scored the same way as get_state_score.
+
+    If table is given, it is used to look up and store the scores of the
+    positions that are searched. If stats is given, what the search does is
+    counted in it, with state depth moves below the position searched from.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 3, 100,
+    ...                   (1, 0), None)
+    >>> get_game_state_score(state)
+    -10
+    >>> stats = SearchStats()
+    >>> get_game_state_score(state, stats=stats)
+    -10
+    >>> (stats.nodes, stats.children, stats.terminals, stats.max_depth)
+    (3, 6, 4, 2)
+    """
+    if stats is not None and depth > stats.max_depth:
+        stats.max_depth = depth
+    if table is not None:
+        score = table.lookup(state)
+        if score is not None:
+            if stats is not None:
+                stats.cache_hits += 1
+            return score
+    if state.is_over():
+        if stats is not None:
+            stats.terminals += 1
+        return state.get_score()
+    player = state.peek()
+    actions = state.get_available_actions(player)
+    if stats is not None:
+        stats.nodes += 1
+        stats.children += len(actions)
     score_list = []
-    for a in action:
-        if a == 'A':
-            abq = battle_queue.copy()
-            original_player = abq.peek()
-            abq.peek().attack()
-            if abq.peek().get_available_actions() != []:
-                abq.remove()
-            if original_player == abq.peek():
-                score_list.append(get_state_score(abq))
-            else:
-                score_list.append(-1 * get_state_score(abq))
-        if a == 'S':
-            sbq = battle_queue.copy()
-            original_player = sbq.peek()
-            sbq.peek().special_attack()
-            if sbq.peek().get_available_actions() != []:
-                sbq.remove()
-            if original_player == sbq.peek():
-                score_list.append(get_state_score(sbq))
-            else:
-                score_list.append(-1 * get_state_score(sbq))
+    for a in actions:
+        child = state.apply(a)
+        if child.peek() == player:
+            score_list.append(get_game_state_score(child, table, stats,
+                                                   depth + 1))
+        else:
+            score_list.append(-1 * get_game_state_score(child, table, stats,
+                                                        depth + 1))
+    if table is not None:
+        table.store(state, max(score_list))
     return max(score_list)
 
 
 class RecursiveMinimax(Playstyle):
     """
     The RecurviseMinimax playstyle. Inherits from Playstyle.
+
+    table - the TranspositionTable shared by every search this playstyle
+            makes, so positions solved on earlier turns are not solved again.
     """
+    table: TranspositionTable
 
-    def __init__(self, battle_queue: 'BattleQueue') -> None:
+    def __init__(self, battle_queue: 'BattleQueue',
+                 table: TranspositionTable = None) -> None:
         """
         Initialize this RecursiveMinimax playstyle with BattleQueue as
-        its battle queue.
+        its battle queue, and table as its TranspositionTable if given.
         """
         super().__init__(battle_queue)
         self.is_manual = False
+        self.table = table if table is not None \
+            else SymmetricTranspositionTable()
 
     def select_attack(self, parameter: Any = None) -> str:
         """
@@ -214,67 +537,68 @@ class RecursiveMinimax(Playstyle):
         >>> bq.add(r)
         >>> playstyle.select_attack()
         'S'
+        >>> playstyle.collect_stats = True
+        >>> playstyle.select_attack()
+        'S'
+        >>> playstyle.last_search_stats.cache_hits
+        2
         """
-        actions = self.battle_queue.peek().get_available_actions()
-        if not actions:
-            return 'X'
-        if len(actions) == 1:
-            return actions[0]
-        score_dict = {}
-        for a in actions:
-            if a == 'A':
-                abq = self.battle_queue.copy()
-                original_player = abq.peek()
-                abq.peek().attack()
-                if abq.peek().get_available_actions() != []:
-                    abq.remove()
-                if original_player == abq.peek():
-                    score_dict['A'] = get_state_score(abq)
-                else:
-                    score_dict['A'] = -1 * get_state_score(abq)
-            if a == 'S':
-                sbq = self.battle_queue.copy()
-                original_player = sbq.peek()
-                sbq.peek().special_attack()
-                if sbq.peek().get_available_actions() != []:
-                    sbq.remove()
-                if original_player == sbq.peek():
-                    score_dict['S'] = get_state_score(sbq)
+        stats = self._start_search()
+        try:
+            actions = self.battle_queue.peek().get_available_actions()
+            if not actions:
+                return 'X'
+            if len(actions) == 1:
+                return actions[0]
+            state = GameState.from_battle_queue(self.battle_queue)
+            player = state.peek()
+            score_dict = {}
+            for a in actions:
+                child = state.apply(a)
+                score = get_game_state_score(child, self.table, stats, 1)
+                if child.peek() == player:
+                    score_dict[a] = score
                 else:
-                    score_dict['S'] = -1 * get_state_score(sbq)
-        if score_dict['A'] < score_dict['S']:
-            return 'S'
-        return 'A'
+                    score_dict[a] = -1 * score
+            if stats is not None:
+                stats.nodes += 1
+                stats.children += len(actions)
+            if score_dict['A'] < score_dict['S']:
+                return 'S'
+            return 'A'
+        finally:
+            self._finish_search(stats)
 
     def copy(self, new_battle_queue: 'BattleQueue'):
         """
         Return a copy of this RecursiveMinimax Playstyle which uses the
-        BattleQueue new_battle_queue.
+        BattleQueue new_battle_queue. The copy shares this playstyle's
+        TranspositionTable.
         """
-        return RecursiveMinimax(new_battle_queue)
+        return RecursiveMinimax(new_battle_queue, self.table)
 
 
 class BattleTree:
     """
     A class representing a BattleTree.
 
-    bq - The battlequeue of the BattleTree.
+    state - the GameState of the BattleTree.
     children - The root nodes of the children of this BattleTree.
     highest_score - the highest score this BattleTree is guarantee to get.
-    parent_peek - the player returned by calling battlequeue's peek() method
+    parent_peek - the player returned by calling peek() on the GameState
     of this BattleTree's parent.
     """
-    bq: 'BattleQueue'
+    state: 'GameState'
     children: List['BattleTree']
     highest_score: Union[int, None]
-    parent_peek: 'Character'
+    parent_peek: int
 
-    def __init__(self, battle_queue: 'BattleQueue', p: 'Character' = None,
+    def __init__(self, state: 'GameState', p: int = None,
                  children: List['BattleTree'] = None) -> None:
         """
-        Initialize this BattleTree with the battle_queue and children.
+        Initialize this BattleTree with the state and children.
         """
-        self.bq = battle_queue
+        self.state = state
         self.children = children[:] if children else None
         self.highest_score = None
         self.parent_peek = p
@@ -295,7 +619,7 @@ class IterativeMinimax(Playstyle):
 
     def over_state_score(self, bt: 'BattleTree') -> None:
         """
-        Set the highest score for the bt when the its battlequeue is over.
+        Set the highest score for the bt when the its state is over.
 
         >>> from a2_battle_queue import BattleQueue
         >>> from a2_characters import Rogue, Mage
@@ -308,25 +632,12 @@ class IterativeMinimax(Playstyle):
         >>> bq.add(r)
         >>> bq.add(m)
         >>> m.set_hp(0)
-        >>> bt = BattleTree(bq.copy())
+        >>> bt = BattleTree(GameState.from_battle_queue(bq))
         >>> playstyle.over_state_score(bt)
         >>> bt.highest_score
         100
         """
-        if bt.bq.is_empty() is True:
-            if bt.bq.get_winner() is None:
-                bt.highest_score = 0
-            else:
-                current_player = bt.bq.peek()
-                if bt.bq.get_winner() == current_player:
-                    bt.highest_score = current_player.get_hp()
-                else:
-                    bt.bq.highest_score = -1 * current_player.enemy.get_hp()
-        current_player = bt.bq.peek()
-        if bt.bq.get_winner() == current_player:
-            bt.highest_score = current_player.get_hp()
-        else:
-            bt.highest_score = -1 * current_player.enemy.get_hp()
+        bt.highest_score = bt.state.get_score()
 
     def none_children_state(self, bt: 'BattleTree', stack: List['BattleTree'])\
             -> None:
@@ -345,31 +656,16 @@ class IterativeMinimax(Playstyle):
         >>> bq.add(m)
         >>> m.set_hp(3)
         >>> stack = []
-        >>> bt = BattleTree(bq.copy())
+        >>> bt = BattleTree(GameState.from_battle_queue(bq))
         >>> playstyle.none_children_state(bt, stack)
         >>> len(stack)
         3
         >>> bt.children is None
         False
         """
-        actions = bt.bq.peek().get_available_actions()
-        children_list = []
-        for a in actions:
-            if a == 'A':
-                abq = bt.bq.copy()
-                parent_player = abq.peek()
-                abq.peek().attack()
-                if abq.peek().get_available_actions() != []:
-                    abq.remove()
-                children_list.append(BattleTree(abq, parent_player))
-            if a == 'S':
-                sbq = bt.bq.copy()
-                parent_player = sbq.peek()
-                sbq.peek().special_attack()
-                if sbq.peek().get_available_actions() != []:
-                    sbq.remove()
-                children_list.append(BattleTree(sbq, parent_player))
-        bt.children = children_list
+        parent_player = bt.state.peek()
+        bt.children = [BattleTree(bt.state.apply(a), parent_player)
+                       for a in bt.state.get_available_actions(parent_player)]
         stack.append(bt)
         for child in bt.children:
             stack.append(child)
@@ -390,7 +686,7 @@ class IterativeMinimax(Playstyle):
         >>> bq.add(m)
         >>> m.set_hp(3)
         >>> stack = []
-        >>> bt = BattleTree(bq.copy())
+        >>> bt = BattleTree(GameState.from_battle_queue(bq))
         >>> playstyle.none_children_state(bt, stack)
         >>> bt.children[0].highest_score = 50
         >>> bt.children[1].highest_score = -50
@@ -400,7 +696,7 @@ class IterativeMinimax(Playstyle):
         """
         score_list = []
         for child in bt.children:
-            if child.parent_peek == child.bq.peek():
+            if child.parent_peek == child.state.peek():
                 score_list.append(child.highest_score)
             else:
                 score_list.append(-1 * child.highest_score)
@@ -437,15 +733,40 @@ class IterativeMinimax(Playstyle):
         >>> playstyle.get_state_score_iterative(bq)
         -10
         """
-        present_state = BattleTree(battle_queue.copy())
+        return self.get_game_state_score_iterative(
+            GameState.from_battle_queue(battle_queue))
+
+    def get_game_state_score_iterative(self, state: 'GameState',
+                                       stats: SearchStats = None) -> int:
+        """
+        Return an int corresponding to the highest score that the next player in
+        the GameState state can guarantee.(Iteratively)
+
+        If stats is given, what the search does is counted in it, with state
+        one move below the position searched from.
+        """
+        present_state = BattleTree(state)
         stack = [present_state]
+        if stats is not None:
+            # The depth of each BattleTree waiting on the stack, by id
+            depths = {id(present_state): 1}
+            stats.max_depth = max(stats.max_depth, 1)
         while stack:
             above = stack.pop()
-            if above.bq.is_over() is True:
+            if above.state.is_over() is True:
+                if stats is not None:
+                    stats.terminals += 1
                 self.over_state_score(above)
             else:
                 if above.children is None:
                     self.none_children_state(above, stack)
+                    if stats is not None:
+                        stats.nodes += 1
+                        stats.children += len(above.children)
+                        depth = depths[id(above)] + 1
+                        stats.max_depth = max(stats.max_depth, depth)
+                        for child in above.children:
+                            depths[id(child)] = depth
                 elif isinstance(above.children, list) is True:
                     self.children_list_state(above)
         return present_state.highest_score
@@ -476,44 +797,925 @@ class IterativeMinimax(Playstyle):
         >>> bq.add(r)
         >>> playstyle.select_attack()
         'S'
+        >>> seen = []
+        >>> playstyle.on_search = seen.append
+        >>> playstyle.select_attack()
+        'S'
+        >>> seen[0] is playstyle.last_search_stats
+        True
+        >>> seen[0].max_depth
+        2
+        """
+        stats = self._start_search()
+        try:
+            actions = self.battle_queue.peek().get_available_actions()
+            if not actions:
+                return 'X'
+            if len(actions) == 1:
+                return actions[0]
+            state = GameState.from_battle_queue(self.battle_queue)
+            player = state.peek()
+            score_dict = {}
+            for a in actions:
+                child = state.apply(a)
+                score = self.get_game_state_score_iterative(child, stats)
+                if child.peek() == player:
+                    score_dict[a] = score
+                else:
+                    score_dict[a] = -1 * score
+            if stats is not None:
+                stats.nodes += 1
+                stats.children += len(actions)
+            if score_dict['A'] < score_dict['S']:
+                return 'S'
+            return 'A'
+        finally:
+            self._finish_search(stats)
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this IterativeMinimax Playstyle which uses the
+        BattleQueue new_battle_queue.
+        """
+        return IterativeMinimax(new_battle_queue)
+
+
+class MemoryBoundedIterativeMinimax(IterativeMinimax):
+    """
+    The IterativeMinimax playstyle, keeping track of how many BattleTrees
+    its searches hold at once. When release is True, each BattleTree drops
+    its state and children as soon as it is scored, keeping only its
+    highest_score, from the point of view of its parent's player, so the
+    searches only hold the BattleTrees along the current path and their
+    siblings. Inherits from IterativeMinimax.
+
+    The byte counts are node counts times node_bytes, so they bound memory
+    only as well as the node counts do: they leave out the objects a
+    GameState shares with other GameStates, such as its Sorcerers' trees.
+
+    release - whether BattleTrees drop their state and children once they
+              are scored.
+    live_nodes - the number of BattleTrees the current search holds below
+                 its root.
+    live_bytes - live_nodes times node_bytes.
+    peak_live_nodes - the most BattleTrees held at once since the last
+                      reset_peaks().
+    peak_bytes - peak_live_nodes times node_bytes.
+    node_bytes - the shallow size of a BattleTree holding a GameState, in
+                 bytes.
+    """
+    release: bool
+    live_nodes: int
+    live_bytes: int
+    peak_live_nodes: int
+    peak_bytes: int
+    node_bytes: int
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 release: bool = True) -> None:
+        """
+        Initialize this MemoryBoundedIterativeMinimax playstyle with
+        BattleQueue as its battle queue.
+        """
+        super().__init__(battle_queue)
+        self.release = release
+        self.live_nodes = 0
+        self.live_bytes = 0
+        self.node_bytes = 0
+        self.reset_peaks()
+
+    def reset_peaks(self) -> None:
+        """
+        Start counting peak_live_nodes and peak_bytes again.
+        """
+        self.peak_live_nodes = 0
+        self.peak_bytes = 0
+
+    def _track(self, count: int) -> None:
+        """
+        Add count BattleTrees to the live BattleTrees, or remove them if count
+        is negative.
+        """
+        self.live_nodes += count
+        self.live_bytes = self.live_nodes * self.node_bytes
+        self.peak_live_nodes = max(self.peak_live_nodes, self.live_nodes)
+        self.peak_bytes = max(self.peak_bytes, self.live_bytes)
+
+    def _drop_state(self, bt: 'BattleTree') -> None:
+        """
+        Drop the state of the scored bt, turning its highest_score to the
+        point of view of its parent's player first, since that is all its
+        parent needs from it.
+        """
+        if bt.parent_peek is not None and bt.parent_peek != bt.state.peek():
+            bt.highest_score = -bt.highest_score
+        bt.state = None
+
+    def over_state_score(self, bt: 'BattleTree') -> None:
+        """
+        Set the highest score for the bt when its state is over, and drop
+        its state if release is True.
+        """
+        super().over_state_score(bt)
+        if self.release:
+            self._drop_state(bt)
+
+    def none_children_state(self, bt: 'BattleTree', stack: List['BattleTree'])\
+            -> None:
+        """
+        Set the children of bt and add bt and its children back to the stack.
+        """
+        super().none_children_state(bt, stack)
+        self._track(len(bt.children))
+
+    def children_list_state(self, bt: 'BattleTree') -> None:
+        """
+        Set the bt's highest_score when the children of bt is a list, and
+        drop its state and children if release is True.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, MemoryBoundedIterativeMinimax(bq))
+        >>> m = Mage("m", bq, MemoryBoundedIterativeMinimax(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(3)
+        >>> stack = []
+        >>> bt = BattleTree(GameState.from_battle_queue(bq))
+        >>> r.playstyle.none_children_state(bt, stack)
+        >>> for child in bt.children:
+        ...     r.playstyle.over_state_score(child)
+        >>> r.playstyle.children_list_state(bt)
+        >>> (bt.highest_score, bt.state, bt.children)
+        (100, None, [])
+        """
+        if not self.release:
+            super().children_list_state(bt)
+            return
+        bt.highest_score = max(child.highest_score for child in bt.children)
+        self._track(-len(bt.children))
+        bt.children = []
+        self._drop_state(bt)
+
+    def get_game_state_score_iterative(self, state: 'GameState',
+                                       stats: SearchStats = None) -> int:
+        """
+        Return an int corresponding to the highest score that the next player in
+        the GameState state can guarantee.(Iteratively)
+
+        If stats is given, what the search does is counted in it.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, MemoryBoundedIterativeMinimax(bq))
+        >>> m = Mage("m", bq, MemoryBoundedIterativeMinimax(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(3)
+        >>> r.playstyle.get_state_score_iterative(bq)
+        100
+        >>> r.playstyle.peak_live_nodes
+        2
+        """
+        self.live_nodes = 0
+        self.live_bytes = 0
+        root = BattleTree(state)
+        self.node_bytes = sys.getsizeof(root) + sys.getsizeof(root.__dict__) \
+            + sys.getsizeof(state) + sys.getsizeof(state.queue)
+        return super().get_game_state_score_iterative(state, stats)
+
+    def get_state_score_iterative(self, battle_queue: 'BattleQueue') -> int:
+        """
+        Return an int corresponding to the highest score that the next player in
+        battle_queue can guarantee.(Iteratively)
+        """
+        self.reset_peaks()
+        return super().get_state_score_iterative(battle_queue)
+
+    def select_attack(self, parameter: Any = None):
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+        """
+        self.reset_peaks()
+        return super().select_attack(parameter)
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this MemoryBoundedIterativeMinimax Playstyle which
+        uses the BattleQueue new_battle_queue.
+        """
+        return MemoryBoundedIterativeMinimax(new_battle_queue, self.release)
+
+
+def hp_sp_evaluation(state: 'GameState') -> int:
+    """
+    Return a guess at the score the next player in the unfinished GameState
+    state can guarantee: how much more HP they have than their enemy, plus a
+    tenth of how much more SP they have.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 60, 50, 40, 100,
+    ...                   (0, 1), None)
+    >>> hp_sp_evaluation(state)
+    15
+    """
+    player = state.peek()
+    hp_lead = state.get_hp(player) - state.get_hp(1 - player)
+    sp_lead = state.get_sp(player) - state.get_sp(1 - player)
+    return hp_lead + sp_lead // 10
+
+
+class IterativeDeepeningMinimax(IterativeMinimax):
+    """
+    The IterativeMinimax playstyle limited to a time budget. It searches one
+    ply deeper at a time until its time runs out, scoring the positions at
+    the depth limit with a static evaluation, and picks the best attack of the
+    last depth it completed. Inherits from IterativeMinimax.
+
+    evaluate - the function that scores unfinished GameStates at the depth
+               limit, from the point of view of their next player.
+    time_budget - the number of seconds select_attack searches for when no
+                  budget is passed to it.
+    last_depth - the depth of the last search select_attack completed, or
+                 None if it has not searched yet.
+    """
+    evaluate: Callable[['GameState'], int]
+    time_budget: float
+    last_depth: Union[int, None]
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 evaluate: Callable[['GameState'], int] = hp_sp_evaluation,
+                 time_budget: float = 1.0) -> None:
+        """
+        Initialize this IterativeDeepeningMinimax playstyle with BattleQueue
+        as its battle queue, evaluate as its static evaluation and time_budget
+        as its default number of seconds to search for.
+        """
+        super().__init__(battle_queue)
+        self.evaluate = evaluate
+        self.time_budget = time_budget
+        self.last_depth = None
+        self._horizon_reached = False
+
+    def get_game_state_score_limited(self, state: 'GameState', depth: int,
+                                     deadline: float = None) \
+            -> Union[int, None]:
+        """
+        Return the highest score the next player in the GameState state can
+        guarantee when looking at most depth moves ahead. Positions at the
+        depth limit are scored with this playstyle's evaluate.
+
+        Return None if time.monotonic() passes deadline before the search is
+        done.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> playstyle = IterativeDeepeningMinimax(BattleQueue())
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 3,
+        ...                   100, (1, 0), None)
+        >>> playstyle.get_game_state_score_limited(state, 0)
+        -37
+        >>> playstyle.get_game_state_score_limited(state, 10)
+        -10
+        """
+        present_state = BattleTree(state)
+        stack = [(present_state, 0)]
+        nodes = 0
+        while stack:
+            nodes += 1
+            if deadline is not None and nodes % 256 == 0 and \
+                    time.monotonic() > deadline:
+                return None
+            above, above_depth = stack.pop()
+            if above.state.is_over() is True:
+                self.over_state_score(above)
+            elif above_depth == depth:
+                self._horizon_reached = True
+                above.highest_score = self.evaluate(above.state)
+            elif above.children is None:
+                # The children are pushed below with their depths instead.
+                self.none_children_state(above, [])
+                stack.append((above, above_depth))
+                for child in above.children:
+                    stack.append((child, above_depth + 1))
+            else:
+                self.children_list_state(above)
+        return present_state.highest_score
+
+    def select_attack(self, parameter: Any = None):
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        parameter is the number of seconds to search for. If it is None, this
+        playstyle's time_budget is used. The first ply is always searched, so
+        a move is returned even if the budget is too small for it.
+
+        Return 'X' if a valid move cannot be found.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, IterativeDeepeningMinimax(bq))
+        >>> m = Mage("m", bq, IterativeDeepeningMinimax(bq))
+        >>> playstyle = m.playstyle
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(3)
+        >>> playstyle.select_attack(0.5)
+        'A'
+        >>> r.set_hp(40)
+        >>> bq.remove()
+        r (Rogue): 40/100
+        >>> bq.add(r)
+        >>> playstyle.select_attack(0.5)
+        'S'
         """
         actions = self.battle_queue.peek().get_available_actions()
         if not actions:
             return 'X'
         if len(actions) == 1:
             return actions[0]
-        score_dict = {}
-        for a in actions:
-            if a == 'A':
-                abq = self.battle_queue.copy()
-                original_player = abq.peek()
-                abq.peek().attack()
-                if abq.peek().get_available_actions() != []:
-                    abq.remove()
-                if original_player == abq.peek():
-                    score_dict['A'] = self.get_state_score_iterative(abq)
+        budget = self.time_budget if parameter is None else parameter
+        deadline = time.monotonic() + budget
+        state = GameState.from_battle_queue(self.battle_queue)
+        player = state.peek()
+        children = {a: state.apply(a) for a in actions}
+        best = None
+        depth = 0
+        while True:
+            self._horizon_reached = False
+            score_dict = {}
+            for a in actions:
+                score = self.get_game_state_score_limited(
+                    children[a], depth, None if best is None else deadline)
+                if score is None:
+                    return best
+                if children[a].peek() == player:
+                    score_dict[a] = score
                 else:
-                    score_dict['A'] = -1 * self.get_state_score_iterative(abq)
-            if a == 'S':
-                sbq = self.battle_queue.copy()
-                original_player = sbq.peek()
-                sbq.peek().special_attack()
-                if sbq.peek().get_available_actions() != []:
-                    sbq.remove()
-                if original_player == sbq.peek():
-                    score_dict['S'] = self.get_state_score_iterative(sbq)
-                else:
-                    score_dict['S'] = -1 * self.get_state_score_iterative(sbq)
+                    score_dict[a] = -1 * score
+            best = 'S' if score_dict['A'] < score_dict['S'] else 'A'
+            self.last_depth = depth + 1
+            if not self._horizon_reached or time.monotonic() > deadline:
+                return best
+            depth += 1
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this IterativeDeepeningMinimax Playstyle which uses
+        the BattleQueue new_battle_queue.
+        """
+        return IterativeDeepeningMinimax(new_battle_queue, self.evaluate,
+                                         self.time_budget)
+
+
+# The kinds of score a TranspositionTable used by an alpha-beta search holds:
+# the exact score, or a lower or upper bound on it.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+def order_moves(state: 'GameState') -> List[Tuple[str, 'GameState']]:
+    """
+    Return the (action, GameState after action) pairs for the next player in
+    state, most promising first: moves that win the game right away, then
+    moves that leave the enemy with the least HP. Ties keep the order of the
+    available actions.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 12, 100,
+    ...                   (0, 1), None)
+    >>> [action for action, _ in order_moves(state)]
+    ['S', 'A']
+    """
+    player = state.peek()
+    moves = [(a, state.apply(a))
+             for a in state.get_available_actions(player)]
+
+    def promise(move: Tuple[str, 'GameState']) -> Tuple[bool, int]:
+        """
+        Return a key that sorts move before less promising moves.
+        """
+        child = move[1]
+        return (child.get_winner() != player, child.get_hp(1 - player))
+
+    moves.sort(key=promise)
+    return moves
+
+
+def _probe(table: TranspositionTable, state: 'GameState', alpha: float,
+           beta: float) -> Union[int, None]:
+    """
+    Return the score table holds for state if it settles a search of state
+    with the window alpha to beta, or None otherwise.
+    """
+    entry = table.lookup(state)
+    if entry is None:
+        return None
+    score, bound = entry
+    if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or \
+            (bound == UPPER_BOUND and score <= alpha):
+        return score
+    return None
+
+
+def _record(table: TranspositionTable, state: 'GameState', score: int,
+            alpha: float, beta: float) -> None:
+    """
+    Store score in table as the result of searching state with the window
+    alpha to beta.
+    """
+    if score <= alpha:
+        table.store(state, (score, UPPER_BOUND))
+    elif score >= beta:
+        table.store(state, (score, LOWER_BOUND))
+    else:
+        table.store(state, (score, EXACT))
+
+
+def alpha_beta_score(state: 'GameState', alpha: float = -float('inf'),
+                     beta: float = float('inf'),
+                     table: TranspositionTable = None) -> int:
+    """
+    Return the highest score the next player in state can guarantee, using
+    alpha-beta pruning.
+
+    The score is exact if it lies strictly between alpha and beta. Otherwise
+    it is only a bound: a score <= alpha means the real score is at most
+    alpha, and a score >= beta means the real score is at least beta.
+
+    If table is given, it is used to look up and store bounds on the scores
+    of the positions that are searched.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 3, 100,
+    ...                   (1, 0), None)
+    >>> alpha_beta_score(state)
+    -10
+    """
+    if state.is_over():
+        return state.get_score()
+    if table is not None:
+        score = _probe(table, state, alpha, beta)
+        if score is not None:
+            return score
+    alpha_original = alpha
+    player = state.peek()
+    best = -float('inf')
+    for _, child in order_moves(state):
+        if child.peek() == player:
+            score = alpha_beta_score(child, alpha, beta, table)
+        else:
+            score = -1 * alpha_beta_score(child, -beta, -alpha, table)
+        best = max(best, score)
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    if table is not None:
+        _record(table, state, best, alpha_original, beta)
+    return best
+
+
+def alpha_beta_select(state: 'GameState',
+                      score: Callable[['GameState', float, float], int]) \
+        -> str:
+    """
+    Return the attack the next player in state should make: 'S' if the
+    special attack scores strictly higher than the attack, and 'A' otherwise.
+
+    score(child, alpha, beta) searches the GameState child with the window
+    alpha to beta. Only the most promising move is scored exactly; the other
+    is only checked against it with a null window.
+    """
+    player = state.peek()
+    scores = {}
+    alpha, beta = -float('inf'), float('inf')
+    for action, child in order_moves(state):
+        if child.peek() == player:
+            scores[action] = score(child, alpha, beta)
+        else:
+            scores[action] = -1 * score(child, -beta, -alpha)
+        if action == 'A':
+            alpha, beta = scores[action], scores[action] + 1
+        else:
+            alpha, beta = scores[action] - 1, scores[action]
+    if scores['A'] < scores['S']:
+        return 'S'
+    return 'A'
+
+
+class AlphaBetaRecursiveMinimax(RecursiveMinimax):
+    """
+    The RecursiveMinimax playstyle with alpha-beta pruning. It picks the same
+    attacks as RecursiveMinimax, but skips the parts of the game tree that
+    cannot change its choice. Inherits from RecursiveMinimax.
+
+    table - the TranspositionTable of score bounds shared by every search
+            this playstyle makes.
+    """
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, AlphaBetaRecursiveMinimax(bq))
+        >>> m = Mage("m", bq, AlphaBetaRecursiveMinimax(bq))
+        >>> playstyle = m.playstyle
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(3)
+        >>> playstyle.select_attack()
+        'A'
+        >>> r.set_hp(40)
+        >>> bq.remove()
+        r (Rogue): 40/100
+        >>> bq.add(r)
+        >>> playstyle.select_attack()
+        'S'
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        return alpha_beta_select(
+            GameState.from_battle_queue(self.battle_queue),
+            lambda child, alpha, beta: alpha_beta_score(child, alpha, beta,
+                                                        self.table))
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this AlphaBetaRecursiveMinimax Playstyle which uses
+        the BattleQueue new_battle_queue. The copy shares this playstyle's
+        TranspositionTable.
+        """
+        return AlphaBetaRecursiveMinimax(new_battle_queue, self.table)
+
+
+class AlphaBetaIterativeMinimax(IterativeMinimax):
+    """
+    The IterativeMinimax playstyle with alpha-beta pruning. It gives the same
+    scores and attacks as IterativeMinimax, but skips the parts of the game
+    tree that cannot change them. Inherits from IterativeMinimax.
+
+    table - the TranspositionTable of score bounds shared by every search
+            this playstyle makes.
+    """
+    table: TranspositionTable
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 table: TranspositionTable = None) -> None:
+        """
+        Initialize this AlphaBetaIterativeMinimax playstyle with BattleQueue
+        as its battle queue, and table as its TranspositionTable if given.
+        """
+        super().__init__(battle_queue)
+        self.table = table if table is not None \
+            else SymmetricTranspositionTable()
+
+    def get_game_state_score_iterative(self, state: 'GameState',
+                                       alpha: float = -float('inf'),
+                                       beta: float = float('inf')) -> int:
+        """
+        Return an int corresponding to the highest score that the next player
+        in the GameState state can guarantee.(Iteratively)
+
+        As with alpha_beta_score, the score is only exact if it lies strictly
+        between alpha and beta.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> playstyle = AlphaBetaIterativeMinimax(BattleQueue())
+        >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 3,
+        ...                   100, (1, 0), None)
+        >>> playstyle.get_game_state_score_iterative(state)
+        -10
+        """
+        if state.is_over():
+            return state.get_score()
+        # Each frame is [state, player, moves, index of the next move,
+        #                alpha, beta, best score, alpha at the start].
+        stack = [[state, state.peek(), order_moves(state), 0, alpha, beta,
+                  -float('inf'), alpha]]
+        result = None
+        while stack:
+            frame = stack[-1]
+            node, player, moves, index, alpha, beta, best, _ = frame
+            if result is not None:
+                child = moves[index - 1][1]
+                score = result if child.peek() == player else -1 * result
+                best = frame[6] = max(best, score)
+                alpha = frame[4] = max(alpha, score)
+                result = None
+            if index == len(moves) or alpha >= beta:
+                _record(self.table, node, best, frame[7], beta)
+                stack.pop()
+                result = best
+                continue
+            frame[3] += 1
+            child = moves[index][1]
+            if child.peek() == player:
+                child_alpha, child_beta = alpha, beta
+            else:
+                child_alpha, child_beta = -beta, -alpha
+            if child.is_over():
+                result = child.get_score()
+                continue
+            score = _probe(self.table, child, child_alpha, child_beta)
+            if score is not None:
+                result = score
+                continue
+            stack.append([child, child.peek(), order_moves(child), 0,
+                          child_alpha, child_beta, -float('inf'),
+                          child_alpha])
+        return result
+
+    def select_attack(self, parameter: Any = None):
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, AlphaBetaIterativeMinimax(bq))
+        >>> m = Mage("m", bq, AlphaBetaIterativeMinimax(bq))
+        >>> playstyle = m.playstyle
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(3)
+        >>> playstyle.select_attack()
+        'A'
+        >>> r.set_hp(40)
+        >>> bq.remove()
+        r (Rogue): 40/100
+        >>> bq.add(r)
+        >>> playstyle.select_attack()
+        'S'
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        return alpha_beta_select(
+            GameState.from_battle_queue(self.battle_queue),
+            self.get_game_state_score_iterative)
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this AlphaBetaIterativeMinimax Playstyle which uses
+        the BattleQueue new_battle_queue. The copy shares this playstyle's
+        TranspositionTable.
+        """
+        return AlphaBetaIterativeMinimax(new_battle_queue, self.table)
+
+
+# The TranspositionTable each worker process of a ParallelMinimax keeps
+# between the subtrees it is given.
+_WORKER_TABLE = SymmetricTranspositionTable()
+
+
+def _score_subtree(state: 'GameState') -> int:
+    """
+    Return get_game_state_score of state, using this process's worker table.
+    ParallelMinimax sends this to its worker processes.
+    """
+    return get_game_state_score(state, _WORKER_TABLE)
+
+
+class ParallelMinimax(RecursiveMinimax):
+    """
+    The RecursiveMinimax playstyle with the subtrees below the current
+    position scored in parallel by a pool of worker processes. It picks the
+    same attacks as RecursiveMinimax. Inherits from RecursiveMinimax.
+
+    Daemonic processes, like the workers of a multiprocessing.Pool, cannot
+    start worker processes of their own, so in one of those the subtrees are
+    scored one after another instead.
+
+    split_depth - 1 to give each move to a worker, or 2 to give each reply
+                  to each move to a worker.
+    max_workers - the number of worker processes, or None for one per CPU.
+    """
+    split_depth: int
+    max_workers: Union[int, None]
+
+    def __init__(self, battle_queue: 'BattleQueue', split_depth: int = 2,
+                 max_workers: int = None,
+                 executor: ProcessPoolExecutor = None) -> None:
+        """
+        Initialize this ParallelMinimax playstyle with BattleQueue as its
+        battle queue. The worker processes are started the first time they
+        are needed, unless an executor to share is given.
+        """
+        super().__init__(battle_queue)
+        self.split_depth = split_depth
+        self.max_workers = max_workers
+        self._executor = executor
+
+    def _get_executor(self) -> Union[ProcessPoolExecutor, None]:
+        """
+        Return the pool of worker processes, starting it if needed, or None
+        if this process is daemonic and cannot start one.
+        """
+        if self._executor is None:
+            if multiprocessing.current_process().daemon:
+                return None
+            self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    def _split(self, state: 'GameState', depth: int) -> Any:
+        """
+        Return a plan for scoring state: its score if it is over, a Future
+        for its score if depth is 0, and otherwise a list of
+        (child, plan for child) pairs.
+        """
+        if state.is_over():
+            return state.get_score()
+        if depth == 0:
+            executor = self._get_executor()
+            if executor is None:
+                return _score_subtree(state)
+            return executor.submit(_score_subtree, state)
+        return [(child, self._split(child, depth - 1))
+                for child in [state.apply(a) for a in
+                              state.get_available_actions(state.peek())]]
+
+    def _merge(self, state: 'GameState', plan: Any) -> int:
+        """
+        Return the score of state from its plan, combining the scores of
+        children the same way get_state_score does.
+        """
+        if isinstance(plan, int):
+            return plan
+        if isinstance(plan, Future):
+            return plan.result()
+        player = state.peek()
+        score_list = []
+        for child, child_plan in plan:
+            if child.peek() == player:
+                score_list.append(self._merge(child, child_plan))
+            else:
+                score_list.append(-1 * self._merge(child, child_plan))
+        return max(score_list)
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        state = GameState.from_battle_queue(self.battle_queue)
+        player = state.peek()
+        plans = {}
+        for a in actions:
+            child = state.apply(a)
+            plans[a] = (child, self._split(child, self.split_depth - 1))
+        score_dict = {}
+        for a, (child, plan) in plans.items():
+            if child.peek() == player:
+                score_dict[a] = self._merge(child, plan)
+            else:
+                score_dict[a] = -1 * self._merge(child, plan)
         if score_dict['A'] < score_dict['S']:
             return 'S'
         return 'A'
 
+    def close(self) -> None:
+        """
+        Shut down the worker processes of this ParallelMinimax.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     def copy(self, new_battle_queue: 'BattleQueue'):
         """
-        Return a copy of this IterativeMinimax Playstyle which uses the
-        BattleQueue new_battle_queue.
+        Return a copy of this ParallelMinimax Playstyle which uses the
+        BattleQueue new_battle_queue. The copy shares this playstyle's
+        worker processes.
         """
-        return IterativeMinimax(new_battle_queue)
+        return ParallelMinimax(new_battle_queue, self.split_depth,
+                               self.max_workers, self._executor)
+
+
+def expectimax_score(state: 'GameState', me: int,
+                     table: TranspositionTable = None) -> float:
+    """
+    Return the score player me can expect from the GameState state, scored
+    the same way as get_state_score but always from me's point of view, when
+    me plays as well as possible and the other player attacks at random,
+    like RandomPlaystyle.
+
+    If table is given, it is used to look up and store the expected scores
+    of the positions that are searched.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 40, 100, 3, 100,
+    ...                   (1, 0), None)
+    >>> expectimax_score(state, 0)
+    20.0
+    >>> get_game_state_score(state)
+    -10
+    """
+    if table is not None:
+        score = table.lookup((state, me))
+        if score is not None:
+            return score
+    if state.is_over():
+        score = state.get_score()
+        return score if state.peek() == me else -1 * score
+    player = state.peek()
+    score_list = [expectimax_score(state.apply(a), me, table)
+                  for a in state.get_available_actions(player)]
+    if player == me:
+        score = max(score_list)
+    else:
+        score = sum(score_list) / len(score_list)
+    if table is not None:
+        table.store((state, me), score)
+    return score
+
+
+# The TranspositionTable of expected scores that every ExpectimaxPlaystyle
+# shares by default, so positions from earlier games are not searched again.
+EXPECTIMAX_TABLE = SymmetricTranspositionTable()
+
+
+class ExpectimaxPlaystyle(Playstyle):
+    """
+    A playstyle for games against a RandomPlaystyle opponent, which picks
+    the attack with the best expected score instead of assuming the opponent
+    plays perfectly. Inherits from Playstyle.
+
+    table - the TranspositionTable of expected scores, keyed on the
+            GameState and the player whose score it is.
+    """
+    table: TranspositionTable
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 table: TranspositionTable = None) -> None:
+        """
+        Initialize this ExpectimaxPlaystyle with BattleQueue as its battle
+        queue. Expected scores are kept in table, or in EXPECTIMAX_TABLE if
+        table is None.
+        """
+        super().__init__(battle_queue)
+        self.is_manual = False
+        self.table = table if table is not None else EXPECTIMAX_TABLE
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        state = GameState.from_battle_queue(self.battle_queue)
+        me = state.peek()
+        score_dict = {a: expectimax_score(state.apply(a), me, self.table)
+                      for a in actions}
+        if score_dict['A'] < score_dict['S']:
+            return 'S'
+        return 'A'
+
+    def copy(self, new_battle_queue: 'BattleQueue'):
+        """
+        Return a copy of this ExpectimaxPlaystyle which uses the
+        BattleQueue new_battle_queue and the same table.
+        """
+        return ExpectimaxPlaystyle(new_battle_queue, self.table)
 
 
 if __name__ == '__main__':
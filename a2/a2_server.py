@@ -0,0 +1,336 @@
+"""
+An asyncio match server for A2.
+
+Each connection to the server plays one Match. The client sends commands one
+per line, and the server answers each with one line:
+
+    NEW <queue> <p1 class> <p1 playstyle> <p2 class> <p2 playstyle>
+        Start a new Match, with keys from BATTLE_QUEUE_CLASSES,
+        CHARACTER_CLASSES and PLAYSTYLE_CLASSES, and answer with its STATE.
+    MOVE <key>
+        Press key for the manual player whose turn it is, and answer with the
+        STATE after the attack.
+    STATE
+        Answer with the STATE of the Match.
+    STATS
+        Answer with "STATS" and the latency metrics of the Match, as JSON.
+    QUIT
+        Close the connection.
+
+A STATE answer is "STATE" followed by update_ui() (without the sprites) and
+whether the game is over and who won, as JSON. Any command that fails is
+answered with "ERROR" and a message.
+
+Whenever it is a computer playstyle's turn, the server asks for its attack in
+an executor, so a slow search never holds up the other connections, and plays
+computer turns until a manual player has to move or the game is over.
+
+Run this file to start a server, e.g.
+    python a2_server.py --port 1480
+"""
+from typing import Any, Dict, List, Union
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from a2_game import Match
+
+
+class LatencyMetrics:
+    """
+    The latencies of one kind of event in a Match, in seconds.
+
+    count - the number of events recorded.
+    total - the total latency of every event.
+    worst - the longest latency of any event.
+    last - the latency of the latest event.
+    """
+    count: int
+    total: float
+    worst: float
+    last: float
+
+    def __init__(self) -> None:
+        """
+        Initialize these LatencyMetrics with no events.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Record an event that took seconds.
+
+        >>> metrics = LatencyMetrics()
+        >>> metrics.record(0.5)
+        >>> metrics.record(1.5)
+        >>> metrics.to_dict()['mean_ms']
+        1000.0
+        """
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+        self.last = seconds
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        """
+        Return these LatencyMetrics in milliseconds.
+        """
+        mean = self.total / self.count if self.count else 0.0
+        return {'count': self.count,
+                'mean_ms': round(mean * 1000, 3),
+                'max_ms': round(self.worst * 1000, 3),
+                'last_ms': round(self.last * 1000, 3)}
+
+
+class MatchSession:
+    """
+    A Match being played over one connection to a MatchServer.
+
+    match_id - the number of this session on its server.
+    match - the Match being played, or None before NEW.
+    ai_turns - the latency of every computer playstyle's decision.
+    requests - the time taken to answer every command.
+    """
+    match_id: int
+    match: Union[Match, None]
+    ai_turns: LatencyMetrics
+    requests: LatencyMetrics
+
+    def __init__(self, match_id: int) -> None:
+        """
+        Initialize this MatchSession with no Match.
+        """
+        self.match_id = match_id
+        self.match = None
+        self.ai_turns = LatencyMetrics()
+        self.requests = LatencyMetrics()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return the state of this session's Match for a STATE answer.
+        """
+        state = {key: value for key, value in self.match.update_ui().items()
+                 if not key.endswith('_sprite')}
+        state['game_is_over'] = self.match.game_is_over
+        winner = self.match.game_winner
+        state['winner'] = winner.get_name() if winner is not None else None
+        return state
+
+    def close(self) -> None:
+        """
+        Close this session's Match, if it has one.
+        """
+        if self.match is not None:
+            self.match.close()
+            self.match = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the latency metrics of this session for a STATS answer.
+        """
+        return {'match_id': self.match_id,
+                'ai_turns': self.ai_turns.to_dict(),
+                'requests': self.requests.to_dict()}
+
+
+def _select_attack(battle_queue: 'BattleQueue') -> str:
+    """
+    Return the attack the playstyle of the next character in battle_queue
+    decides on, for an executor.
+    """
+    return battle_queue.peek().playstyle.select_attack()
+
+
+class MatchServer:
+    """
+    A server playing one Match over each connection.
+
+    executor - the executor that computer playstyles decide their attacks in.
+    sessions - the MatchSession of every open connection, by match_id.
+    """
+    executor: Executor
+    sessions: Dict[int, MatchSession]
+
+    def __init__(self, executor: Executor = None) -> None:
+        """
+        Initialize this MatchServer, deciding computer attacks in executor,
+        or in a new ThreadPoolExecutor if executor is None.
+        """
+        self.executor = executor if executor is not None \
+            else ThreadPoolExecutor()
+        self.sessions = {}
+        self._ids = itertools.count(1)
+
+    async def play_computer_turns(self, session: MatchSession) -> None:
+        """
+        Play the turns of computer playstyles in session's Match until a
+        manual player has to move or the game is over, and close the Match
+        once the game is over.
+        """
+        match = session.match
+        loop = asyncio.get_running_loop()
+        while not match.battle_queue.is_over() and \
+                not match.battle_queue.peek().playstyle.is_manual:
+            start = time.perf_counter()
+            move = await loop.run_in_executor(self.executor, _select_attack,
+                                              match.battle_queue)
+            session.ai_turns.record(time.perf_counter() - start)
+            if not match.apply_move(move):
+                break
+        if match.battle_queue.is_over():
+            match.close()
+
+    async def respond(self, session: MatchSession, words: List[str]) -> str:
+        """
+        Carry out the command in words for session and return the answer.
+        """
+        command = words[0].upper() if words else ''
+        if command == 'NEW' and len(words) == 6:
+            match = Match()
+            match.set_up(words[1], words[2], 'P1', words[3], words[4], 'P2',
+                         words[5])
+            session.close()
+            session.match = match
+            await self.play_computer_turns(session)
+        elif command == 'STATS':
+            return 'STATS ' + json.dumps(session.get_stats())
+        elif session.match is None:
+            return 'ERROR start a match with NEW first'
+        elif command == 'MOVE' and len(words) == 2:
+            match = session.match
+            if match.game_is_over or match.battle_queue.is_over():
+                return 'ERROR the game is over'
+            match.last_key_pressed = words[1].upper()
+            match.perform_attack()
+            await self.play_computer_turns(session)
+        elif command != 'STATE':
+            return 'ERROR unknown command ' + ' '.join(words)
+        return 'STATE ' + json.dumps(session.get_state())
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """
+        Play a Match over the connection with reader and writer.
+        """
+        session = MatchSession(next(self._ids))
+        self.sessions[session.match_id] = session
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode().split()
+                if words and words[0].upper() == 'QUIT':
+                    break
+                start = time.perf_counter()
+                try:
+                    answer = await self.respond(session, words)
+                except (KeyError, ValueError, AttributeError) as error:
+                    answer = 'ERROR {!r}'.format(error)
+                session.requests.record(time.perf_counter() - start)
+                writer.write(answer.encode() + b'\n')
+                await writer.drain()
+        finally:
+            del self.sessions[session.match_id]
+            session.close()
+            writer.close()
+
+    def get_metrics(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Return the latency metrics of every open connection, by match_id.
+        """
+        return {match_id: session.get_stats()
+                for match_id, session in self.sessions.items()}
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0,
+                    path: str = None) -> asyncio.AbstractServer:
+        """
+        Start serving on the TCP host and port, or on the Unix socket at path
+        if it is given, and return the asyncio server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+class MatchClient:
+    """
+    A client for a MatchServer, for tests and scripts.
+    """
+    _reader: asyncio.StreamReader
+    _writer: asyncio.StreamWriter
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        """
+        Initialize this MatchClient on a connection with reader and writer.
+        """
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = None,
+                      path: str = None) -> 'MatchClient':
+        """
+        Return a MatchClient connected to the server on the TCP host and
+        port, or on the Unix socket at path if it is given.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, line: str) -> str:
+        """
+        Send the command line to the server and return its answer.
+        """
+        self._writer.write(line.encode() + b'\n')
+        await self._writer.drain()
+        return (await self._reader.readline()).decode().rstrip('\n')
+
+    async def request_json(self, line: str) -> Dict[str, Any]:
+        """
+        Send the command line to the server and return the JSON in its
+        answer. Raise ValueError if the server answers with an ERROR.
+        """
+        answer = await self.request(line)
+        kind, _, body = answer.partition(' ')
+        if kind == 'ERROR':
+            raise ValueError(body)
+        return json.loads(body)
+
+    async def close(self) -> None:
+        """
+        Quit and close the connection.
+        """
+        self._writer.write(b'QUIT\n')
+        await self._writer.drain()
+        self._writer.close()
+
+
+async def serve_forever(host: str, port: int, path: str = None) -> None:
+    """
+    Run a MatchServer on the TCP host and port, or on the Unix socket at
+    path, until the process is stopped.
+    """
+    server = await MatchServer().start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Serve A2 matches over a line-based protocol.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1480)
+    parser.add_argument('--unix', default=None,
+                        help="serve on this Unix socket instead of TCP")
+    arguments = parser.parse_args()
+    asyncio.run(serve_forever(arguments.host, arguments.port,
+                              arguments.unix))
@@ -0,0 +1,101 @@
+"""
+Unittests for the asyncio match server of A2.
+"""
+import asyncio
+import multiprocessing
+import unittest
+
+from a2_server import MatchServer, MatchClient
+
+
+class MatchServerUnitTests(unittest.TestCase):
+    def run_with_server(self, test):
+        """
+        Start a MatchServer on a free port and run the coroutine function
+        test with the server and its port.
+        """
+        async def main():
+            server = MatchServer()
+            asyncio_server = await server.start()
+            port = asyncio_server.sockets[0].getsockname()[1]
+            try:
+                await test(server, port)
+            finally:
+                asyncio_server.close()
+                await asyncio_server.wait_closed()
+                server.executor.shutdown()
+        asyncio.run(main())
+
+    def test_manual_against_computer(self):
+        """
+        Test to make sure a manual player can play against a computer
+        playstyle, which moves as soon as it is its turn.
+        """
+        async def test(server, port):
+            client = await MatchClient.connect(port=port)
+            state = await client.request_json('NEW n r m m mr')
+            self.assertEqual('P1', state['current_player'])
+            while not state['game_is_over']:
+                self.assertEqual('P1', state['current_player'])
+                state = await client.request_json(
+                    'MOVE ' + state['actions'][0])
+            self.assertIn(state['winner'], ['P1', 'P2'])
+            stats = await client.request_json('STATS')
+            self.assertGreater(stats['ai_turns']['count'], 0)
+            self.assertEqual(stats['ai_turns'], server.get_metrics()[
+                stats['match_id']]['ai_turns'])
+            await client.close()
+        self.run_with_server(test)
+
+    def test_worker_processes_shut_down(self):
+        """
+        Test to make sure the worker processes of a parallel minimax
+        playstyle are shut down once its game is over.
+        """
+        async def test(server, port):
+            client = await MatchClient.connect(port=port)
+            state = await client.request_json('NEW n r mrp m r')
+            self.assertTrue(state['game_is_over'])
+            self.assertEqual([], multiprocessing.active_children())
+            await client.close()
+        self.run_with_server(test)
+
+    def test_errors(self):
+        """
+        Test to make sure bad commands are answered with an ERROR.
+        """
+        async def test(server, port):
+            client = await MatchClient.connect(port=port)
+            self.assertTrue((await client.request('MOVE A')).startswith(
+                'ERROR'))
+            self.assertTrue((await client.request('NEW x r m m m')).startswith(
+                'ERROR'))
+            await client.request_json('NEW n r r r r')
+            self.assertTrue((await client.request('MOVE A')).startswith(
+                'ERROR'))
+            await client.close()
+        self.run_with_server(test)
+
+    def test_slow_search_does_not_block(self):
+        """
+        Test to make sure one connection's slow search does not hold up the
+        answers to other connections.
+        """
+        async def test(server, port):
+            slow = await MatchClient.connect(port=port)
+            fast = await MatchClient.connect(port=port)
+            slow_game = asyncio.ensure_future(
+                slow.request_json('NEW n r mr r mr'))
+            await asyncio.sleep(0.05)
+            state = await fast.request_json('NEW n m m r m')
+            self.assertFalse(slow_game.done())
+            self.assertEqual(2, len(server.sessions))
+            self.assertEqual('P1', state['current_player'])
+            self.assertTrue((await slow_game)['game_is_over'])
+            await slow.close()
+            await fast.close()
+        self.run_with_server(test)
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,260 @@
+"""
+A headless simulator for A2.
+
+Plays many games between two computer playstyles in a2_game Matches, without
+the UI or the input() prompts, and reports how often each character wins. Each
+game is seeded from the simulation's seed and the game's number, so a
+simulation plays the same games no matter how many worker processes share it.
+
+Run this file to simulate games from the command line, e.g.
+    python a2_simulator.py r m --queue r --p1-playstyle mr -n 1000
+"""
+from typing import Dict, Tuple, Union
+import argparse
+import multiprocessing
+import random
+import time
+from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES, \
+    BATTLE_QUEUE_CLASSES, Match
+from a2_playstyle import RandomPlaystyle
+
+
+class SimulationResult:
+    """
+    The results of a number of simulated games.
+
+    games - the number of games played.
+    p1_wins - the number of games won by the first character.
+    p2_wins - the number of games won by the second character.
+    ties - the number of games that ended without a winner.
+    moves - the total number of attacks made over every game.
+    seconds - the wall-clock time taken to play the games.
+    """
+    games: int
+    p1_wins: int
+    p2_wins: int
+    ties: int
+    moves: int
+    seconds: float
+
+    def __init__(self) -> None:
+        """
+        Initialize this SimulationResult with no games played.
+
+        >>> result = SimulationResult()
+        >>> result.games
+        0
+        """
+        self.games = 0
+        self.p1_wins = 0
+        self.p2_wins = 0
+        self.ties = 0
+        self.moves = 0
+        self.seconds = 0.0
+
+    def record(self, winner: Union[int, None], moves: int) -> None:
+        """
+        Record a game that lasted moves attacks and was won by player winner
+        (1 or 2), or tied if winner is None.
+
+        >>> result = SimulationResult()
+        >>> result.record(1, 12)
+        >>> result.record(None, 8)
+        >>> result.p1_wins, result.ties, result.mean_game_length()
+        (1, 1, 10.0)
+        """
+        self.games += 1
+        self.moves += moves
+        if winner == 1:
+            self.p1_wins += 1
+        elif winner == 2:
+            self.p2_wins += 1
+        else:
+            self.ties += 1
+
+    def merge(self, other: 'SimulationResult') -> None:
+        """
+        Add the games recorded in other to this SimulationResult.
+        """
+        self.games += other.games
+        self.p1_wins += other.p1_wins
+        self.p2_wins += other.p2_wins
+        self.ties += other.ties
+        self.moves += other.moves
+
+    def rates(self) -> Dict[str, float]:
+        """
+        Return the fraction of games won by each character and tied.
+
+        >>> result = SimulationResult()
+        >>> result.record(2, 5)
+        >>> result.record(None, 5)
+        >>> result.rates()
+        {'p1': 0.0, 'p2': 0.5, 'tie': 0.5}
+        """
+        if self.games == 0:
+            return {'p1': 0.0, 'p2': 0.0, 'tie': 0.0}
+        return {'p1': self.p1_wins / self.games,
+                'p2': self.p2_wins / self.games,
+                'tie': self.ties / self.games}
+
+    def mean_game_length(self) -> float:
+        """
+        Return the mean number of attacks made in a game.
+        """
+        if self.games == 0:
+            return 0.0
+        return self.moves / self.games
+
+    def games_per_second(self) -> float:
+        """
+        Return the number of games played per second of wall-clock time.
+        """
+        if self.seconds == 0:
+            return 0.0
+        return self.games / self.seconds
+
+    def __str__(self) -> str:
+        """
+        Return a summary of this SimulationResult.
+        """
+        rates = self.rates()
+        return ("{} games: P1 won {:.1%}, P2 won {:.1%}, tied {:.1%}; " +
+                "{:.2f} attacks per game; {:.1f} games/sec").format(
+                    self.games, rates['p1'], rates['p2'], rates['tie'],
+                    self.mean_game_length(), self.games_per_second())
+
+
+def set_up_match(p1_type: str, p2_type: str, queue_type: str,
+                 p1_playstyle: str, p2_playstyle: str,
+                 rng: random.Random = None) -> 'Match':
+    """
+    Return a new Match between a p1_type character named P1 and a p2_type
+    character named P2 in a queue_type BattleQueue.
+
+    Each type is a key of CHARACTER_CLASSES, BATTLE_QUEUE_CLASSES or
+    PLAYSTYLE_CLASSES. Random playstyles choose their attacks with rng.
+
+    >>> match = set_up_match('r', 'm', 'n', 'r', 'mr')
+    >>> match.battle_queue
+    P1 (Rogue): 100/100 -> P2 (Mage): 100/100
+    """
+    match = Match()
+    match.set_up(queue_type, p1_type, 'P1', p1_playstyle, p2_type, 'P2',
+                 p2_playstyle)
+    for character in [match.p1, match.p2]:
+        if character.playstyle.is_manual:
+            raise ValueError("Cannot simulate a manual playstyle.")
+        if rng is not None and isinstance(character.playstyle,
+                                          RandomPlaystyle):
+            character.playstyle.rng = rng
+    return match
+
+
+def play_game(match: 'Match') -> Tuple[Union[int, None], int]:
+    """
+    Play out match and return the winner (1 or 2, or None for a tie) and
+    the number of attacks made. match is closed afterwards.
+
+    >>> match = set_up_match('r', 'r', 'n', 'mr', 'mr')
+    >>> play_game(match)
+    (1, 18)
+    """
+    moves = 0
+    try:
+        while not match.battle_queue.is_over():
+            if not match.apply_move(match.select_attack()):
+                break
+            moves += 1
+    finally:
+        match.close()
+    if match.game_winner is None:
+        return None, moves
+    return (1 if match.game_winner is match.p1 else 2), moves
+
+
+def game_rng(seed: Union[int, None], game: int) -> random.Random:
+    """
+    Return the random number generator for the game numbered game of a
+    simulation seeded with seed, or an unseeded one if seed is None.
+
+    >>> game_rng(148, 3).random() == game_rng(148, 3).random()
+    True
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random('{}:{}'.format(seed, game))
+
+
+def _simulate_games(job: tuple) -> SimulationResult:
+    """
+    Play the games numbered in job's range, for a multiprocessing pool, and
+    return their SimulationResult.
+    """
+    matchup, seed, games = job
+    result = SimulationResult()
+    for game in games:
+        match = set_up_match(*matchup, game_rng(seed, game))
+        result.record(*play_game(match))
+    return result
+
+
+def simulate(p1_type: str, p2_type: str, queue_type: str = 'n',
+             p1_playstyle: str = 'r', p2_playstyle: str = 'r',
+             games: int = 100, seed: int = None,
+             processes: int = 1) -> SimulationResult:
+    """
+    Play games games between a p1_type character and a p2_type character in
+    a queue_type BattleQueue, using the given playstyles, and return the
+    SimulationResult. The games are shared between processes worker
+    processes, or one per CPU if processes is None.
+
+    >>> result = simulate('r', 'm', 'r', 'r', 'r', games=20, seed=148)
+    >>> result.games
+    20
+    >>> result.p1_wins + result.p2_wins + result.ties
+    20
+    """
+    matchup = (p1_type, p2_type, queue_type, p1_playstyle, p2_playstyle)
+    start = time.perf_counter()
+    if processes == 1:
+        result = _simulate_games((matchup, seed, range(games)))
+    else:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        jobs = [(matchup, seed, range(i, games, processes))
+                for i in range(processes)]
+        result = SimulationResult()
+        with multiprocessing.Pool(processes) as pool:
+            for partial in pool.map(_simulate_games, jobs):
+                result.merge(partial)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Simulate A2 games between two computer playstyles.")
+    parser.add_argument('p1', choices=list(CHARACTER_CLASSES.keys()),
+                        help="the first character's class")
+    parser.add_argument('p2', choices=list(CHARACTER_CLASSES.keys()),
+                        help="the second character's class")
+    parser.add_argument('--queue', choices=list(BATTLE_QUEUE_CLASSES.keys()),
+                        default='n', help="the type of BattleQueue")
+    parser.add_argument('--p1-playstyle', default='r',
+                        choices=list(PLAYSTYLE_CLASSES.keys()),
+                        help="the first character's playstyle")
+    parser.add_argument('--p2-playstyle', default='r',
+                        choices=list(PLAYSTYLE_CLASSES.keys()),
+                        help="the second character's playstyle")
+    parser.add_argument('-n', '--games', type=int, default=1000,
+                        help="the number of games to play")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for the random playstyles")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="number of worker processes (default: one per "
+                             "CPU)")
+    arguments = parser.parse_args()
+    print(simulate(arguments.p1, arguments.p2, arguments.queue,
+                   arguments.p1_playstyle, arguments.p2_playstyle,
+                   arguments.games, arguments.seed, arguments.processes))
@@ -0,0 +1,73 @@
+"""
+Unittests for the headless simulator of A2.
+"""
+import multiprocessing
+import random
+import unittest
+
+from a2_game import PLAYSTYLE_CLASSES
+from a2_simulator import set_up_match, play_game, simulate
+RandomPlaystyle = PLAYSTYLE_CLASSES['r']
+
+
+class SimulatorUnitTests(unittest.TestCase):
+    def test_play_game(self):
+        """
+        Test to make sure play_game plays a game until it is over.
+        """
+        match = set_up_match('v', 's', 'r', 'r', 'mr', random.Random(148))
+        winner, moves = play_game(match)
+        self.assertTrue(match.game_is_over)
+        self.assertTrue(match.battle_queue.is_over())
+        self.assertIn(winner, [1, 2, None])
+        self.assertGreater(moves, 0)
+
+    def test_seeded_games_repeat(self):
+        """
+        Test to make sure a seeded simulation plays the same games no matter
+        how many processes play them.
+        """
+        first = simulate('r', 'm', 'n', 'r', 'r', games=60, seed=148)
+        second = simulate('r', 'm', 'n', 'r', 'r', games=60, seed=148,
+                          processes=2)
+        self.assertEqual(60, first.games)
+        self.assertEqual((first.p1_wins, first.p2_wins, first.ties,
+                          first.moves),
+                         (second.p1_wins, second.p2_wins, second.ties,
+                          second.moves))
+
+    def test_parallel_minimax_in_worker_processes(self):
+        """
+        Test to make sure a parallel minimax playstyle can be simulated by
+        worker processes, which cannot start workers of their own, and that
+        no worker processes are left running afterwards.
+        """
+        first = simulate('r', 'm', 'n', 'mrp', 'r', games=2, seed=148)
+        self.assertEqual([], multiprocessing.active_children())
+        second = simulate('r', 'm', 'n', 'mrp', 'r', games=2, seed=148,
+                          processes=2)
+        self.assertEqual((first.p1_wins, first.p2_wins, first.ties,
+                          first.moves),
+                         (second.p1_wins, second.p2_wins, second.ties,
+                          second.moves))
+
+    def test_random_playstyle_copy_shares_rng(self):
+        """
+        Test to make sure a copy of a seeded RandomPlaystyle keeps using the
+        same random number generator.
+        """
+        battle_queue = set_up_match('r', 'r', 'n', 'r', 'r').battle_queue
+        rng = random.Random(148)
+        playstyle = RandomPlaystyle(battle_queue, rng)
+        self.assertIs(rng, playstyle.copy(battle_queue.copy()).rng)
+
+    def test_manual_playstyle_rejected(self):
+        """
+        Test to make sure a manual playstyle cannot be simulated.
+        """
+        self.assertRaises(ValueError, set_up_match, 'r', 'm', 'n',
+                          'm', 'r')
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -8,7 +8,10 @@ a2.pdf.
 This tree will be used during the gameplay of a2_game, but we may test your
 SkillDecisionTree with other examples.
 """
-from typing import Callable, List
+from typing import Any, Callable, List, Sequence, Set, Union
+import copy
+import math
+import weakref
 
 
 class SkillDecisionTree:
@@ -21,12 +24,19 @@ class SkillDecisionTree:
                You may assume priority numbers are unique (i.e. no two
                SkillDecisionTrees will have the same number.)
     children - the subtrees of this SkillDecisionTree.
+
+    SkillDecisionTree.changes counts every change made to any
+    SkillDecisionTree after it was initialized: setting one of the attributes
+    above, or adding, removing or replacing one of its children. get_compiled
+    and get_tabulated check it to tell whether their trees may have changed.
     """
     value: 'Skill'
     condition: Callable[['Character', 'Character'], bool]
     priority: int
     children: List['SkillDecisionTree']
 
+    changes = 0
+
     def __init__(self, value: 'Skill',
                  condition: Callable[['Character', 'Character'], bool],
                  priority: int,
@@ -50,6 +60,26 @@ class SkillDecisionTree:
         self.priority = priority
         self.children = children[:] if children else []
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Set the attribute name of this SkillDecisionTree to value, counting
+        it in SkillDecisionTree.changes if it had already been set. children
+        is kept in a _Children, which counts the changes made to it too.
+
+        >>> t = create_default_tree()
+        >>> changes = SkillDecisionTree.changes
+        >>> t.children[0].priority = 0
+        >>> t.children.pop().priority
+        1
+        >>> SkillDecisionTree.changes - changes
+        2
+        """
+        if name == 'children':
+            value = _Children(value)
+        if name in self.__dict__:
+            SkillDecisionTree.changes += 1
+        super().__setattr__(name, value)
+
     def pick_skill(self, caster: 'Character', target: 'Character') -> 'Skill':
         """
         Return a skill.
@@ -96,12 +126,671 @@ class SkillDecisionTree:
             return [self]
         else:
             if self.condition(caster, target):
-                skill_lst = sum([child.skill_list(caster, target)
-                                 for child in self.children], [])
+                skill_lst = []
+                for child in self.children:
+                    skill_lst.extend(child.skill_list(caster, target))
             else:
                 return [self]
         return skill_lst
 
+    def compile(self) -> 'CompiledSkillDecisionTree':
+        """
+        Return a CompiledSkillDecisionTree that picks the same skills as this
+        SkillDecisionTree. Changes made to this SkillDecisionTree afterwards
+        are not seen by it.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> from a2_characters import Mage
+        >>> bq = BattleQueue()
+        >>> c = Mage("m", bq, ManualPlaystyle(bq))
+        >>> c2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> t = create_default_tree()
+        >>> t.compile().pick_skill(c, c2) is t.pick_skill(c, c2)
+        True
+        """
+        compiled = CompiledSkillDecisionTree()
+        compiled.add_subtree(self)
+        compiled.finish()
+        return compiled
+
+    def tabulate(self, max_hp: int = 100,
+                 max_sp: int = 100) -> 'SkillLookupTable':
+        """
+        Return a SkillLookupTable that picks the same skills as this
+        SkillDecisionTree, with a table for HP up to max_hp and SP up to
+        max_sp.
+
+        >>> t = create_default_tree()
+        >>> table = t.tabulate()
+        >>> len(table.table)
+        24
+        >>> type(table.pick_by_stats(100, 100, 100, 100)).__name__
+        'RogueSpecial'
+        """
+        return SkillLookupTable(self.compile(), max_hp, max_sp)
+
+    def pick_skills(self, caster_hp: Any, caster_sp: Any, target_hp: Any,
+                    target_sp: Any) -> Any:
+        """
+        Return a NumPy array of the index, in the preorder of this
+        SkillDecisionTree's CompiledSkillDecisionTree, of the skill picked for
+        each caster and target whose HP and SP are given by the arrays
+        caster_hp, caster_sp, target_hp and target_sp.
+
+        See CompiledSkillDecisionTree.pick_skills. This needs NumPy.
+        """
+        return self.compile().pick_skills(caster_hp, caster_sp, target_hp,
+                                          target_sp)
+
+
+class _Children(list):
+    """
+    The list of children of a SkillDecisionTree, which counts every change
+    made to it in SkillDecisionTree.changes.
+    """
+
+    def _changed(self) -> None:
+        """
+        Count a change made to this _Children.
+        """
+        SkillDecisionTree.changes += 1
+
+    def append(self, child: 'SkillDecisionTree') -> None:
+        """
+        Add child to the end of this _Children.
+        """
+        self._changed()
+        super().append(child)
+
+    def extend(self, children: Any) -> None:
+        """
+        Add every child in children to the end of this _Children.
+        """
+        self._changed()
+        super().extend(children)
+
+    def insert(self, index: int, child: 'SkillDecisionTree') -> None:
+        """
+        Add child to this _Children before index.
+        """
+        self._changed()
+        super().insert(index, child)
+
+    def pop(self, index: int = -1) -> 'SkillDecisionTree':
+        """
+        Remove and return the child at index.
+        """
+        self._changed()
+        return super().pop(index)
+
+    def remove(self, child: 'SkillDecisionTree') -> None:
+        """
+        Remove the first occurrence of child.
+        """
+        self._changed()
+        super().remove(child)
+
+    def clear(self) -> None:
+        """
+        Remove every child.
+        """
+        self._changed()
+        super().clear()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Sort this _Children in place.
+        """
+        self._changed()
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        """
+        Reverse this _Children in place.
+        """
+        self._changed()
+        super().reverse()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        """
+        Replace the children at index with value.
+        """
+        self._changed()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        """
+        Remove the children at index.
+        """
+        self._changed()
+        super().__delitem__(index)
+
+    def __iadd__(self, children: Any) -> '_Children':
+        """
+        Add every child in children to the end of this _Children.
+        """
+        self._changed()
+        return super().__iadd__(children)
+
+    def __imul__(self, times: int) -> '_Children':
+        """
+        Repeat the children of this _Children times times.
+        """
+        self._changed()
+        return super().__imul__(times)
+
+
+class CompiledSkillDecisionTree:
+    """
+    A SkillDecisionTree flattened into lists, in preorder, for picking skills
+    quickly. The children of each node are ordered by the lowest priority in
+    their subtrees, so the best skill tends to be found first, and pick_skill
+    skips every subtree that cannot hold a better skill than the best one
+    found so far.
+
+    values - the skill of each node.
+    conditions - the condition of each node, or None for a leaf, whose
+                 condition is never checked.
+    priorities - the priority number of each node.
+    ends - the index just after the last node of each node's subtree.
+    lowest - the lowest priority number in each node's subtree.
+    remaining - the lowest priority number among each node and every node
+                after it.
+    """
+    values: List['Skill']
+    conditions: List[Union[Callable[['Character', 'Character'], bool], None]]
+    priorities: List[int]
+    ends: List[int]
+    lowest: List[int]
+    remaining: List[int]
+
+    def __init__(self) -> None:
+        """
+        Initialize this CompiledSkillDecisionTree with no nodes.
+        """
+        self.values = []
+        self.conditions = []
+        self.priorities = []
+        self.ends = []
+        self.lowest = []
+        self.remaining = []
+
+    def add_subtree(self, tree: 'SkillDecisionTree') -> int:
+        """
+        Add the nodes of tree to the end of this CompiledSkillDecisionTree,
+        and return the lowest priority number among them.
+        """
+        index = len(self.values)
+        self.values.append(tree.value)
+        self.conditions.append(tree.condition if tree.children else None)
+        self.priorities.append(tree.priority)
+        self.ends.append(None)
+        self.lowest.append(None)
+        lowest = tree.priority
+        for child in sorted(tree.children, key=_lowest_priority):
+            lowest = min(lowest, self.add_subtree(child))
+        self.ends[index] = len(self.values)
+        self.lowest[index] = lowest
+        return lowest
+
+    def finish(self) -> None:
+        """
+        Work out remaining once every node has been added.
+        """
+        self.remaining = self.priorities[:]
+        for i in range(len(self.remaining) - 2, -1, -1):
+            self.remaining[i] = min(self.remaining[i],
+                                    self.remaining[i + 1])
+
+    def pick_skill(self, caster: 'Character', target: 'Character') -> 'Skill':
+        """
+        Return the same skill as pick_skill on the SkillDecisionTree this
+        CompiledSkillDecisionTree was compiled from.
+        """
+        conditions = self.conditions
+        priorities = self.priorities
+        ends = self.ends
+        lowest = self.lowest
+        remaining = self.remaining
+        best = 0
+        best_priority = math.inf
+        i = 0
+        size = len(priorities)
+        while i < size and remaining[i] < best_priority:
+            if lowest[i] >= best_priority:
+                i = ends[i]
+            elif conditions[i] is None or not conditions[i](caster, target):
+                if priorities[i] < best_priority:
+                    best, best_priority = i, priorities[i]
+                i = ends[i]
+            else:
+                i += 1
+        return self.values[best]
+
+    def pick_skills(self, caster_hp: Any, caster_sp: Any, target_hp: Any,
+                    target_sp: Any) -> Any:
+        """
+        Return a NumPy array of the index in values of the skill picked for
+        each caster and target whose HP and SP are given by the arrays
+        caster_hp, caster_sp, target_hp and target_sp.
+
+        The nodes are visited in order, each with the rows that reach it and
+        could still get a better skill from its subtree. A condition is first
+        called on stand-ins whose stats are arrays of those rows: if it is
+        written so that it gives back a boolean array, like f1 to f5, that is
+        its answer for every row. Otherwise it is called on each row in turn.
+        This needs NumPy.
+        """
+        import numpy as np
+        stats = [np.asarray(stat) for stat in [caster_hp, caster_sp,
+                                               target_hp, target_sp]]
+        size = len(stats[0])
+        best = np.zeros(size, dtype=np.int64)
+        best_priority = np.full(size, np.iinfo(np.int64).max)
+        reached = {0: np.arange(size)}
+        for i, priority in enumerate(self.priorities):
+            rows = reached.pop(i, None)
+            if rows is None:
+                continue
+            rows = rows[self.lowest[i] < best_priority[rows]]
+            if not len(rows):
+                continue
+            if self.conditions[i] is None:
+                answers = np.zeros(len(rows), dtype=np.bool_)
+            else:
+                answers = _check_rows(self.conditions[i], stats, rows)
+            picked = rows[~answers]
+            picked = picked[priority < best_priority[picked]]
+            best[picked] = i
+            best_priority[picked] = priority
+            child = i + 1
+            while child < self.ends[i]:
+                reached[child] = rows[answers]
+                child = self.ends[child]
+        return best
+
+
+def _check_rows(condition: Callable[['Character', 'Character'], bool],
+                stats: List[Any], rows: Any) -> Any:
+    """
+    Return a NumPy array of condition's answer for each of rows, for the
+    caster and target with the HP and SP in stats, calling condition once on
+    the arrays if it accepts them and on each row otherwise.
+    """
+    import numpy as np
+    reads = set()
+    caster = _Probe([stats[0][rows], stats[1][rows]], (0, 1), reads)
+    target = _Probe([stats[2][rows], stats[3][rows]], (2, 3), reads)
+    try:
+        answers = condition(caster, target)
+    except (TypeError, ValueError):
+        answers = None
+    if isinstance(answers, np.ndarray) and answers.shape == rows.shape:
+        return answers.astype(np.bool_)
+    answers = np.empty(len(rows), dtype=np.bool_)
+    for j, row in enumerate(rows.tolist()):
+        answers[j] = bool(condition(
+            _Probe([stats[0][row].item(), stats[1][row].item()], (0, 1),
+                   reads),
+            _Probe([stats[2][row].item(), stats[3][row].item()], (2, 3),
+                   reads)))
+    return answers
+
+
+class _Probe:
+    """
+    A stand-in for a Character with only an HP and an SP, which notes down
+    which of them a condition reads.
+
+    stats - the HP and SP of this _Probe.
+    axes - the axis of the lookup table for its HP and for its SP.
+    reads - the set of axes read so far, shared between probes.
+    """
+
+    __slots__ = ('stats', 'axes', 'reads')
+
+    def __init__(self, stats: List[int], axes: Sequence[int],
+                 reads: Set[int]) -> None:
+        """
+        Initialize this _Probe with stats, noting reads of them in reads.
+        """
+        self.stats = stats
+        self.axes = axes
+        self.reads = reads
+
+    def get_hp(self) -> int:
+        """
+        Return the HP of this _Probe.
+        """
+        self.reads.add(self.axes[0])
+        return self.stats[0]
+
+    def get_sp(self) -> int:
+        """
+        Return the SP of this _Probe.
+        """
+        self.reads.add(self.axes[1])
+        return self.stats[1]
+
+
+class SkillLookupTable:
+    """
+    A SkillDecisionTree precomputed into a table over the HP and SP of the
+    caster and the target, so picking a skill is a single table look-up.
+
+    A condition can be tabulated if, when it is called on stand-ins with
+    only get_hp and get_sp, it reads at most one of the four stats: it is
+    then checked at every value of that stat to find where its answer
+    changes. Those points split each stat's range into intervals over which
+    every condition gives the same answer, and the table holds the skill
+    picked for each combination of intervals.
+
+    Other conditions (those reading no stat or more than one, or anything
+    but get_hp and get_sp) cannot be tabulated. Where the skill picked for a
+    combination of intervals depends on one of them, the table holds None,
+    and the skill is picked with the CompiledSkillDecisionTree instead. So
+    only the branches below such a condition lose the table. Stats outside
+    the table's range are also picked with it. Conditions must not depend on
+    anything but the stats they read.
+
+    compiled - the CompiledSkillDecisionTree being tabulated.
+    offsets - for the caster's HP and SP and the target's HP and SP, the
+              position in table that each value of that stat adds.
+    table - the skill picked for each combination of intervals, or None
+            where it depends on a condition that cannot be tabulated.
+    """
+    compiled: CompiledSkillDecisionTree
+    offsets: List[List[int]]
+    table: List[Union['Skill', None]]
+
+    def __init__(self, compiled: CompiledSkillDecisionTree, max_hp: int,
+                 max_sp: int) -> None:
+        """
+        Initialize this SkillLookupTable for compiled, with a table for HP up
+        to max_hp and SP up to max_sp.
+        """
+        self.compiled = compiled
+        sizes = [max_hp + 1, max_sp + 1, max_hp + 1, max_sp + 1]
+        starts = [{0} for _ in sizes]
+        # compiled, with every condition that cannot be tabulated replaced by
+        # one that raises _Untabulable.
+        marked = copy.copy(compiled)
+        marked.conditions = []
+        for condition in compiled.conditions:
+            if condition is not None:
+                axis, changes = _find_changes(condition, sizes)
+                if axis is None:
+                    condition = _untabulable
+                else:
+                    starts[axis].update(changes)
+            marked.conditions.append(condition)
+        intervals = [sorted(axis_starts) for axis_starts in starts]
+        offsets = []
+        stride = 1
+        for axis in range(3, -1, -1):
+            offset = []
+            for i, start in enumerate(intervals[axis]):
+                end = intervals[axis][i + 1] if i + 1 < len(intervals[axis]) \
+                    else sizes[axis]
+                offset.extend([i * stride] * (end - start))
+            offsets.insert(0, offset)
+            stride *= len(intervals[axis])
+        self.table = [None] * stride
+        for chp in intervals[0]:
+            for csp in intervals[1]:
+                for thp in intervals[2]:
+                    for tsp in intervals[3]:
+                        index = offsets[0][chp] + offsets[1][csp] + \
+                            offsets[2][thp] + offsets[3][tsp]
+                        reads = set()
+                        try:
+                            self.table[index] = marked.pick_skill(
+                                _Probe([chp, csp], (0, 1), reads),
+                                _Probe([thp, tsp], (2, 3), reads))
+                        except _Untabulable:
+                            pass
+        self.offsets = offsets
+
+    def _pick(self, caster_hp: int, caster_sp: int, target_hp: int,
+              target_sp: int) -> 'Skill':
+        """
+        Return the skill the CompiledSkillDecisionTree picks for a caster and
+        target with the given HP and SP.
+        """
+        reads = set()
+        return self.compiled.pick_skill(
+            _Probe([caster_hp, caster_sp], (0, 1), reads),
+            _Probe([target_hp, target_sp], (2, 3), reads))
+
+    def _lookup(self, caster_hp: int, caster_sp: int, target_hp: int,
+                target_sp: int) -> Union['Skill', None]:
+        """
+        Return the skill in the table for a caster and target with the given
+        HP and SP, or None if it is not in the table.
+        """
+        offsets = self.offsets
+        if 0 <= caster_hp < len(offsets[0]) and \
+                0 <= caster_sp < len(offsets[1]) and \
+                0 <= target_hp < len(offsets[2]) and \
+                0 <= target_sp < len(offsets[3]):
+            return self.table[offsets[0][caster_hp] + offsets[1][caster_sp] +
+                              offsets[2][target_hp] + offsets[3][target_sp]]
+        return None
+
+    def pick_by_stats(self, caster_hp: int, caster_sp: int, target_hp: int,
+                      target_sp: int) -> 'Skill':
+        """
+        Return the skill picked for a caster and target with the given HP
+        and SP.
+        """
+        skill = self._lookup(caster_hp, caster_sp, target_hp, target_sp)
+        if skill is None:
+            return self._pick(caster_hp, caster_sp, target_hp, target_sp)
+        return skill
+
+    def pick_skill(self, caster: 'Character', target: 'Character') -> 'Skill':
+        """
+        Return the same skill as pick_skill on the SkillDecisionTree this
+        SkillLookupTable was made from.
+        """
+        skill = self._lookup(caster.get_hp(), caster.get_sp(),
+                             target.get_hp(), target.get_sp())
+        if skill is None:
+            return self.compiled.pick_skill(caster, target)
+        return skill
+
+
+class _Untabulable(Exception):
+    """
+    Raised by _untabulable, while a SkillLookupTable is filled in, when the
+    skill picked depends on a condition that cannot be tabulated.
+    """
+
+
+def _untabulable(_caster: 'Character', _target: 'Character') -> bool:
+    """
+    Stand in for a condition that cannot be tabulated, by raising
+    _Untabulable.
+    """
+    raise _Untabulable
+
+
+def _find_changes(condition: Callable[['Character', 'Character'], bool],
+                  sizes: List[int]) -> tuple:
+    """
+    Return the one stat (0 to 3, for the caster's HP and SP and the target's
+    HP and SP) that condition reads, and every value of that stat at which
+    condition's answer differs from the value before. Return (None, None) if
+    condition reads no stat or more than one, since its answer may then
+    depend on something else, or if it cannot be called on _Probes.
+
+    >>> _find_changes(f4, [101] * 4)
+    (2, [30])
+    >>> _find_changes(lambda caster, target: True, [101] * 4)
+    (None, None)
+    """
+    reads = set()
+    stats = [size // 2 for size in sizes]
+    caster = _Probe(stats, (0, 1), reads)
+    target = _Probe(stats[2:], (2, 3), reads)
+    try:
+        condition(caster, target)
+        if len(reads) != 1:
+            return None, None
+        axis = reads.pop()
+        probe = caster if axis < 2 else target
+        answers = []
+        for value in range(sizes[axis]):
+            probe.stats[axis % 2] = value
+            answers.append(bool(condition(caster, target)))
+    except AttributeError:
+        return None, None
+    if reads - {axis}:
+        return None, None
+    return axis, [value for value in range(1, len(answers))
+                  if answers[value] != answers[value - 1]]
+
+
+def fingerprint(tree: 'SkillDecisionTree') -> tuple:
+    """
+    Return the shape of tree: the type of skill, the condition, the priority
+    and the number of children of each of its nodes, in preorder. Trees with
+    the same fingerprint pick the same type of skill for every caster and
+    target.
+
+    >>> t1 = create_default_tree()
+    >>> t2 = create_default_tree()
+    >>> fingerprint(t1) == fingerprint(t2)
+    True
+    >>> t2.children[0].priority = 0
+    >>> fingerprint(t1) == fingerprint(t2)
+    False
+    """
+    shape = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        shape.append((type(node.value), node.condition, node.priority,
+                      len(node.children)))
+        stack.extend(reversed(node.children))
+    return tuple(shape)
+
+
+# The shared copy made by get_shared of every fingerprint, for as long as the
+# copy is in use.
+_SHARED = weakref.WeakValueDictionary()
+
+# The shared copy of every SkillDecisionTree given to get_shared, with the
+# SkillDecisionTree.changes it was found at.
+_SHARED_COPIES = weakref.WeakKeyDictionary()
+
+
+def get_shared(tree: 'SkillDecisionTree') -> 'SkillDecisionTree':
+    """
+    Return a copy of tree that every tree with the same fingerprint shares.
+    It is made the first time that fingerprint is seen and is never changed,
+    so it can stand in for tree in a GameState: positions of games whose
+    trees are equal are then equal too, and a cache of positions keeps no
+    game's own tree alive.
+
+    >>> t = create_default_tree()
+    >>> get_shared(t) is get_shared(create_default_tree())
+    True
+    >>> get_shared(t) is t
+    False
+    """
+    entry = _SHARED_COPIES.get(tree)
+    if entry is None or entry[0] != SkillDecisionTree.changes:
+        shape = fingerprint(tree)
+        shared = _SHARED.get(shape)
+        if shared is None:
+            shared = _copy_tree(tree)
+            _SHARED[shape] = shared
+        entry = (SkillDecisionTree.changes, shared)
+        _SHARED_COPIES[tree] = entry
+    return entry[1]
+
+
+def _copy_tree(tree: 'SkillDecisionTree') -> 'SkillDecisionTree':
+    """
+    Return a copy of tree and of each of its subtrees, which shares their
+    skills and conditions.
+    """
+    return SkillDecisionTree(tree.value, tree.condition, tree.priority,
+                             [_copy_tree(child) for child in tree.children])
+
+
+# The CompiledSkillDecisionTree of every SkillDecisionTree used so far by
+# get_compiled, with the SkillDecisionTree.changes it was compiled at.
+_COMPILED = weakref.WeakKeyDictionary()
+
+
+def get_compiled(tree: 'SkillDecisionTree') -> 'CompiledSkillDecisionTree':
+    """
+    Return the CompiledSkillDecisionTree for tree, compiling it the first time
+    tree is seen and again whenever any SkillDecisionTree has been changed
+    since.
+
+    >>> from a2_skills import MageSpecial
+    >>> t = create_default_tree()
+    >>> compiled = get_compiled(t)
+    >>> get_compiled(t) is compiled
+    True
+    >>> t.children.append(SkillDecisionTree(MageSpecial(), f1, 0))
+    >>> get_compiled(t) is compiled
+    False
+    """
+    entry = _COMPILED.get(tree)
+    if entry is None or entry[0] != SkillDecisionTree.changes:
+        entry = (SkillDecisionTree.changes, tree.compile())
+        _COMPILED[tree] = entry
+    return entry[1]
+
+
+# The SkillLookupTable of every SkillDecisionTree used so far by
+# get_tabulated, with the SkillDecisionTree.changes it was last checked at
+# and the fingerprint of the tree it was made from.
+_TABULATED = weakref.WeakKeyDictionary()
+
+
+def get_tabulated(tree: 'SkillDecisionTree') -> 'SkillLookupTable':
+    """
+    Return the SkillLookupTable for tree, tabulating it the first time tree
+    is seen and again whenever tree has been changed since. Once any
+    SkillDecisionTree has been changed, tree's fingerprint is checked the
+    next time, so other trees' changes do not make it be tabulated again.
+
+    >>> from a2_skills import MageSpecial
+    >>> t = create_default_tree()
+    >>> tabulated = get_tabulated(t)
+    >>> get_tabulated(t) is tabulated
+    True
+    >>> t.children.append(SkillDecisionTree(MageSpecial(), f1, 0))
+    >>> get_tabulated(t) is tabulated
+    False
+    """
+    entry = _TABULATED.get(tree)
+    if entry is not None and entry[0] == SkillDecisionTree.changes:
+        return entry[2]
+    shape = fingerprint(tree)
+    if entry is None or entry[1] != shape:
+        entry = (SkillDecisionTree.changes, shape, tree.tabulate())
+    else:
+        entry = (SkillDecisionTree.changes, shape, entry[2])
+    _TABULATED[tree] = entry
+    return entry[2]
+
+
+def _lowest_priority(tree: 'SkillDecisionTree') -> int:
+    """
+    Return the lowest priority number in tree.
+    """
+    lowest = tree.priority
+    for child in tree.children:
+        lowest = min(lowest, _lowest_priority(child))
+    return lowest
+
 
 def f1(caster, _):
     """
@@ -17,9 +17,17 @@ import unittest
 from a2_game import CHARACTER_CLASSES
 from a2_playstyle import ManualPlaystyle
 from a2_battle_queue import BattleQueue
-from a2_skill_decision_tree import SkillDecisionTree, create_default_tree
+from a2_skill_decision_tree import SkillDecisionTree, create_default_tree, \
+    get_compiled, get_shared, get_tabulated, f1, f2
 from a2_skills import MageAttack, RogueAttack, MageSpecial
 from a2_characters import Rogue
+import random
+import gc
+import weakref
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class SkillDecisionTreeUnitTests(unittest.TestCase):    
     def create_basic_tree(self):
@@ -269,5 +277,214 @@ class SkillDecisionTreeUnitTests(unittest.TestCase):
                                                 expected,
                                                 actual))
 
+    def create_random_tree(self, rng, priorities, depth):
+        """
+        Creates a random SkillDecisionTree of at most depth levels below the
+        root, whose conditions compare one stat with a threshold.
+        """
+        skills = [MageAttack(), RogueAttack(), MageSpecial()]
+        stat, who, limit = (rng.choice(['get_hp', 'get_sp']),
+                            rng.choice(['caster', 'target']),
+                            rng.randrange(0, 101, 10))
+
+        def condition(caster, target):
+            """
+            Return True if the stat of who is > limit.
+            """
+            character = caster if who == 'caster' else target
+            return getattr(character, stat)() > limit
+        children = [self.create_random_tree(rng, priorities, depth - 1)
+                    for _ in range(rng.randrange(4) if depth else 0)]
+        return SkillDecisionTree(rng.choice(skills), condition,
+                                 priorities.pop(), children)
+
+    def create_trees(self):
+        """
+        Returns the default tree, the basic tree and 20 random trees.
+        """
+        rng = random.Random(148)
+        trees = [self.default_tree, self.basic_tree]
+        for _ in range(20):
+            priorities = list(range(60))
+            rng.shuffle(priorities)
+            trees.append(self.create_random_tree(rng, priorities, 3))
+        return trees
+
+    def check_same_skills(self, tree, picker, kind, stats=range(0, 101, 5)):
+        """
+        Check that picker picks the same skill as tree for every caster and
+        target with stats in stats.
+        """
+        for hp in stats:
+            for sp in stats:
+                self.caster.set_hp(hp)
+                self.caster.set_sp(sp)
+                self.target.set_hp(100 - sp)
+                self.target.set_sp(100 - hp)
+                expected = tree.pick_skill(self.caster, self.target)
+                actual = picker.pick_skill(self.caster, self.target)
+                self.assertIs(expected, actual,
+                              ("A {} picked a different skill than " +
+                               "pick_skill for the characters:\n{}\n{}"
+                               ).format(kind, self.caster, self.target))
+
+    def test_compiled_matches_pick_skill(self):
+        """
+        Test to make sure a compiled SkillDecisionTree picks the same skill
+        as pick_skill for the default tree, the basic tree and random trees.
+        """
+        for tree in self.create_trees():
+            self.check_same_skills(tree, tree.compile(),
+                                   "CompiledSkillDecisionTree")
+
+    def test_get_compiled_follows_changes(self):
+        """
+        Test to make sure get_compiled picks the same skill as pick_skill
+        after each kind of change to the tree or to one of its subtrees.
+        """
+        tree = self.default_tree
+        leaf = SkillDecisionTree(RogueAttack(), None, 10)
+        changes = [lambda: setattr(tree.children[0], 'priority', 0),
+                   lambda: tree.children[1].children.append(
+                       SkillDecisionTree(MageSpecial(), None, -1)),
+                   lambda: tree.children.pop(1),
+                   lambda: tree.children.insert(0, leaf),
+                   lambda: setattr(leaf, 'priority', -2),
+                   lambda: setattr(tree, 'condition',
+                                   lambda c, t: c.get_sp() > 50),
+                   lambda: tree.children.__setitem__(
+                       0, SkillDecisionTree(MageSpecial(), None, 11)),
+                   lambda: setattr(tree, 'children', [])]
+        for change in changes:
+            get_compiled(tree)
+            change()
+            self.check_same_skills(tree, get_compiled(tree),
+                                   "CompiledSkillDecisionTree")
+
+    def test_tabulated_matches_pick_skill(self):
+        """
+        Test to make sure a SkillLookupTable has a table for trees of
+        threshold conditions and picks the same skill as pick_skill.
+        """
+        for tree in self.create_trees():
+            table = tree.tabulate()
+            self.assertIsNotNone(table.table,
+                                 "A tree whose conditions each read one " +
+                                 "stat should be tabulated.")
+            self.check_same_skills(tree, table, "SkillLookupTable",
+                                   range(0, 101))
+
+    def test_tabulated_falls_back(self):
+        """
+        Test to make sure a SkillLookupTable falls back to the tree for
+        conditions reading more than one stat and for stats out of range,
+        and keeps its table for the branches that do not reach them.
+        """
+        def caster_hp_gt_target_hp(caster, target):
+            """
+            Return True if the caster's HP is > the target's HP.
+            """
+            return caster.get_hp() > target.get_hp()
+        tree = SkillDecisionTree(MageSpecial(), caster_hp_gt_target_hp, 3,
+                                 [self.basic_tree])
+        table = tree.tabulate()
+        self.assertEqual({None}, set(table.table),
+                         "A condition comparing two stats should not be " +
+                         "tabulated.")
+        self.check_same_skills(tree, table, "SkillLookupTable")
+        # A root whose priority is lower than all of its children's is
+        # picked only when its condition is False.
+        tree = SkillDecisionTree(MageSpecial(), caster_hp_gt_target_hp, 0,
+                                 [self.basic_tree])
+        self.check_same_skills(tree, tree.tabulate(), "SkillLookupTable")
+        table = self.default_tree.tabulate(max_hp=50, max_sp=50)
+        self.check_same_skills(self.default_tree, table, "SkillLookupTable")
+        self.default_tree.children.append(
+            SkillDecisionTree(MageSpecial(), caster_hp_gt_target_hp, 0,
+                              [SkillDecisionTree(RogueAttack(), None, 9)]))
+        table = self.default_tree.tabulate()
+        self.assertIn(None, table.table)
+        self.assertGreater(len(set(table.table)), 1,
+                           "Only the branch below a condition comparing " +
+                           "two stats should lose the table.")
+        self.check_same_skills(self.default_tree, table, "SkillLookupTable",
+                               range(0, 101))
+
+    def test_get_tabulated_follows_changes(self):
+        """
+        Test to make sure get_tabulated picks the same skill as pick_skill
+        after a condition that reads no stat changes its answer, and after
+        the tree is changed.
+        """
+        flag = {'on': True}
+        tree = SkillDecisionTree(MageAttack(), lambda c, t: flag['on'], 9,
+                                 [SkillDecisionTree(RogueAttack(), None, 0)])
+        self.assertEqual({None}, set(get_tabulated(tree).table),
+                         "A condition that reads no stat should not be " +
+                         "tabulated.")
+        self.check_same_skills(tree, get_tabulated(tree), "SkillLookupTable")
+        flag['on'] = False
+        self.check_same_skills(tree, get_tabulated(tree), "SkillLookupTable")
+        get_tabulated(self.default_tree)
+        self.default_tree.children.append(tree)
+        self.check_same_skills(self.default_tree,
+                               get_tabulated(self.default_tree),
+                               "SkillLookupTable")
+
+    def test_shared_copies_released(self):
+        """
+        Test to make sure get_shared gives equal trees one copy, and only
+        keeps it while it or one of those trees is still in use.
+        """
+        def make_tree():
+            """
+            Return a new SkillDecisionTree, equal to every other one made.
+            """
+            return SkillDecisionTree(MageAttack(), f1, 2,
+                                     [SkillDecisionTree(RogueAttack(), f2, 1)])
+        tree = make_tree()
+        shared = weakref.ref(get_shared(tree))
+        self.assertIsNot(tree, shared())
+        self.assertIs(shared(), get_shared(make_tree()))
+        self.assertIsNot(shared(), get_shared(self.default_tree))
+        del tree
+        gc.collect()
+        self.assertIsNone(shared(),
+                          "A shared copy should not be kept once no tree " +
+                          "uses it.")
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_pick_skills_matches_pick_skill(self):
+        """
+        Test to make sure pick_skills picks the same skill as pick_skill for
+        every row, with conditions that accept arrays and ones that do not.
+        """
+        def caster_strong(caster, target):
+            """
+            Return True if the caster has more HP and SP than the target.
+            """
+            if caster.get_hp() > target.get_hp():
+                return caster.get_sp() > target.get_sp()
+            return False
+        leaf = SkillDecisionTree(RogueAttack(), caster_strong, 9)
+        mixed = SkillDecisionTree(MageSpecial(), caster_strong, 0,
+                                  [leaf, self.default_tree])
+        rng = random.Random(148)
+        stats = numpy.array([[rng.randrange(101) for _ in range(4)]
+                             for _ in range(500)])
+        for tree in self.create_trees() + [mixed]:
+            ids = tree.pick_skills(*stats.T)
+            values = tree.compile().values
+            for row, i in zip(stats.tolist(), ids.tolist()):
+                self.caster.set_hp(row[0])
+                self.caster.set_sp(row[1])
+                self.target.set_hp(row[2])
+                self.target.set_sp(row[3])
+                expected = tree.pick_skill(self.caster, self.target)
+                self.assertIs(expected, values[i],
+                              ("pick_skills picked a different skill " +
+                               "than pick_skill for the characters:" +
+                               "\n{}\n{}").format(self.caster, self.target))
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
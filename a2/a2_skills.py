@@ -5,6 +5,7 @@ See a2_characters.py for how these are used.
 For any skills you make, you're responsible for making sure their style adheres
 to PythonTA and that you include all documentation for it.
 """
+from a2_skill_decision_tree import get_compiled
 
 
 class Skill:
@@ -90,7 +91,7 @@ class SorcererAttack(Skill):
         >>> s2.get_hp()
         90
         """
-        tree = caster.skill_decision_tree
+        tree = get_compiled(caster.skill_decision_tree)
         skill_use = tree.pick_skill(caster, target)
         caster.reduce_sp(self._cost)
         if type(skill_use) == MageAttack:
@@ -346,6 +347,17 @@ class RogueSpecial(Skill):
         caster.battle_queue.add(caster)
 
 
+# Skills keep no state of their own, so every Character shares these.
+MAGE_ATTACK = MageAttack()
+MAGE_SPECIAL = MageSpecial()
+ROGUE_ATTACK = RogueAttack()
+ROGUE_SPECIAL = RogueSpecial()
+VAMPIRE_ATTACK = VampireAttack()
+VAMPIRE_SPECIAL = VampireSpecial()
+SORCERER_ATTACK = SorcererAttack()
+SORCERER_SPECIAL = SorcererSpecial()
+
+
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config='a2_pyta.txt')
@@ -17,7 +17,9 @@ import unittest
 from a2_game import CHARACTER_CLASSES
 from a2_playstyle import ManualPlaystyle
 from a2_battle_queue import BattleQueue
-from a2_skill_decision_tree import create_default_tree
+from a2_skill_decision_tree import SkillDecisionTree, create_default_tree, \
+    f1
+from a2_skills import MageSpecial
 SorcererConstructor = CHARACTER_CLASSES['s']
 
 class SorcererUnitTests(unittest.TestCase):    
@@ -341,5 +343,51 @@ class SorcererUnitTests(unittest.TestCase):
                               ", ".join(expected_sprites), 
                               ", ".join(obtained_sprites)))
 
+    def test_copy_shares_immutable_parts(self):
+        """
+        Test to make sure a copy shares its skills and tree, only copies its
+        playstyle when it is used, and plays like the original.
+        """
+        self.p1.special_attack()
+        new_battle_queue = self.battle_queue.copy()
+        copy = new_battle_queue.peek()
+        self.assertIs(self.p1._skills, copy._skills,
+                      "A copy of a sorcerer should share its skills.")
+        self.assertIs(self.p1.skill_decision_tree, copy.skill_decision_tree,
+                      "A copy of a sorcerer should share its tree.")
+        self.assertIsNone(copy._playstyle,
+                          "A copy's playstyle should only be copied when " +
+                          "it is used.")
+        self.assertIs(new_battle_queue, copy.playstyle.battle_queue,
+                      "A copy's playstyle should use the copy's queue.")
+        self.assertIsNot(self.p1.playstyle, copy.playstyle,
+                         "A copy should not share its playstyle.")
+        self.assertEqual(repr(self.battle_queue), repr(new_battle_queue),
+                         "A copy of a queue should hold equal characters.")
+        self.p1.attack()
+        copy.attack()
+        self.assertEqual(repr(self.battle_queue), repr(new_battle_queue),
+                         "A copy should attack like the original.")
+        with self.assertRaises(AttributeError):
+            copy.unknown_attribute = 148
+
+
+    def test_attack_after_tree_changed(self):
+        """
+        Test to make sure an attack uses the skill the tree picks now, even if
+        the tree was changed after an earlier attack.
+        """
+        self.p1.attack()
+        self.assertEqual(90, self.p2.get_hp())
+        tree = self.p1.skill_decision_tree
+        tree.children.append(SkillDecisionTree(MageSpecial(), f1, 0))
+        expected = tree.pick_skill(self.p1, self.p2)
+        self.assertIsInstance(expected, MageSpecial)
+        self.p1.attack()
+        self.assertEqual(60, self.p2.get_hp(),
+                         "After its tree was changed, a sorcerer should " +
+                         "attack with the skill the tree picks now.")
+
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
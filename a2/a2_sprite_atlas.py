@@ -0,0 +1,120 @@
+"""
+A sprite atlas and font cache for a2_ui.
+
+a2_ui draws two character sprites, the background and a few lines of text on
+every frame. Loading and decoding a PNG, flipping the second character's
+sprite and creating a font on every frame is slow, so a SpriteAtlas loads
+every sprite once, converts it to the display's pixel format and keeps a
+flipped copy of it for the second character, and get_font keeps every font it
+creates.
+
+Sprites are named <type>_<state>_<frame>.png, like the names returned by
+Character.get_next_sprite.
+"""
+from typing import Dict
+import os
+import re
+import pygame
+
+# The directory holding the sprites, next to this file.
+SPRITE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'sprites')
+
+# The file name of a character sprite: <type>_<state>_<frame>.png.
+_SPRITE_FILE = re.compile(r'^([a-z]+)_([a-z]+)_(\d+)\.png$')
+
+
+class SpriteAtlas:
+    """
+    The sprites a2_ui draws, each loaded from disk once.
+
+    directory - the directory the sprites are loaded from.
+    sprites - every sprite loaded so far, by name.
+    flipped - every loaded sprite flipped to face left, by name.
+    """
+    directory: str
+    sprites: Dict[str, pygame.Surface]
+    flipped: Dict[str, pygame.Surface]
+
+    def __init__(self, directory: str = SPRITE_DIRECTORY,
+                 preload: bool = True) -> None:
+        """
+        Initialize this SpriteAtlas for the sprites in directory, loading
+        every character sprite and the background now if preload is True, and
+        each one the first time it is asked for otherwise.
+        """
+        self.directory = directory
+        self.sprites = {}
+        self.flipped = {}
+        self._background = None
+        if preload:
+            for name in sorted(os.listdir(directory)):
+                if _SPRITE_FILE.match(name):
+                    self._load(name[:-len('.png')])
+            self.get_background()
+
+    def _load(self, name: str) -> pygame.Surface:
+        """
+        Load the sprite name and its flipped copy, and return the sprite.
+        """
+        surface = pygame.image.load(os.path.join(self.directory,
+                                                 name + '.png'))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.sprites[name] = surface
+        self.flipped[name] = pygame.transform.flip(surface, True, False)
+        return surface
+
+    def get(self, name: str, flip: bool = False) -> pygame.Surface:
+        """
+        Return the sprite name, flipped to face left if flip is True.
+        """
+        if name not in self.sprites:
+            self._load(name)
+        return self.flipped[name] if flip else self.sprites[name]
+
+    def get_background(self) -> pygame.Surface:
+        """
+        Return the background.
+        """
+        if self._background is None:
+            background = pygame.image.load(os.path.join(self.directory,
+                                                        'background.png'))
+            if pygame.display.get_surface() is not None:
+                background = background.convert()
+            self._background = background
+        return self._background
+
+    def __len__(self) -> int:
+        """
+        Return the number of character sprites loaded so far.
+        """
+        return len(self.sprites)
+
+
+# Every font get_font has created, by name and size.
+_FONTS = {}
+
+
+def get_font(size: int, name: str = None) -> pygame.font.Font:
+    """
+    Return the system font name (or pygame's default font if name is None)
+    at size, creating it only the first time it is asked for.
+    """
+    if name is None:
+        name = pygame.font.get_default_font()
+    key = (name, size)
+    if key not in _FONTS:
+        if not _FONTS:
+            # Fonts cannot be used after pygame.quit, so they are forgotten
+            # then. pygame forgets the quit function once it has called it.
+            pygame.register_quit(_FONTS.clear)
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _FONTS[key] = pygame.font.SysFont(name, size)
+    return _FONTS[key]
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,86 @@
+"""
+Unittests for the sprite atlas and font cache used by a2_ui.
+
+These tests use SDL's dummy video driver, so they need pygame but no display.
+"""
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+try:
+    import pygame
+    from a2_sprite_atlas import SpriteAtlas, SPRITE_DIRECTORY, get_font
+except ImportError:
+    pygame = None
+
+
+@unittest.skipUnless(pygame, "pygame is not installed")
+class SpriteAtlasUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Sets up a screen for the sprites to be converted for.
+        """
+        pygame.init()
+        self.screen = pygame.display.set_mode((240, 200))
+
+    def tearDown(self):
+        """
+        Shuts pygame down again, so that its timer thread is not left running
+        when later tests fork worker processes.
+        """
+        pygame.quit()
+
+    def test_preload_every_sprite(self):
+        """
+        Test to make sure a SpriteAtlas loads every character sprite when it
+        is created, and matches the sprites loaded from disk.
+        """
+        atlas = SpriteAtlas()
+        names = [name for name in os.listdir(SPRITE_DIRECTORY)
+                 if name.endswith('.png') and name != 'background.png']
+        self.assertEqual(len(names), len(atlas))
+        sprite = 'vampire_special_3'
+        loaded = pygame.image.load(os.path.join(SPRITE_DIRECTORY,
+                                                sprite + '.png'))
+        flipped = pygame.transform.flip(loaded, True, False)
+        for x, y in [(10, 60), (60, 60), (100, 30)]:
+            self.assertEqual(loaded.get_at((x, y)),
+                             atlas.get(sprite).get_at((x, y)))
+            self.assertEqual(flipped.get_at((x, y)),
+                             atlas.get(sprite, flip=True).get_at((x, y)))
+
+    def test_lazy_load_cached(self):
+        """
+        Test to make sure a SpriteAtlas that does not preload loads each
+        sprite the first time it is asked for, and only then.
+        """
+        atlas = SpriteAtlas(preload=False)
+        self.assertEqual(0, len(atlas))
+        first = atlas.get('rogue_idle_0', flip=True)
+        self.assertEqual(1, len(atlas))
+        self.assertIs(first, atlas.get('rogue_idle_0', flip=True))
+        self.assertIs(atlas.get_background(), atlas.get_background())
+
+    def test_font_cached(self):
+        """
+        Test to make sure get_font gives back the same font for the same
+        size.
+        """
+        self.assertIs(get_font(18), get_font(18))
+        self.assertIsNot(get_font(18), get_font(20))
+
+    def test_frames_drawn(self):
+        """
+        Test to make sure a2_ui can draw a whole game through the atlas.
+        """
+        # a2_ui starts pygame when it is imported, so it is only imported
+        # here, where tearDown shuts pygame down again.
+        import a2_ui_benchmark
+        a2_ui_benchmark.set_up_headless('r', 's', 'v')
+        times = a2_ui_benchmark.measure_frames(400)
+        self.assertEqual(400, len(times))
+        self.assertEqual(400, a2_ui_benchmark.summarize(times)['frames'])
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,429 @@
+"""
+Endgame tablebases for A2.
+
+A tablebase holds the solved score and best attack of every position that can
+be reached from the start of a game for one matchup (the types of the two
+characters and the type of BattleQueue). Every move costs SP, so the total SP
+of both characters goes down with every move. The builder lists every
+reachable position and then solves them backwards, from the lowest total SP
+up, so each position's children are already solved when it is reached.
+
+A tablebase is written to a binary file laid out as an open-addressing hash
+table of packed positions, which is memory-mapped and searched in O(1) by
+TablebasePlaystyle.
+
+Tables for Sorcerers are built with create_default_tree(), which is the
+SkillDecisionTree a2_game gives every Sorcerer. Positions whose Sorcerers have
+any other tree are never looked up in them.
+
+Run this file to build the tablebases for every matchup.
+"""
+from typing import Any, Dict, Iterable, List, Tuple, Union
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+from a2_game_state import GameState, CHARACTER_KINDS
+from a2_playstyle import Playstyle, TranspositionTable, \
+    SymmetricTranspositionTable, alpha_beta_score, alpha_beta_select
+from a2_skill_decision_tree import create_default_tree, get_shared
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'tablebases')
+
+# The file header: magic bytes, format version, bytes per packed position,
+# number of slots, number of positions, whether the queue is restricted, and
+# the types of the two characters.
+_MAGIC = b'A2TB'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHIIB16s16s')
+# Each slot holds a packed position, its score and its best attack.
+_SLOT_VALUE = struct.Struct('<hc')
+
+# The number of bits used for each stat of a packed position.
+_HP_BITS = 9
+_SP_BITS = 7
+_LENGTH_BITS = 8
+
+_HASH_PRIME = (1 << 61) - 1
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# The shared copy of the default tree, which tablebases are built with. Keeping
+# it here also keeps it in get_shared's cache.
+_DEFAULT_TREE = get_shared(create_default_tree())
+
+
+def pack_state(state: 'GameState') -> int:
+    """
+    Return a unique non-negative int for the HP, SP, queue order and able to
+    add flags of state. Positions of one matchup never share a packed int.
+
+    >>> state = GameState(('Rogue', 'Mage'), (None, None), 100, 100, 100,
+    ...                   100, (0, 1), None)
+    >>> pack_state(state) == pack_state(state.apply('A'))
+    False
+    """
+    key = 0
+    for value, bits in [(state.hp1, _HP_BITS), (state.sp1, _SP_BITS),
+                        (state.hp2, _HP_BITS), (state.sp2, _SP_BITS)]:
+        if not 0 <= value < 1 << bits:
+            raise ValueError("{} does not fit in a tablebase".format(state))
+        key = key << bits | value
+    if len(state.queue) >= 1 << _LENGTH_BITS:
+        raise ValueError("{} does not fit in a tablebase".format(state))
+    for player in state.queue:
+        key = key << 1 | player
+    for able in state.able or ():
+        key = key << 1 | able
+    return key << _LENGTH_BITS | len(state.queue)
+
+
+def has_default_trees(state: 'GameState') -> bool:
+    """
+    Return whether every Sorcerer of state has a tree with the same
+    fingerprint as create_default_tree(), which tablebases are built with.
+
+    >>> from a2_skill_decision_tree import SkillDecisionTree, f1
+    >>> from a2_skills import MageSpecial
+    >>> state = start_state('Sorcerer', 'Mage', False)
+    >>> has_default_trees(state._replace(trees=(create_default_tree(), None)))
+    True
+    >>> other = SkillDecisionTree(MageSpecial(), f1, 1)
+    >>> has_default_trees(state._replace(trees=(other, None)))
+    False
+    """
+    return all(tree is None or get_shared(tree) is _DEFAULT_TREE
+               for tree in state.trees)
+
+
+def _slot(key: int, capacity: int) -> int:
+    """
+    Return the first slot to look for the packed position key in a table with
+    capacity slots.
+    """
+    return (key % _HASH_PRIME) * _HASH_MULTIPLIER % capacity
+
+
+def start_state(p1_kind: str, p2_kind: str, restricted: bool,
+                hp1: int = 100, hp2: int = 100) -> 'GameState':
+    """
+    Return the GameState at the start of a game between a p1_kind and a
+    p2_kind with HP hp1 and hp2, in a RestrictedBattleQueue if restricted.
+
+    >>> start_state('Rogue', 'Mage', True)
+    GameState(kinds=('Rogue', 'Mage'), trees=(None, None), hp1=100, \
+sp1=100, hp2=100, sp2=100, queue=(0, 1), able=(True, True))
+    """
+    trees = tuple(_DEFAULT_TREE if kind == 'Sorcerer' else None
+                  for kind in [p1_kind, p2_kind])
+    return GameState((p1_kind, p2_kind), trees, hp1, 100, hp2, 100, (0, 1),
+                     (True, True) if restricted else None)
+
+
+def solve_matchup(starts: Iterable['GameState']) \
+        -> Dict['GameState', Tuple[int, str]]:
+    """
+    Return the score and best attack of every unfinished position reachable
+    from the GameStates in starts, which must all be of one matchup.
+
+    The best attack is chosen like RecursiveMinimax does: 'S' if it scores
+    strictly higher than 'A', and 'A' otherwise.
+
+    >>> solved = solve_matchup([start_state('Mage', 'Mage', False)])
+    >>> solved[start_state('Mage', 'Mage', False)]
+    (8, 'A')
+    """
+    positions = set(starts)
+    to_expand = list(positions)
+    while to_expand:
+        state = to_expand.pop()
+        if state.is_over():
+            continue
+        for action in state.get_available_actions(state.peek()):
+            child = state.apply(action)
+            if child not in positions:
+                positions.add(child)
+                to_expand.append(child)
+
+    scores = {}
+    solved = {}
+    for state in sorted(positions, key=lambda s: s.sp1 + s.sp2):
+        if state.is_over():
+            scores[state] = state.get_score()
+            continue
+        player = state.peek()
+        score_dict = {}
+        for action in state.get_available_actions(player):
+            child = state.apply(action)
+            if child.peek() == player:
+                score_dict[action] = scores[child]
+            else:
+                score_dict[action] = -1 * scores[child]
+        best = 'A' if 'A' in score_dict else 'S'
+        if 'A' in score_dict and 'S' in score_dict and \
+                score_dict['A'] < score_dict['S']:
+            best = 'S'
+        scores[state] = score_dict[best]
+        solved[state] = (score_dict[best], best)
+    return solved
+
+
+def write_table(path: str, kinds: Tuple[str, str], restricted: bool,
+                solved: Dict['GameState', Tuple[int, str]]) -> None:
+    """
+    Write the solved positions of the matchup kinds to the tablebase file at
+    path.
+    """
+    packed = [(pack_state(state), score, move)
+              for state, (score, move) in solved.items()]
+    key_bytes = max([(key.bit_length() + 7) // 8 for key, _, _ in packed],
+                    default=1)
+    capacity = max(2 * len(packed), 1)
+    slot_size = key_bytes + _SLOT_VALUE.size
+    table = bytearray(capacity * slot_size)
+    for key, score, move in packed:
+        slot = _slot(key, capacity)
+        while any(table[slot * slot_size:slot * slot_size + key_bytes]):
+            slot = (slot + 1) % capacity
+        start = slot * slot_size
+        table[start:start + key_bytes] = key.to_bytes(key_bytes, 'little')
+        _SLOT_VALUE.pack_into(table, start + key_bytes, score,
+                              move.encode())
+    header = _HEADER.pack(_MAGIC, _VERSION, key_bytes, capacity, len(packed),
+                          restricted, kinds[0].encode(), kinds[1].encode())
+    with open(path, 'wb') as table_file:
+        table_file.write(header)
+        table_file.write(table)
+
+
+def table_path(directory: str, kinds: Tuple[str, str],
+               restricted: bool) -> str:
+    """
+    Return the path of the tablebase file for the matchup kinds in directory.
+
+    >>> os.path.basename(table_path('tb', ('Rogue', 'Mage'), False))
+    'rogue_mage_n.a2tb'
+    """
+    name = '{}_{}_{}.a2tb'.format(kinds[0].lower(), kinds[1].lower(),
+                                  'r' if restricted else 'n')
+    return os.path.join(directory, name)
+
+
+class Tablebase:
+    """
+    A memory-mapped tablebase file for one matchup.
+
+    kinds - the types of the two characters of the matchup.
+    restricted - whether the matchup uses a RestrictedBattleQueue.
+    """
+    kinds: Tuple[str, str]
+    restricted: bool
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize this Tablebase by memory-mapping the file at path.
+        """
+        with open(path, 'rb') as table_file:
+            self._map = mmap.mmap(table_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, version, self._key_bytes, self._capacity, self._count, \
+            restricted, p1_kind, p2_kind = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("{} is not an A2 tablebase".format(path))
+        self.restricted = bool(restricted)
+        self.kinds = (p1_kind.rstrip(b'\0').decode(),
+                      p2_kind.rstrip(b'\0').decode())
+        self._slot_size = self._key_bytes + _SLOT_VALUE.size
+
+    def lookup(self, state: 'GameState') -> Union[Tuple[int, str], None]:
+        """
+        Return the score and best attack of state, or None if state is not in
+        this Tablebase. Positions whose Sorcerers do not have the default
+        tree are never in it.
+        """
+        if state.kinds != self.kinds or \
+                (state.able is not None) != self.restricted or \
+                not has_default_trees(state):
+            return None
+        try:
+            key = pack_state(state)
+        except ValueError:
+            return None
+        if key.bit_length() > 8 * self._key_bytes:
+            return None
+        key_bytes = key.to_bytes(self._key_bytes, 'little')
+        empty = bytes(self._key_bytes)
+        slot = _slot(key, self._capacity)
+        while True:
+            start = _HEADER.size + slot * self._slot_size
+            stored = self._map[start:start + self._key_bytes]
+            if stored == key_bytes:
+                score, move = _SLOT_VALUE.unpack_from(
+                    self._map, start + self._key_bytes)
+                return score, move.decode()
+            if stored == empty:
+                return None
+            slot = (slot + 1) % self._capacity
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions in this Tablebase.
+        """
+        return self._count
+
+    def close(self) -> None:
+        """
+        Unmap the file of this Tablebase.
+        """
+        self._map.close()
+
+
+def build_matchup(directory: str, p1_kind: str, p2_kind: str,
+                  restricted: bool, hp_values: List[int] = None) -> str:
+    """
+    Solve the matchup of a p1_kind against a p2_kind, write its tablebase to
+    directory, and return the path of the file.
+
+    The tablebase covers every position reachable from the start of a game,
+    and from a start with each pair of HPs in hp_values if it is given.
+    """
+    starts = [start_state(p1_kind, p2_kind, restricted)]
+    for hp1 in hp_values or []:
+        for hp2 in hp_values:
+            starts.append(start_state(p1_kind, p2_kind, restricted, hp1, hp2))
+    path = table_path(directory, (p1_kind, p2_kind), restricted)
+    write_table(path, (p1_kind, p2_kind), restricted, solve_matchup(starts))
+    return path
+
+
+def _build_matchup_job(job: tuple) -> str:
+    """
+    Call build_matchup with the arguments in job, for a multiprocessing pool.
+    """
+    return build_matchup(*job)
+
+
+def build_tablebases(directory: str = DEFAULT_DIRECTORY,
+                     matchups: List[Tuple[str, str, bool]] = None,
+                     processes: int = None,
+                     hp_values: List[int] = None) -> List[str]:
+    """
+    Build the tablebase of each (p1 type, p2 type, restricted) in matchups,
+    or of every matchup if matchups is None, and return their paths. Each
+    matchup is solved by its own worker in a pool of processes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if matchups is None:
+        matchups = [(p1_kind, p2_kind, restricted)
+                    for p1_kind in CHARACTER_KINDS
+                    for p2_kind in CHARACTER_KINDS
+                    for restricted in [False, True]]
+    jobs = [(directory, p1_kind, p2_kind, restricted, hp_values)
+            for p1_kind, p2_kind, restricted in matchups]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_build_matchup_job, jobs)
+
+
+class TablebasePlaystyle(Playstyle):
+    """
+    A playstyle that looks up the best attack in the tablebases, and falls
+    back to an alpha-beta search for positions that are not in them,
+    including every position of a Sorcerer whose tree is not the default.
+    Inherits from Playstyle.
+
+    Tablebases are opened when they are first needed, and stay open, shared
+    with this playstyle's copies, until close is called.
+
+    directory - the directory holding the tablebase files.
+    table - the TranspositionTable used by the fallback search.
+    """
+    directory: str
+    table: TranspositionTable
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 directory: str = DEFAULT_DIRECTORY,
+                 table: TranspositionTable = None,
+                 open_tables: Dict[str, Tablebase] = None) -> None:
+        """
+        Initialize this TablebasePlaystyle with BattleQueue as its battle
+        queue, reading tablebases from directory. The tablebases already
+        open are kept in open_tables, by path, if it is given.
+        """
+        super().__init__(battle_queue)
+        self.is_manual = False
+        self.directory = directory
+        self.table = table if table is not None \
+            else SymmetricTranspositionTable()
+        self._open_tables = open_tables if open_tables is not None else {}
+
+    def _tablebase(self, state: 'GameState') -> Union[Tablebase, None]:
+        """
+        Return the Tablebase for the matchup of state, or None if it has not
+        been built.
+        """
+        path = table_path(self.directory, state.kinds, state.able is not None)
+        if path not in self._open_tables:
+            if not os.path.exists(path):
+                return None
+            self._open_tables[path] = Tablebase(path)
+        return self._open_tables[path]
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this Playstyle's
+        battle_queue to perform.
+
+        Return 'X' if a valid move cannot be found.
+        """
+        actions = self.battle_queue.peek().get_available_actions()
+        if not actions:
+            return 'X'
+        if len(actions) == 1:
+            return actions[0]
+        state = GameState.from_battle_queue(self.battle_queue)
+        tablebase = self._tablebase(state)
+        if tablebase is not None:
+            entry = tablebase.lookup(state)
+            if entry is not None:
+                return entry[1]
+        return alpha_beta_select(
+            state, lambda child, alpha, beta: alpha_beta_score(
+                child, alpha, beta, self.table))
+
+    def close(self) -> None:
+        """
+        Unmap the tablebases this TablebasePlaystyle and its copies have
+        opened. They are opened again if they are needed later.
+        """
+        for tablebase in self._open_tables.values():
+            tablebase.close()
+        self._open_tables.clear()
+
+    def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
+        """
+        Return a copy of this TablebasePlaystyle which uses the BattleQueue
+        new_battle_queue.
+        """
+        return TablebasePlaystyle(new_battle_queue, self.directory,
+                                  self.table, self._open_tables)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Build the A2 endgame tablebases.")
+    parser.add_argument('directory', nargs='?', default=DEFAULT_DIRECTORY)
+    parser.add_argument('--processes', type=int, default=None,
+                        help="number of worker processes (default: one per "
+                             "CPU)")
+    parser.add_argument('--hp-step', type=int, default=None,
+                        help="also solve games starting from every pair of "
+                             "HPs that are multiples of this step")
+    arguments = parser.parse_args()
+    hps = None
+    if arguments.hp_step:
+        hps = list(range(arguments.hp_step, 101, arguments.hp_step))
+    for built in build_tablebases(arguments.directory,
+                                  processes=arguments.processes,
+                                  hp_values=hps):
+        print(built)
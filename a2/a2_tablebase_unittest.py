@@ -0,0 +1,170 @@
+"""
+Unittests for the endgame tablebases of A2.
+"""
+import os
+import tempfile
+import unittest
+
+from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_game_state import GameState
+from a2_playstyle import get_game_state_score, TranspositionTable
+from a2_tablebase import Tablebase, build_tablebases, solve_matchup, \
+    start_state, table_path, write_table
+from a2_skill_decision_tree import SkillDecisionTree, create_default_tree, f1
+from a2_skills import MageSpecial
+MageConstructor = CHARACTER_CLASSES['m']
+RogueConstructor = CHARACTER_CLASSES['r']
+SorcererConstructor = CHARACTER_CLASSES['s']
+Minimax = PLAYSTYLE_CLASSES['mr']
+TablebaseMinimax = PLAYSTYLE_CLASSES['tb']
+
+
+class TablebaseUnitTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Builds the Rogue v Mage tablebases, for both types of BattleQueue,
+        and a Sorcerer v Rogue tablebase for games starting with 30 HP each,
+        into a temporary directory.
+        """
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.paths = build_tablebases(cls.directory.name,
+                                     [('Rogue', 'Mage', False),
+                                      ('Rogue', 'Mage', True)],
+                                     processes=2)
+        start = start_state('Sorcerer', 'Rogue', False, 30, 30)
+        write_table(table_path(cls.directory.name, start.kinds, False),
+                    start.kinds, False, solve_matchup([start]))
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Delete the temporary directory holding the tablebases.
+        """
+        cls.directory.cleanup()
+
+    def make_battle_queue(self, queue_class):
+        """
+        Return a queue_class holding a Rogue named R and a Mage named M,
+        using the TablebasePlaystyle.
+        """
+        battle_queue = queue_class()
+        playstyle = TablebaseMinimax(battle_queue, self.directory.name)
+        rogue = RogueConstructor("R", battle_queue, playstyle)
+        mage = MageConstructor("M", battle_queue, playstyle)
+        rogue.enemy = mage
+        mage.enemy = rogue
+        battle_queue.add(rogue)
+        battle_queue.add(mage)
+        return battle_queue
+
+    def test_files_written(self):
+        """
+        Test to make sure a tablebase file is written for each matchup.
+        """
+        for restricted in [False, True]:
+            path = table_path(self.directory.name, ('Rogue', 'Mage'),
+                              restricted)
+            self.assertIn(path, self.paths)
+            self.assertTrue(os.path.exists(path))
+
+    def test_lookup_matches_search(self):
+        """
+        Test to make sure every solved position is stored with the score
+        that minimax gives it.
+        """
+        table = TranspositionTable(10 ** 6)
+        for restricted in [False, True]:
+            start = start_state('Rogue', 'Mage', restricted)
+            tablebase = Tablebase(table_path(self.directory.name,
+                                             start.kinds, restricted))
+            solved = solve_matchup([start])
+            self.assertEqual(len(solved), len(tablebase))
+            for state, (score, move) in solved.items():
+                self.assertEqual((score, move), tablebase.lookup(state))
+                self.assertEqual(score, get_game_state_score(state, table))
+            tablebase.close()
+
+    def test_lookup_missing(self):
+        """
+        Test to make sure positions that are not in a tablebase are not
+        found.
+        """
+        start = start_state('Rogue', 'Mage', False)
+        tablebase = Tablebase(table_path(self.directory.name, start.kinds,
+                                         False))
+        self.assertIsNone(tablebase.lookup(start._replace(hp1=99, sp1=1)))
+        self.assertIsNone(tablebase.lookup(start._replace(
+            kinds=('Mage', 'Rogue'))))
+        tablebase.close()
+
+    def test_select_attack_matches_minimax(self):
+        """
+        Test to make sure the TablebasePlaystyle picks the same attacks as
+        RecursiveMinimax, whether or not the position is in the tablebase.
+        """
+        for queue_class in [BattleQueue, RestrictedBattleQueue]:
+            battle_queue = self.make_battle_queue(queue_class)
+            for hp, sp in [(100, 100), (40, 10), (23, 57)]:
+                battle_queue.peek().set_hp(hp)
+                battle_queue.peek().set_sp(sp)
+                expected = Minimax(battle_queue).select_attack()
+                actual = battle_queue.peek().playstyle.select_attack()
+                self.assertEqual(expected, actual,
+                                 ("Calling select_attack() on a " +
+                                  "BattleQueue that looks like:\n{}\n" +
+                                  "Should return the attack {} but got {} " +
+                                  "instead.").format(battle_queue, expected,
+                                                     actual))
+
+    def test_close_unmaps_tablebases(self):
+        """
+        Test to make sure closing a TablebasePlaystyle unmaps the tablebases
+        it and its copies opened, and that it opens them again afterwards.
+        """
+        battle_queue = self.make_battle_queue(BattleQueue)
+        playstyle = battle_queue.peek().playstyle
+        copy = playstyle.copy(battle_queue.copy())
+        state = GameState.from_battle_queue(battle_queue)
+        tablebase = playstyle._tablebase(state)
+        self.assertIs(tablebase, copy._tablebase(state),
+                      "A copy should share its playstyle's tablebases.")
+        expected = playstyle.select_attack()
+        playstyle.close()
+        self.assertTrue(tablebase._map.closed,
+                        "close() should unmap the open tablebases.")
+        self.assertEqual(expected, copy.select_attack())
+        self.assertIsNot(tablebase, playstyle._tablebase(state))
+        playstyle.close()
+
+
+    def test_other_tree_searched(self):
+        """
+        Test to make sure a Sorcerer whose tree is not the default one is
+        not looked up in a tablebase built with the default tree, and that
+        its attack is found by searching instead.
+        """
+        battle_queue = BattleQueue()
+        playstyle = TablebaseMinimax(battle_queue, self.directory.name)
+        sorcerer = SorcererConstructor("S", battle_queue, playstyle)
+        rogue = RogueConstructor("R", battle_queue, playstyle)
+        sorcerer.enemy = rogue
+        rogue.enemy = sorcerer
+        sorcerer.set_hp(30)
+        rogue.set_hp(30)
+        battle_queue.add(sorcerer)
+        battle_queue.add(rogue)
+        sorcerer.set_skill_decision_tree(create_default_tree())
+        self.assertEqual('S', playstyle.select_attack())
+        sorcerer.set_skill_decision_tree(
+            SkillDecisionTree(MageSpecial(), f1, 1))
+        expected = Minimax(battle_queue).select_attack()
+        self.assertEqual('A', expected)
+        self.assertEqual(expected, playstyle.select_attack(),
+                         "A Sorcerer with another tree should not use the " +
+                         "tablebase built with the default tree.")
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -10,6 +10,9 @@ all of your client code.
 import a2_game
 import pygame
 import sys
+import threading
+from concurrent.futures import Future
+from a2_sprite_atlas import SpriteAtlas, get_font
 
 GAME_SPEED = 100
 pygame.init()
@@ -22,14 +25,28 @@ P1_POSITION = CHARACTER_SIZE // 4
 P2_POSITION = CHARACTER_SIZE - (CHARACTER_SIZE // 4)
 RANDOM_TIMER = 10
 FONT_SIZE = 18
+# Every sprite, loaded once the screen is set up
+SPRITES = None
+# What each part of the screen showed when it was last drawn, the surfaces
+# and positions it was drawn with, and the area they covered
+DRAWN = {}
+# The move a computer player is deciding on in the background, with the
+# Match and character it is for, or None when no one is thinking
+THINKING = None
 
 def start_game():
     """
     Start and initialize the game
     """
-    global PYGAME_SCREEN, CHARACTER_SIZE, NUMBER_OF_CHARACTERS, FONT_SIZE
     a2_game.set_up_game()
-    
+    set_up_screen()
+
+def set_up_screen():
+    """
+    Set up the screen to draw on, and load the sprites for it.
+    """
+    global PYGAME_SCREEN, SPRITES
+
     # Set up the width and height of the screen (proportional to the character
     # sizes)
     width = NUMBER_OF_CHARACTERS * CHARACTER_SIZE
@@ -40,9 +57,72 @@ def start_game():
     # set the screen to draw on
     PYGAME_SCREEN = pygame.display.set_mode(pixel_size)
 
+    # Load every sprite now, converted to the screen's pixel format, so
+    # drawing a frame never touches the disk
+    SPRITES = SpriteAtlas()
+    # The new screen is blank, so every part needs to be drawn on it
+    DRAWN.clear()
+
+def start_thinking():
+    """
+    Have the next character's playstyle decide on a move on a background
+    thread, so the UI keeps drawing while it thinks. The thread only reads a
+    copy of the game, taken before it starts.
+    """
+    global THINKING
+
+    future = Future()
+    # The UI keeps reading the game's queue while the move is decided, so
+    # the search is given a copy of it to read instead
+    battle_queue = a2_game.BATTLE_QUEUE.copy()
+
+    def think():
+        try:
+            future.set_result(battle_queue.peek().playstyle.select_attack())
+        except BaseException as error:
+            future.set_exception(error)
+
+    THINKING = (future, a2_game.DEFAULT_MATCH, a2_game.BATTLE_QUEUE.peek())
+    # A daemon thread doesn't keep the game open when the window is closed
+    threading.Thread(target=think, daemon=True).start()
+
+def finish_thinking():
+    """
+    Perform the move the background thread decided on, if it is ready, and
+    return whether a character is still thinking.
+    """
+    global THINKING
+
+    if THINKING is None:
+        return False
+    future, match, character = THINKING
+    if not future.done():
+        return True
+    THINKING = None
+    move = future.result()
+    # Drop the move if the game it was decided for has changed since
+    if (match is a2_game.DEFAULT_MATCH and not a2_game.GAME_IS_OVER and
+            not a2_game.BATTLE_QUEUE.is_over() and
+            a2_game.BATTLE_QUEUE.peek() is character):
+        a2_game.apply_move(move)
+    return False
+
+def render_lines(lines, x, y, font):
+    """
+    Return the text lines rendered with font, each paired with where it's
+    drawn, starting at (x, y).
+    """
+    blits = []
+    for line in lines:
+        blits.append((font.render(line, True, (0, 0, 0)), (x, y)))
+        y += FONT_SIZE
+    return blits
+
 def update_game():
     """
-    Update the game's UI.
+    Update the game's UI, redrawing only the parts of the screen that changed
+    since the last frame, and return the areas of the screen that were
+    redrawn.
     """
     global PYGAME_SCREEN, CHARACTER_SIZE, P1_POSITION, P2_POSITION
     
@@ -62,72 +142,83 @@ def update_game():
     
     p2_label = "{}\nHP: {}\nSP: {}".format(p2_name, p2_hp, p2_sp).split("\n")
     
-    font_type = pygame.font.get_default_font()
-    font = pygame.font.SysFont(font_type, FONT_SIZE)
-    
-    p1_icon = pygame.image.load('sprites/' + p1_sprite + '.png')
-    p2_icon = pygame.image.load('sprites/' + p2_sprite + '.png')
-
-    PYGAME_SCREEN.fill((255, 255, 255)) # (255, 255, 255)=(r,g,b)=white
-    bg = pygame.image.load('sprites/background.png')
-    rect = pygame.Rect(0, 0, NUMBER_OF_CHARACTERS * CHARACTER_SIZE,
-                       CHARACTER_SIZE + PADDING * 2)
-    PYGAME_SCREEN.blit(bg, rect)
-    
-    # Draw the first character
-    (x, y) = P1_POSITION, PADDING
-    rect = pygame.Rect(x, y, CHARACTER_SIZE, CHARACTER_SIZE)
-    PYGAME_SCREEN.blit(p1_icon, rect)
-    
-    y_coordinate = 0
-    for line in p1_label:
-        text = font.render(line, True, (0, 0, 0))
-        PYGAME_SCREEN.blit(text, (P1_POSITION + PADDING, y_coordinate))
-        y_coordinate += FONT_SIZE
-    
-    # Draw the HP bar
-    # Draw the SP bar
-    
-    # Draw the second character
-    # Flip p2 so they face p1
-    p2_icon = pygame.transform.flip(p2_icon, True, False)
-    (x, y) = P2_POSITION, PADDING
-    rect = pygame.Rect(x, y, CHARACTER_SIZE, CHARACTER_SIZE)
-    PYGAME_SCREEN.blit(p2_icon, rect)
-
-    y_coordinate = 0
-    for line in p2_label:
-        text = font.render(line, True, (0, 0, 0))
-        PYGAME_SCREEN.blit(text, (P2_POSITION + PADDING, y_coordinate))
-        y_coordinate += FONT_SIZE    
-    
     # Update the current player and available actions
     if not a2_game.GAME_IS_OVER:
         actions = draw_parameters['actions']
         current_player = draw_parameters['current_player']
-        action_label = ["Current Character: {}".format(current_player),
+        if THINKING is not None:
+            current_player += " (thinking...)"
+        status_label = ["Current Character: {}".format(current_player),
                         "Available Actions: {}".format(", ".join(actions))]
-    
-        y_coordinate = CHARACTER_SIZE + PADDING
-        for line in action_label:
-            text = font.render(line, True, (0, 0, 0))
-            PYGAME_SCREEN.blit(text, (P1_POSITION + PADDING // 2, y_coordinate))
-            y_coordinate += FONT_SIZE
     else:
-        game_label = ["Game over!"]
+        status_label = ["Game over!"]
         winner = a2_game.GAME_WINNER
         if winner:
-            game_label.append("The winner is {}!".format(winner.get_name()))
+            status_label.append("The winner is {}!".format(winner.get_name()))
         else:
-            game_label.append("The game ended in a tie!")
-        
-        y_coordinate = CHARACTER_SIZE + PADDING
-        for line in game_label:
-            text = font.render(line, True, (0, 0, 0))
-            PYGAME_SCREEN.blit(text, (P1_POSITION + PADDING // 2, y_coordinate))
-            y_coordinate += FONT_SIZE 
+            status_label.append("The game ended in a tie!")
+    
+    font = get_font(FONT_SIZE)
+    
+    # Each part of the screen, from the bottom up: what it shows, and how to
+    # draw it. Flip p2 so they face p1.
+    parts = [('p1_sprite', p1_sprite,
+              lambda: [(SPRITES.get(p1_sprite), (P1_POSITION, PADDING))]),
+             ('p2_sprite', p2_sprite,
+              lambda: [(SPRITES.get(p2_sprite, flip=True),
+                        (P2_POSITION, PADDING))]),
+             ('p1_label', p1_label,
+              lambda: render_lines(p1_label, P1_POSITION + PADDING, 0, font)),
+             ('p2_label', p2_label,
+              lambda: render_lines(p2_label, P2_POSITION + PADDING, 0, font)),
+             ('status_label', status_label,
+              lambda: render_lines(status_label, P1_POSITION + PADDING // 2,
+                                   CHARACTER_SIZE + PADDING, font))]
+    
+    # Only draw the parts that show something new, and redraw the area they
+    # covered last frame as well as the one they cover now. Nothing has been
+    # drawn on a new screen, so all of it is redrawn.
+    redraw_all = not DRAWN
+    dirty = []
+    for name, shown, draw in parts:
+        last = DRAWN.get(name)
+        if last is None or last[0] != shown:
+            blits = draw()
+            area = blits[0][0].get_rect(topleft=blits[0][1]).unionall(
+                [surface.get_rect(topleft=position)
+                 for surface, position in blits[1:]])
+            if last is not None:
+                dirty.append(area.union(last[2]))
+            else:
+                dirty.append(area)
+            DRAWN[name] = (shown, blits, area)
+    if redraw_all:
+        dirty = [PYGAME_SCREEN.get_rect()]
+    
+    # Merge overlapping areas, so nothing is drawn twice
+    areas = []
+    for rect in dirty:
+        index = rect.collidelist(areas)
+        while index != -1:
+            rect = rect.union(areas.pop(index))
+            index = rect.collidelist(areas)
+        areas.append(rect)
+    
+    # Redraw the background and every part overlapping each changed area, as
+    # the characters and labels overlap
+    bg = SPRITES.get_background()
+    for rect in areas:
+        PYGAME_SCREEN.set_clip(rect)
+        PYGAME_SCREEN.fill((255, 255, 255)) # (255, 255, 255)=(r,g,b)=white
+        PYGAME_SCREEN.blit(bg, (0, 0))
+        for name, _, _ in parts:
+            _, blits, area = DRAWN[name]
+            if area.colliderect(rect):
+                PYGAME_SCREEN.blits(blits, doreturn=False)
+    PYGAME_SCREEN.set_clip(None)
     
-    pygame.display.flip()
+    pygame.display.update(areas)
+    return areas
 
 if __name__ == '__main__':
     start_game()
@@ -154,12 +245,14 @@ if __name__ == '__main__':
                     a2_game.LAST_KEY_PRESSED = k
                     a2_game.perform_attack()
                 
-        # If the current player isn't using a manual playstyle, pick a move
-        if (not a2_game.GAME_IS_OVER and
+        # If the current player isn't using a manual playstyle, start them
+        # picking a move in the background, and make it once it's picked
+        if (not finish_thinking() and
+            not a2_game.GAME_IS_OVER and
             not a2_game.BATTLE_QUEUE.is_over() and 
             not a2_game.BATTLE_QUEUE.peek().playstyle.is_manual and
             RANDOM_TIMER == 10):
-            a2_game.perform_attack()
+            start_thinking()
     
         # Redraw the game
         update_game()
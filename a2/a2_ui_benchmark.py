@@ -0,0 +1,110 @@
+"""
+A frame-time benchmark for a2_ui.
+
+Plays a game between two computer playstyles through a2_ui.update_game with
+SDL's dummy video driver, so nothing is shown and no window is needed, and
+reports how long each frame took to draw and how much of the screen it
+redrew. As in a2_ui, a computer player attacks every RANDOM_TIMER frames.
+
+Run this file to measure the frame times, e.g.
+    python a2_ui_benchmark.py --frames 1000 --p1 v --p2 s
+and add --full to redraw the whole screen every frame, as a2_ui did before it
+only redrew the parts of the screen that changed.
+"""
+from typing import Dict, List, Optional
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import a2_game
+import a2_ui
+
+
+def set_up_headless(queue_type: str = 'n', p1_type: str = 'r',
+                    p2_type: str = 'm', p1_playstyle: str = 'r',
+                    p2_playstyle: str = 'r') -> None:
+    """
+    Set up a2_game's default Match without prompting, and a2_ui's screen.
+    """
+    match = a2_game.Match()
+    match.set_up(queue_type, p1_type, 'P1', p1_playstyle, p2_type, 'P2',
+                 p2_playstyle)
+    a2_game.set_default_match(match)
+    a2_ui.set_up_screen()
+
+
+def measure_frames(frames: int, full: bool = False,
+                   redrawn: Optional[List[float]] = None) -> List[float]:
+    """
+    Draw frames frames of the game set up in a2_game, attacking every
+    RANDOM_TIMER frames, and return how many seconds each frame took to
+    draw. If full is True, the whole screen is redrawn every frame. If
+    redrawn is a list, the fraction of the screen redrawn in each frame is
+    appended to it.
+    """
+    screen_area = a2_ui.PYGAME_SCREEN.get_width() * \
+        a2_ui.PYGAME_SCREEN.get_height()
+    times = []
+    for frame in range(frames):
+        if frame % a2_ui.RANDOM_TIMER == 0 and not a2_game.GAME_IS_OVER and \
+                not a2_game.BATTLE_QUEUE.is_over():
+            a2_game.perform_attack()
+        start = time.perf_counter()
+        if full:
+            a2_ui.DRAWN.clear()
+        dirty = a2_ui.update_game()
+        times.append(time.perf_counter() - start)
+        if redrawn is not None:
+            area = sum(rect.width * rect.height for rect in dirty)
+            redrawn.append(min(area, screen_area) / screen_area)
+    return times
+
+
+def summarize(times: List[float],
+              redrawn: Optional[List[float]] = None) -> Dict[str, float]:
+    """
+    Return the mean, median, 95th percentile and longest of the frame times
+    times in milliseconds, and the frame rate they allow, with the mean
+    percentage of the screen redrawn each frame if redrawn is given.
+
+    >>> summary = summarize([0.001, 0.002, 0.003, 0.004], [1, 0.5, 0.5, 0])
+    >>> summary['mean_ms'], summary['max_ms'], summary['fps']
+    (2.5, 4.0, 400.0)
+    >>> summary['redrawn_pct']
+    50.0
+    """
+    ordered = sorted(times)
+    mean = statistics.mean(ordered)
+    summary = {'frames': len(ordered),
+               'mean_ms': round(mean * 1000, 3),
+               'median_ms': round(statistics.median(ordered) * 1000, 3),
+               'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] *
+                               1000, 3),
+               'max_ms': round(ordered[-1] * 1000, 3),
+               'fps': round(1 / mean, 1)}
+    if redrawn is not None:
+        summary['redrawn_pct'] = round(statistics.mean(redrawn) * 100, 1)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Measure how long a2_ui takes to draw each frame.")
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--queue', default='n',
+                        choices=list(a2_game.BATTLE_QUEUE_CLASSES.keys()))
+    parser.add_argument('--p1', default='r',
+                        choices=list(a2_game.CHARACTER_CLASSES.keys()))
+    parser.add_argument('--p2', default='m',
+                        choices=list(a2_game.CHARACTER_CLASSES.keys()))
+    parser.add_argument('--full', action='store_true',
+                        help="redraw the whole screen every frame")
+    arguments = parser.parse_args()
+    set_up_headless(arguments.queue, arguments.p1, arguments.p2)
+    redrawn_fractions = []
+    frame_times = measure_frames(arguments.frames, arguments.full,
+                                 redrawn_fractions)
+    print(summarize(frame_times, redrawn_fractions))
@@ -0,0 +1,156 @@
+"""
+Unittests for drawing only what changed, and for computer players thinking in
+the background, in a2_ui.
+
+These tests use SDL's dummy video driver, so they need pygame but no display.
+"""
+import os
+import time
+import unittest
+
+from a2_playstyle import RandomPlaystyle
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+class HeadlessUITestCase(unittest.TestCase):
+    def setUp(self):
+        """
+        Sets up a game between a minimax Rogue and a random Mage.
+        """
+        # a2_ui starts pygame when it is imported, so it is only imported
+        # here, where tearDown shuts pygame down again.
+        import a2_game
+        import a2_ui
+        import a2_ui_benchmark
+        self.game = a2_game
+        self.ui = a2_ui
+        a2_ui_benchmark.set_up_headless('n', 'r', 'm', 'mra', 'r')
+
+    def tearDown(self):
+        """
+        Shuts pygame down again, so that its timer thread is not left running
+        when later tests fork worker processes.
+        """
+        while self.ui.THINKING is not None and \
+                not self.ui.THINKING[0].done():
+            time.sleep(0.01)
+        self.ui.THINKING = None
+        pygame.quit()
+
+
+@unittest.skipUnless(pygame, "pygame is not installed")
+class DirtyRectangleUnitTests(HeadlessUITestCase):
+    def test_matches_full_redraw(self):
+        """
+        Test to make sure redrawing only the areas that changed leaves the
+        screen the same as drawing every part from scratch, through a whole
+        game.
+        """
+        screen = self.ui.PYGAME_SCREEN
+        order = ['p1_sprite', 'p2_sprite', 'p1_label', 'p2_label',
+                 'status_label']
+        self.assertEqual([screen.get_rect()], self.ui.update_game())
+        for frame in range(1, 400):
+            if frame % self.ui.RANDOM_TIMER == 0 and \
+                    not self.game.GAME_IS_OVER:
+                self.game.perform_attack()
+            areas = self.ui.update_game()
+            self.assertNotIn(screen.get_rect(), areas)
+            expected = screen.copy()
+            expected.fill((255, 255, 255))
+            expected.blit(self.ui.SPRITES.get_background(), (0, 0))
+            for name in order:
+                expected.blits(self.ui.DRAWN[name][1])
+            self.assertEqual(pygame.image.tobytes(expected, 'RGB'),
+                             pygame.image.tobytes(screen, 'RGB'))
+        self.assertTrue(self.game.GAME_IS_OVER)
+
+    def test_unchanged_frame_not_redrawn(self):
+        """
+        Test to make sure a frame that shows nothing new redraws nothing.
+        """
+        draw_parameters = self.game.update_ui()
+        update_ui = self.game.update_ui
+        self.game.update_ui = lambda: draw_parameters
+        try:
+            self.ui.update_game()
+            self.assertEqual([], self.ui.update_game())
+        finally:
+            self.game.update_ui = update_ui
+
+
+@unittest.skipUnless(pygame, "pygame is not installed")
+class ThinkingUnitTests(HeadlessUITestCase):
+    def test_move_applied_when_ready(self):
+        """
+        Test to make sure the UI keeps drawing while a computer player
+        thinks, and that its move is made once it is ready.
+        """
+        self.ui.start_thinking()
+        self.assertEqual(100, self.game.P1.get_sp())
+        while self.ui.finish_thinking():
+            self.ui.update_game()
+        self.assertIsNone(self.ui.THINKING)
+        self.assertLess(self.game.P1.get_sp(), 100)
+        self.assertEqual('P2', self.game.update_ui()['current_player'])
+        self.ui.update_game()
+
+    def test_search_reads_a_copy(self):
+        """
+        Test to make sure the background thread searches a copy of the game,
+        so the UI can keep reading the game's queue while it thinks.
+        """
+        searched = []
+
+        class Recorder(RandomPlaystyle):
+            def select_attack(self, parameter=None):
+                searched.append(self.battle_queue)
+                return super().select_attack(parameter)
+
+            def copy(self, new_battle_queue):
+                return Recorder(new_battle_queue)
+
+        character = self.game.BATTLE_QUEUE.peek()
+        character.playstyle = Recorder(self.game.BATTLE_QUEUE)
+        self.ui.start_thinking()
+        self.ui.THINKING[0].result()
+        self.assertEqual(1, len(searched))
+        self.assertIsNot(self.game.BATTLE_QUEUE, searched[0])
+        self.assertFalse(self.ui.finish_thinking())
+        self.assertLess(character.get_sp(), 100)
+
+    def test_stale_move_dropped(self):
+        """
+        Test to make sure a move decided on for a game that has since been
+        replaced is not made in the new game.
+        """
+        self.ui.start_thinking()
+        old_match = self.game.DEFAULT_MATCH
+        match = self.game.Match()
+        match.set_up('n', 'r', 'R', 'r', 'm', 'M', 'r')
+        self.game.set_default_match(match)
+        self.ui.THINKING[0].result()
+        self.assertFalse(self.ui.finish_thinking())
+        self.assertEqual(100, self.game.P1.get_sp())
+        self.assertEqual(100, old_match.p1.get_sp())
+
+    def test_errors_raised_on_main_thread(self):
+        """
+        Test to make sure an error while thinking is raised when the move is
+        collected, rather than lost on the background thread.
+        """
+        self.game.DEFAULT_MATCH.battle_queue.peek().playstyle = None
+        self.ui.start_thinking()
+        self.ui.THINKING[0].exception()
+        with self.assertRaises(AttributeError):
+            self.ui.finish_thinking()
+        self.assertIsNone(self.ui.THINKING)
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)